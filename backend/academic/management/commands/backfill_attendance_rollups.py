@@ -0,0 +1,17 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from academic.services.attendance_rollups import backfill_rollups
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los acumulados diarios de asistencia por curso'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help='Fecha inicial YYYY-MM-DD')
+        parser.add_argument('--course', type=int, action='append', dest='courses', help='Limitar a uno o más cursos')
+
+    def handle(self, *args, **options):
+        changed = backfill_rollups(options['since'], options['courses'])
+        self.stdout.write(self.style.SUCCESS(f'{changed} acumulados diarios actualizados'))
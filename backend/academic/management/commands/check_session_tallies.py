@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from academic.services.session_tallies import check_session_tallies
+
+
+class Command(BaseCommand):
+    help = 'Verifica los conteos de asistencia guardados en cada sesión'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses', help='Limitar a uno o más cursos')
+        parser.add_argument('--fix', action='store_true', help='Corrige las sesiones con deriva')
+
+    def handle(self, *args, **options):
+        drifted = check_session_tallies(options['courses'], fix=options['fix'])
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('Los conteos de todas las sesiones son consistentes'))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'{len(drifted)} sesiones corregidas'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"{len(drifted)} sesiones con deriva: {', '.join(str(item) for item in drifted[:20])}"
+            ))
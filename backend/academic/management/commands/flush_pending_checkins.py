@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from academic.services.checkin_queue import flush_due_checkins, flush_pending_checkins
+
+
+class Command(BaseCommand):
+    help = (
+        'Vuelca a la asistencia los auto-registros encolados en modo diferido; con --loop queda '
+        'como worker que vuelca cada sesión al vencer su intervalo o al cerrar su ventana'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', type=int, action='append', dest='sessions', help='Limitar a una o más sesiones')
+        parser.add_argument('--loop', action='store_true', help='Revisa la cola sin terminar')
+        parser.add_argument('--interval', type=float, help='Segundos entre revisiones (por defecto SELF_CHECKIN_FLUSH_SECONDS)')
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            flushed = flush_pending_checkins(options['sessions'])
+            self.stdout.write(self.style.SUCCESS(f'{flushed} auto-registros volcados'))
+            return
+        interval = options['interval'] or settings.SELF_CHECKIN_FLUSH_SECONDS
+        while True:
+            close_old_connections()
+            flushed = flush_due_checkins()
+            if flushed:
+                self.stdout.write(self.style.SUCCESS(f'{flushed} auto-registros volcados'))
+            time.sleep(interval)
@@ -0,0 +1,83 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from academic.models import Course
+from academic.services.checkin_context import forget_checkin_contexts
+from academic.services.self_checkin import open_self_checkin_for_teacher
+from academic.views.attendance import AttendanceViewSet
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia de una ráfaga de auto-registros con y sin el contexto en caché (los datos se revierten)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=60, help='Estudiantes que marcan en la ráfaga')
+
+    def handle(self, *args, **options):
+        session_ids = []
+        try:
+            with transaction.atomic():
+                teacher, students, courses = self._fixture(options['students'])
+                for label, course, cold in (('sin contexto', courses[0], True), ('con contexto', courses[1], False)):
+                    opened = open_self_checkin_for_teacher(teacher, course.id)
+                    session_ids.append(opened['session_id'])
+                    self._report(label, self._burst(opened, students, cold))
+                transaction.set_rollback(True)
+        finally:
+            # Los ids revertidos pueden reutilizarse: no deben quedar contextos suyos
+            forget_checkin_contexts(session_ids)
+
+    def _fixture(self, count):
+        User = get_user_model()
+        prefix = f'loadtest-{uuid.uuid4().hex[:8]}'
+        teacher = User.objects.create(username=f'{prefix}-teacher', role='TEACHER', roles=['TEACHER'])
+        students = User.objects.bulk_create([
+            User(username=f'{prefix}-{index}', role='STUDENT', roles=['STUDENT'])
+            for index in range(count)
+        ])
+        courses = [
+            Course.objects.create(teacher=teacher, name=f'Prueba de carga {index}', code=f'{prefix}-{index}')
+            for index in range(2)
+        ]
+        for course in courses:
+            course.students.add(*students)
+        return teacher, students, courses
+
+    def _burst(self, opened, students, cold):
+        view = AttendanceViewSet.as_view({'post': 'self_checkin'})
+        factory = APIRequestFactory()
+        session_id = opened['session_id']
+        timings, queries = [], []
+        for student in students:
+            if cold:
+                forget_checkin_contexts([session_id])
+            request = factory.post(
+                '/api/academic/attendance/self_checkin/',
+                {'session_id': session_id, 'code': opened['code']},
+                format='json',
+            )
+            force_authenticate(request, user=student)
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = view(request)
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f'Registro rechazado ({response.status_code}): {response.data}')
+            queries.append(len(captured))
+        return timings, queries
+
+    def _report(self, label, result):
+        timings, queries = result
+        p95 = statistics.quantiles(timings, n=100)[94] if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f'{label}: {len(timings)} registros, p50 {statistics.median(timings):.1f} ms, '
+            f'p95 {p95:.1f} ms, máx {max(timings):.1f} ms, '
+            f'{statistics.mean(queries):.1f} consultas por registro'
+        )
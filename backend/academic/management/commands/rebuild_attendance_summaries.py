@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from academic.services.at_risk import rebuild_at_risk
+from academic.services.attendance_streaks import rebuild_streaks
+from academic.services.attendance_summary import rebuild_enrollment_summaries
+from academic.services.mission_progress import rebuild_mission_progress
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los resúmenes, las rachas y el avance de misiones por matrícula y corrige la deriva'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses', help='Limitar a uno o más cursos')
+        parser.add_argument('--dry-run', action='store_true', help='Solo reporta las matrículas con deriva')
+
+    def handle(self, *args, **options):
+        drifted = rebuild_enrollment_summaries(options['courses'], dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f'{drifted} resúmenes de asistencia con deriva')
+        else:
+            rebuild_at_risk(options['courses'])
+            streaks = rebuild_streaks(options['courses'])
+            missions = rebuild_mission_progress(options['courses'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{drifted} resúmenes de asistencia, {streaks} rachas y {missions} avances de misión corregidos'
+            ))
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def backfill_summaries(apps, schema_editor):
+    Attendance = apps.get_model('academic', 'Attendance')
+    Summary = apps.get_model('academic', 'EnrollmentAttendanceSummary')
+    rows = Attendance.objects.values('session__course_id', 'student_id').annotate(
+        present=Count('id', filter=Q(status='PRESENT')),
+        late=Count('id', filter=Q(status='LATE')),
+        absent=Count('id', filter=Q(status='ABSENT')),
+        excused=Count('id', filter=Q(status='EXCUSED')),
+        last_attended_on=Max('session__date', filter=Q(status__in=['PRESENT', 'LATE'])),
+    )
+    Summary.objects.bulk_create(
+        [
+            Summary(
+                course_id=row['session__course_id'],
+                student_id=row['student_id'],
+                present=row['present'],
+                late=row['late'],
+                absent=row['absent'],
+                excused=row['excused'],
+                last_attended_on=row['last_attended_on'],
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0014_mission_images_cloudinary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrollmentAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.IntegerField(default=0)),
+                ('late', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('excused', models.IntegerField(default=0)),
+                ('last_attended_on', models.DateField(blank=True, null=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='academic.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('course', 'student')},
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:45
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_session_counts(apps, schema_editor):
+    Attendance = apps.get_model('academic', 'Attendance')
+    Session = apps.get_model('academic', 'Session')
+    rows = Attendance.objects.values('session_id').annotate(
+        present=Count('id', filter=Q(status='PRESENT')),
+        late=Count('id', filter=Q(status='LATE')),
+        absent=Count('id', filter=Q(status='ABSENT')),
+        excused=Count('id', filter=Q(status='EXCUSED')),
+    )
+    sessions = []
+    for row in rows.iterator():
+        sessions.append(Session(
+            id=row['session_id'],
+            present_count=row['present'],
+            late_count=row['late'],
+            absent_count=row['absent'],
+            excused_count=row['excused'],
+        ))
+    Session.objects.bulk_update(
+        sessions,
+        ['present_count', 'late_count', 'absent_count', 'excused_count'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0015_enrollmentattendancesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='absent_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='excused_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='late_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='present_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_session_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_rollups(apps, schema_editor):
+    Attendance = apps.get_model('academic', 'Attendance')
+    Rollup = apps.get_model('academic', 'DailyAttendanceRollup')
+    rows = Attendance.objects.values('session__date', 'session__course_id').annotate(
+        present=Count('id', filter=Q(status='PRESENT')),
+        late=Count('id', filter=Q(status='LATE')),
+        absent=Count('id', filter=Q(status='ABSENT')),
+        excused=Count('id', filter=Q(status='EXCUSED')),
+    )
+    Rollup.objects.bulk_create(
+        [
+            Rollup(
+                date=row['session__date'],
+                course_id=row['session__course_id'],
+                present=row['present'],
+                late=row['late'],
+                absent=row['absent'],
+                excused=row['excused'],
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0016_session_status_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('present', models.IntegerField(default=0)),
+                ('late', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('excused', models.IntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='academic.course')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='academic_da_date_2d700a_idx')],
+                'unique_together': {('date', 'course')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
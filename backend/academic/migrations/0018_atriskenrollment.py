@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:53
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, F, OuterRef
+
+
+def backfill_at_risk(apps, schema_editor):
+    Course = apps.get_model('academic', 'Course')
+    Summary = apps.get_model('academic', 'EnrollmentAttendanceSummary')
+    AtRiskEnrollment = apps.get_model('academic', 'AtRiskEnrollment')
+    enrolled = Course.students.through.objects.filter(
+        course_id=OuterRef('course_id'),
+        user_id=OuterRef('student_id'),
+    )
+    flagged = Summary.objects.filter(
+        Exists(enrolled),
+        absent__gte=F('course__absence_threshold'),
+    ).values_list('id', 'course_id', 'student_id')
+    AtRiskEnrollment.objects.bulk_create(
+        [
+            AtRiskEnrollment(summary_id=summary_id, course_id=course_id, student_id=student_id)
+            for summary_id, course_id, student_id in flagged.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0017_dailyattendancerollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='absence_threshold',
+            field=models.PositiveSmallIntegerField(default=3, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.CreateModel(
+            name='AtRiskEnrollment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flagged_at', models.DateTimeField(auto_now_add=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='at_risk_enrollments', to='academic.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='at_risk_enrollments', to=settings.AUTH_USER_MODEL)),
+                ('summary', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='at_risk', to='academic.enrollmentattendancesummary')),
+            ],
+            options={
+                'unique_together': {('course', 'student')},
+            },
+        ),
+        migrations.RunPython(backfill_at_risk, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0018_atriskenrollment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingCheckin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PRESENT', 'Presente'), ('LATE', 'Retardo'), ('ABSENT', 'Falta'), ('EXCUSED', 'Excusa')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_checkins', to='academic.session')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_checkins', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('session', 'student')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0019_pendingcheckin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_id', models.IntegerField()),
+                ('student_id', models.IntegerField()),
+                ('previous', models.CharField(blank=True, max_length=10)),
+                ('status', models.CharField(blank=True, max_length=10)),
+                ('pending', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_events', to='academic.course')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', 'id'], name='academic_at_course__ff9996_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:58
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def backfill_streaks(apps, schema_editor):
+    Session = apps.get_model('academic', 'Session')
+    Attendance = apps.get_model('academic', 'Attendance')
+    Summary = apps.get_model('academic', 'EnrollmentAttendanceSummary')
+    by_course = defaultdict(list)
+    for course_id, session_id, session_date in Session.objects.order_by('course_id', 'date', 'id').values_list(
+        'course_id', 'id', 'date',
+    ):
+        by_course[course_id].append((session_id, session_date))
+    marked = defaultdict(dict)
+    for course_id, student_id, session_id, status in Attendance.objects.values_list(
+        'session__course_id', 'student_id', 'session_id', 'status',
+    ).iterator():
+        marked[(course_id, student_id)][session_id] = status
+
+    updated = []
+    for summary in Summary.objects.iterator():
+        statuses = marked.get((summary.course_id, summary.student_id), {})
+        run = 0
+        for session_id, session_date in by_course[summary.course_id]:
+            status = statuses.get(session_id)
+            run = run + 1 if status in ('PRESENT', 'LATE') else 0
+            summary.longest_streak = max(summary.longest_streak, run)
+            if status is not None:
+                summary.current_streak = run
+                summary.streak_session_id, summary.streak_session_date = session_id, session_date
+        updated.append(summary)
+    Summary.objects.bulk_update(
+        updated,
+        ['current_streak', 'longest_streak', 'streak_session_id', 'streak_session_date'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0020_attendanceevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollmentattendancesummary',
+            name='current_streak',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='enrollmentattendancesummary',
+            name='longest_streak',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='enrollmentattendancesummary',
+            name='streak_session_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='enrollmentattendancesummary',
+            name='streak_session_id',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_streaks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def backfill_progress(apps, schema_editor):
+    Mission = apps.get_model('academic', 'Mission')
+    Summary = apps.get_model('academic', 'EnrollmentAttendanceSummary')
+    MissionProgress = apps.get_model('academic', 'MissionProgress')
+    attended = {}
+    for course_id, student_id in Summary.objects.filter(Q(present__gt=0) | Q(late__gt=0)).values_list(
+        'course_id', 'student_id',
+    ).iterator():
+        attended.setdefault(course_id, []).append(student_id)
+    MissionProgress.objects.bulk_create(
+        [
+            MissionProgress(mission_id=mission_id, student_id=student_id)
+            for mission_id, course_id in Mission.objects.values_list('id', 'course_id')
+            for student_id in attended.get(course_id, [])
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0021_enrollment_streaks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MissionProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_at', models.DateTimeField(auto_now_add=True)),
+                ('mission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='academic.mission')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mission_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('student', 'mission')},
+            },
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
@@ -3,7 +3,10 @@ import string
 from datetime import date
 
 from django.conf import settings
-from django.db import models
+from django.core.validators import MinValueValidator
+from django.db import models, transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from cloudinary.models import CloudinaryField
 
@@ -40,6 +43,7 @@ class Course(models.Model):
     schedule = models.JSONField(default=list, blank=True)
     is_archived = models.BooleanField(default=False, db_index=True)
     archived_at = models.DateTimeField(null=True, blank=True)
+    absence_threshold = models.PositiveSmallIntegerField(default=3, validators=[MinValueValidator(1)])
 
     def archive(self):
         if not self.is_archived:
@@ -53,6 +57,13 @@ class Course(models.Model):
             self.archived_at = None
             self.save(update_fields=['is_archived', 'archived_at'])
 
+    def delete(self, *args, **kwargs):
+        # La cascada borra los puntos del curso sin descontarlos del total del estudiante
+        from gamification.services.points import discount_course_points
+        with transaction.atomic():
+            discount_course_points(self.id)
+            return super().delete(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} ({self.code})"
 
@@ -65,6 +76,52 @@ class Session(models.Model):
     self_checkin_code = models.CharField(max_length=6, blank=True)
     self_checkin_opened_at = models.DateTimeField(null=True, blank=True)
     self_checkin_expires_at = models.DateTimeField(null=True, blank=True)
+    # Conteos por estado mantenidos con cada escritura de asistencia
+    present_count = models.IntegerField(default=0)
+    late_count = models.IntegerField(default=0)
+    absent_count = models.IntegerField(default=0)
+    excused_count = models.IntegerField(default=0)
+
+    @property
+    def total_count(self):
+        return self.present_count + self.late_count + self.absent_count + self.excused_count
+
+    def save(self, *args, **kwargs):
+        from academic.services.attendance_streaks import session_order_changed
+        from academic.services.checkin_context import forget_checkin_contexts
+        from academic.services.course_cache import bump_course_versions
+        from academic.services.open_checkins import session_saved
+        created = self._state.adding
+        super().save(*args, **kwargs)
+        bump_course_versions([self.course_id])
+        forget_checkin_contexts([self.id])
+        session_saved(kwargs.get('update_fields'))
+        session_order_changed(
+            self.course_id,
+            kwargs.get('update_fields'),
+            tail=(self.date, self.id) if created else None,
+        )
+
+    def delete(self, *args, **kwargs):
+        # El borrado en cascada no pasa por Attendance.delete: se registra aquí
+        from academic.services.attendance_changes import AttendanceChange, record_attendance_changes
+        from academic.services.attendance_streaks import session_order_changed
+        from academic.services.checkin_context import forget_checkin_contexts
+        from academic.services.course_cache import bump_course_versions
+        from academic.services.open_checkins import forget_open_windows
+        with transaction.atomic():
+            changes = [
+                AttendanceChange(self.course_id, self.id, self.date, student_id, status, None)
+                for student_id, status in self.attendances.values_list('student_id', 'status')
+            ]
+            course_id, session_id = self.course_id, self.id
+            result = super().delete(*args, **kwargs)
+            session_order_changed(course_id, tail=(self.date, session_id))
+            record_attendance_changes(changes)
+            bump_course_versions([course_id])
+            forget_checkin_contexts([session_id])
+            forget_open_windows()
+        return result
 
     def __str__(self):
         return f"{self.course} - {self.date}"
@@ -84,6 +141,10 @@ class Attendance(models.Model):
         ('REJECTED', 'Rechazada'),
     )
 
+    # Origen de una escritura (``change_source``), para el registro de cambios
+    ROLL_CALL = 'roll_call'
+    SELF_CHECKIN = 'self_checkin'
+
     session = models.ForeignKey(Session, on_delete=models.CASCADE, related_name='attendances')
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES)
@@ -96,10 +157,140 @@ class Attendance(models.Model):
     class Meta:
         unique_together = ('session', 'student')
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Propaga el cambio de estado a los modelos de lectura en la misma transacción
+        from academic.services.attendance_changes import change_for, record_attendance_changes
+        from academic.services.course_cache import bump_course_versions
+        previous = getattr(self, '_loaded_status', None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Las insignias que ganó este cambio, para quien escribió la asistencia
+            self.awarded_badges = record_attendance_changes([change_for(self, previous, self.status)])
+            if previous == self.status:
+                # Cambios solo de excusa: no pasan por el registro de cambios
+                bump_course_versions([self.session.course_id])
+        self._loaded_status = self.status
+
+    def delete(self, *args, **kwargs):
+        from academic.services.attendance_changes import change_for, record_attendance_changes
+        change = change_for(self, getattr(self, '_loaded_status', self.status), None)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            record_attendance_changes([change])
+        return result
+
     def __str__(self):
         return f"{self.student} - {self.session} - {self.status}"
 
 
+class PendingCheckin(models.Model):
+    """Auto-registro aceptado que aún no se vuelca a ``Attendance``."""
+    session = models.ForeignKey(Session, on_delete=models.CASCADE, related_name='pending_checkins')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='pending_checkins')
+    status = models.CharField(max_length=10, choices=Attendance.STATUS_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('session', 'student')
+
+    def __str__(self):
+        return f"{self.student} - {self.session} - {self.status}"
+
+
+class EnrollmentAttendanceSummary(models.Model):
+    """Conteos de asistencia por matrícula, mantenidos en cada escritura."""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='attendance_summaries')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='attendance_summaries')
+    present = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+    excused = models.IntegerField(default=0)
+    last_attended_on = models.DateField(null=True, blank=True)
+    # Racha de sesiones seguidas con asistencia que termina en la última
+    # sesión con estado registrado (``streak_session_id``)
+    current_streak = models.IntegerField(default=0)
+    longest_streak = models.IntegerField(default=0)
+    streak_session_id = models.IntegerField(null=True, blank=True)
+    streak_session_date = models.DateField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('course', 'student')
+
+    @property
+    def recorded(self):
+        return self.present + self.late + self.absent + self.excused
+
+    def __str__(self):
+        return f"{self.student} - {self.course}"
+
+
+class AtRiskEnrollment(models.Model):
+    """Matrículas cuyo número de faltas alcanzó el umbral del curso."""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='at_risk_enrollments')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='at_risk_enrollments')
+    summary = models.OneToOneField(EnrollmentAttendanceSummary, on_delete=models.CASCADE, related_name='at_risk')
+    flagged_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('course', 'student')
+
+    @property
+    def absences(self):
+        return self.summary.absent
+
+    def __str__(self):
+        return f"{self.student} - {self.course}"
+
+
+class DailyAttendanceRollup(models.Model):
+    """Conteos de asistencia por curso y día para las analíticas globales."""
+    date = models.DateField()
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='attendance_rollups')
+    present = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+    excused = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'course')
+        indexes = [models.Index(fields=['date'])]
+
+    @property
+    def recorded(self):
+        return self.present + self.late + self.absent + self.excused
+
+    def __str__(self):
+        return f"{self.course} - {self.date}"
+
+
+class AttendanceEvent(models.Model):
+    """Cambio de asistencia publicado en las transmisiones en vivo (SSE).
+
+    El id es el ``Last-Event-ID`` que usan los clientes al reconectarse. La
+    sesión y el estudiante se guardan sin llave foránea: el borrado de una
+    sesión también publica sus eventos.
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='attendance_events')
+    session_id = models.IntegerField()
+    student_id = models.IntegerField()
+    previous = models.CharField(max_length=10, blank=True)
+    status = models.CharField(max_length=10, blank=True)
+    pending = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['course', 'id'])]
+
+    def __str__(self):
+        return f"{self.session_id} - {self.student_id} - {self.status}"
+
+
 class Mission(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='missions')
     name = models.CharField(max_length=120)
@@ -124,6 +315,20 @@ class Mission(models.Model):
     class Meta:
         ordering = ('-created_at',)
 
+    def save(self, *args, **kwargs):
+        from academic.services.mission_progress import backfill_mission_progress, forget_mission_courses
+        created = self._state.adding
+        super().save(*args, **kwargs)
+        forget_mission_courses()
+        if created:
+            backfill_mission_progress(self)
+
+    def delete(self, *args, **kwargs):
+        from academic.services.mission_progress import forget_mission_courses
+        result = super().delete(*args, **kwargs)
+        forget_mission_courses()
+        return result
+
     def __str__(self):
         return f"{self.name} - {self.course}"
 
@@ -148,3 +353,34 @@ class MissionResource(models.Model):
 
     def __str__(self):
         return f"{self.title} ({self.resource_type})"
+
+
+class MissionProgress(models.Model):
+    """Misiones completadas por estudiante; la misión con inventario lo desbloquea.
+
+    Se escribe cuando la asistencia del estudiante al curso pasa a contar
+    (PRESENT o LATE) y se borra si deja de tener asistencias que cuenten.
+    """
+    mission = models.ForeignKey(Mission, on_delete=models.CASCADE, related_name='progress')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='mission_progress')
+    completed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('student', 'mission')
+
+    def __str__(self):
+        return f"{self.student} - {self.mission}"
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def remove_deleted_student_attendances(sender, instance, origin=None, **kwargs):
+    # La cascada del usuario no pasa por Attendance.delete: sus marcas se
+    # descuentan de los conteos, resúmenes y agregados antes de borrarlo
+    from academic.services.attendance_changes import remove_student_attendances
+    if isinstance(origin, models.QuerySet):
+        # ``queryset.delete()`` avisa por cada usuario; se registra un solo lote
+        if not getattr(origin, '_attendances_removed', False):
+            origin._attendances_removed = True
+            remove_student_attendances(origin.values('pk'))
+        return
+    remove_student_attendances([instance.pk])
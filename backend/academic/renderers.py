@@ -0,0 +1,27 @@
+from rest_framework.renderers import BaseRenderer
+
+from academic.services.exports import CONTENT_TYPES
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Habilita ``?format=csv|xlsx`` en las acciones de exportación.
+    El archivo sale en un StreamingHttpResponse; este renderer solo
+    serializa los errores como texto plano.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and 'detail' in data:
+            data = data['detail']
+        return str(data or '').encode()
+
+
+class CSVExportRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class XLSXExportRenderer(ExportRenderer):
+    media_type = CONTENT_TYPES['xlsx']
+    format = 'xlsx'
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Attendance, Course, Mission, MissionResource, Session
+from .models import AtRiskEnrollment, Attendance, Course, Mission, MissionResource, Session
 
 User = get_user_model()
 
@@ -26,10 +26,40 @@ class CourseSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('teacher',)
 
+class CourseListSerializer(serializers.ModelSerializer):
+    """Representación del listado: sin la lista de estudiantes, solo su conteo."""
+    student_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Course
+        exclude = ('students',)
+        read_only_fields = ('teacher',)
+
+
 class SessionSerializer(serializers.ModelSerializer):
+    # Los conteos, resúmenes y rollups de la sesión quedan ligados a su curso y fecha
+    FIXED_FIELDS = ('course', 'date')
+
     class Meta:
         model = Session
         fields = '__all__'
+        read_only_fields = ('present_count', 'late_count', 'absent_count', 'excused_count')
+
+    def validate(self, attrs):
+        if self.instance is not None:
+            changed = [field for field in self.FIXED_FIELDS if field in attrs and attrs[field] != getattr(self.instance, field)]
+            if changed:
+                raise serializers.ValidationError({field: 'No se puede cambiar después de crear la sesión.' for field in changed})
+        return attrs
+
+    def update(self, instance, validated_data):
+        # Solo los campos enviados: un guardado completo reescribiría los conteos
+        # leídos al inicio y pisaría los incrementos concurrentes con F()
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        if validated_data:
+            instance.save(update_fields=list(validated_data))
+        return instance
 
 class AttendanceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -53,6 +83,47 @@ class AttendanceSessionQuerySerializer(serializers.Serializer):
     date = serializers.DateField()
 
 
+class AtRiskQuerySerializer(serializers.Serializer):
+    course = serializers.IntegerField(min_value=1, required=False)
+    teacher = serializers.IntegerField(min_value=1, required=False)
+    program = serializers.IntegerField(min_value=1, required=False)
+    faculty = serializers.IntegerField(min_value=1, required=False)
+
+
+class AtRiskEnrollmentSerializer(serializers.ModelSerializer):
+    student = SimpleStudentSerializer(read_only=True)
+    course_name = serializers.CharField(source='course.name', read_only=True)
+    course_code = serializers.CharField(source='course.code', read_only=True)
+    teacher_name = serializers.SerializerMethodField()
+    absences = serializers.IntegerField(source='summary.absent', read_only=True)
+    lates = serializers.IntegerField(source='summary.late', read_only=True)
+    threshold = serializers.IntegerField(source='course.absence_threshold', read_only=True)
+
+    def get_teacher_name(self, instance):
+        teacher = instance.course.teacher
+        return f"{teacher.first_name} {teacher.last_name}"
+
+    class Meta:
+        model = AtRiskEnrollment
+        fields = (
+            'id',
+            'course',
+            'course_name',
+            'course_code',
+            'teacher_name',
+            'student',
+            'absences',
+            'lates',
+            'threshold',
+            'flagged_at',
+        )
+
+
+class ExportArchiveQuerySerializer(serializers.Serializer):
+    year = serializers.IntegerField(min_value=2000)
+    period = serializers.ChoiceField(choices=Course.PERIOD_CHOICES)
+
+
 class MissionResourceSerializer(serializers.ModelSerializer):
     class Meta:
         model = MissionResource
@@ -0,0 +1,141 @@
+"""Indicadores globales de asistencia leídos desde DailyAttendanceRollup."""
+from django.contrib.auth import get_user_model
+from django.db.models import (
+    Count, F, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, Value,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, TruncMonth
+
+from academic.models import Course, DailyAttendanceRollup, Session
+
+User = get_user_model()
+
+RECORDED = F('present') + F('late') + F('absent') + F('excused')
+
+
+def month_starts(today, months=6):
+    """Primer día de los últimos ``months`` meses, del más antiguo al actual."""
+    starts = []
+    year, month = today.year, today.month
+    for _ in range(months):
+        starts.append(today.replace(year=year, month=month, day=1))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return starts[::-1]
+
+
+def monthly_attendance(today):
+    starts = month_starts(today)
+    rows = (
+        DailyAttendanceRollup.objects.filter(date__gte=starts[0])
+        .annotate(month=TruncMonth('date'))
+        .values('month')
+        .annotate(
+            present_total=Sum('present'),
+            late_total=Sum('late'),
+            absent_total=Sum('absent'),
+            recorded_total=Sum(RECORDED),
+        )
+    )
+    by_month = {row['month'].replace(day=1): row for row in rows}
+    series = []
+    for start in starts:
+        row = by_month.get(start, {})
+        present, late = row.get('present_total') or 0, row.get('late_total') or 0
+        total = row.get('recorded_total') or 0
+        series.append({
+            'month': start.strftime('%b'),
+            'rate': round(((present + late) / total) * 100, 1) if total > 0 else 0,
+            'present': present,
+            'absent': row.get('absent_total') or 0,
+            'late': late,
+            'total': total,
+        })
+    return series
+
+
+def attendance_totals(today):
+    return DailyAttendanceRollup.objects.aggregate(
+        all_records=Coalesce(Sum(RECORDED), 0),
+        today_total=Coalesce(Sum(RECORDED, filter=Q(date=today)), 0),
+        today_present=Coalesce(Sum('present', filter=Q(date=today)), 0),
+        today_absent=Coalesce(Sum('absent', filter=Q(date=today)), 0),
+    )
+
+
+def _rate_expression(present, total):
+    return Coalesce(
+        Cast(present, FloatField()) * 100 / NullIf(total, 0),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _count_subquery(queryset, group_field):
+    return Coalesce(
+        Subquery(
+            queryset.values(group_field).annotate(total=Count('*')).values('total')[:1],
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def _sum_subquery(group_field, expression, **filters):
+    return Coalesce(
+        Subquery(
+            DailyAttendanceRollup.objects.filter(**filters)
+            .values(group_field).annotate(total=Sum(expression)).values('total')[:1],
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def top_courses(limit=5):
+    enrollments = Course.students.through.objects.filter(course_id=OuterRef('pk'))
+    courses = (
+        Course.objects.select_related('teacher')
+        .annotate(
+            present_total=_sum_subquery('course_id', 'present', course_id=OuterRef('pk')),
+            recorded_total=_sum_subquery('course_id', RECORDED, course_id=OuterRef('pk')),
+            student_count=_count_subquery(enrollments, 'course_id'),
+            session_count=_count_subquery(Session.objects.filter(course_id=OuterRef('pk')), 'course_id'),
+        )
+        .annotate(rate=_rate_expression('present_total', 'recorded_total'))
+        .order_by('-rate', 'id')[:limit]
+    )
+    return [
+        {
+            'name': course.name[:30],
+            'code': course.code,
+            'students': course.student_count,
+            'sessions': course.session_count,
+            'attendance_rate': round(course.rate, 1),
+            'teacher': f"{course.teacher.first_name} {course.teacher.last_name}" if course.teacher else 'Sin docente',
+        }
+        for course in courses
+    ]
+
+
+def teacher_performance(limit=5):
+    enrollments = Course.students.through.objects.filter(course__teacher_id=OuterRef('pk'))
+    teachers = (
+        User.objects.filter(role='TEACHER')
+        .annotate(
+            present_total=_sum_subquery('course__teacher_id', 'present', course__teacher_id=OuterRef('pk')),
+            recorded_total=_sum_subquery('course__teacher_id', RECORDED, course__teacher_id=OuterRef('pk')),
+            course_count=_count_subquery(Course.objects.filter(teacher_id=OuterRef('pk')), 'teacher_id'),
+            student_count=_count_subquery(enrollments, 'course__teacher_id'),
+        )
+        .annotate(rate=_rate_expression('present_total', 'recorded_total'))
+        .order_by('-rate', 'id')[:limit]
+    )
+    return [
+        {
+            'name': f"{teacher.first_name} {teacher.last_name}",
+            'courses': teacher.course_count,
+            'students': teacher.student_count,
+            'attendance_rate': round(teacher.rate, 1),
+        }
+        for teacher in teachers
+    ]
+
@@ -0,0 +1,93 @@
+"""Índice de matrículas en riesgo por inasistencia.
+
+Una matrícula entra al índice cuando sus faltas alcanzan el
+``absence_threshold`` del curso y sale cuando bajan de él o el estudiante
+deja el curso. Las lecturas (alertas, analíticas, listado) consultan solo
+``AtRiskEnrollment``.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+
+from academic.models import AtRiskEnrollment, Course, EnrollmentAttendanceSummary
+
+
+def apply_at_risk_changes(changes):
+    pairs = {
+        (change.course_id, change.student_id)
+        for change in changes
+        if 'ABSENT' in (change.previous, change.current)
+    }
+    if pairs:
+        refresh_at_risk(pairs)
+
+
+def refresh_at_risk(pairs):
+    """Reevalúa las parejas (curso, estudiante) indicadas contra el umbral."""
+    by_course = defaultdict(set)
+    for course_id, student_id in pairs:
+        by_course[course_id].add(student_id)
+    condition = Q()
+    for course_id, student_ids in by_course.items():
+        condition |= Q(course_id=course_id, student_id__in=student_ids)
+    _sync(condition)
+
+
+@transaction.atomic
+def rebuild_at_risk(course_ids=None):
+    """Recalcula el índice completo (o de los cursos dados) y retorna cuántas matrículas quedaron marcadas."""
+    return _sync(Q(course_id__in=course_ids) if course_ids else Q())
+
+
+def _sync(condition):
+    enrolled = Course.students.through.objects.filter(
+        course_id=OuterRef('course_id'),
+        user_id=OuterRef('student_id'),
+    )
+    flagged = list(
+        EnrollmentAttendanceSummary.objects.filter(condition)
+        .filter(Exists(enrolled), absent__gte=F('course__absence_threshold'))
+        .values_list('id', 'course_id', 'student_id')
+    )
+    with transaction.atomic(savepoint=False):
+        AtRiskEnrollment.objects.filter(condition).exclude(
+            summary_id__in=[summary_id for summary_id, _, _ in flagged],
+        ).delete()
+        AtRiskEnrollment.objects.bulk_create(
+            [
+                AtRiskEnrollment(summary_id=summary_id, course_id=course_id, student_id=student_id)
+                for summary_id, course_id, student_id in flagged
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+    return len(flagged)
+
+
+def at_risk_enrollments(user, filters=None):
+    """Matrículas en riesgo visibles para ``user``, filtrables por curso, docente, programa o facultad."""
+    roles = user.roles or [user.role]
+    queryset = AtRiskEnrollment.objects.select_related('course', 'course__teacher', 'student', 'summary')
+    if 'ADMIN' in roles or 'COORDINATOR' in roles or user.is_superuser:
+        pass
+    elif 'TEACHER' in roles or 'PRACTICE_TEACHER' in roles:
+        queryset = queryset.filter(course__teacher=user)
+    else:
+        queryset = queryset.filter(student=user)
+
+    lookups = {
+        'course': 'course_id',
+        'teacher': 'course__teacher_id',
+        'program': 'student__program_id',
+        'faculty': 'student__faculty_id',
+    }
+    for param, lookup in lookups.items():
+        value = (filters or {}).get(param)
+        if value:
+            queryset = queryset.filter(**{lookup: value})
+    return queryset.order_by('-summary__absent', 'course_id', 'student__last_name', 'student__first_name')
+
+
+def at_risk_student_count():
+    return AtRiskEnrollment.objects.filter(student__role='STUDENT').values('student_id').distinct().count()
@@ -0,0 +1,99 @@
+"""Punto único por donde pasan los cambios de estado de asistencia.
+
+Cada escritura (llamado masivo, auto-registro, excusas, edición manual o
+borrado de sesión o de usuario) describe sus cambios como ``AttendanceChange`` y los
+entrega a ``record_attendance_changes``, que actualiza los modelos de
+lectura dentro de la transacción del llamador. Las etapas no abren
+savepoints propios: si una falla, se revierte la escritura completa. Retorna
+las insignias otorgadas como pares ``(student_id, badge_id)``.
+
+``source`` distingue el auto-registro del estudiante
+(``Attendance.SELF_CHECKIN``) de las escrituras del profesor o del
+administrador (``Attendance.ROLL_CALL``): la insignia de primera llegada a
+tiempo solo se gana auto-registrándose.
+"""
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import models
+
+from academic.models import Attendance
+from academic.services.at_risk import apply_at_risk_changes
+from academic.services.attendance_rollups import apply_rollup_changes
+from academic.services.attendance_streaks import apply_streak_changes
+from academic.services.attendance_summary import apply_summary_changes
+from academic.services.course_cache import bump_course_versions
+from academic.services.dashboard import invalidate_dashboards
+from academic.services.live_events import publish_attendance_events
+from academic.services.mission_progress import apply_mission_progress_changes
+from academic.services.session_tallies import apply_session_tally_changes
+from gamification.services.badges import award_badges_for_changes
+from gamification.services.points import apply_point_changes
+
+
+@dataclass(frozen=True)
+class AttendanceChange:
+    course_id: int
+    session_id: int
+    session_date: date
+    student_id: int
+    previous: str | None
+    current: str | None
+    source: str = Attendance.ROLL_CALL
+
+    def __post_init__(self):
+        # Las sesiones recién creadas pueden traer la fecha como texto ISO
+        object.__setattr__(self, 'session_date', models.DateField().to_python(self.session_date))
+
+
+def change_for(attendance, previous, current):
+    session = attendance.session
+    return AttendanceChange(
+        course_id=session.course_id,
+        session_id=session.id,
+        session_date=session.date,
+        student_id=attendance.student_id,
+        previous=previous,
+        current=current,
+        source=getattr(attendance, 'change_source', Attendance.ROLL_CALL),
+    )
+
+
+def record_attendance_changes(changes):
+    changes = [item for item in changes if item.previous != item.current]
+    if not changes:
+        return set()
+    apply_summary_changes(changes)
+    apply_streak_changes(changes)
+    apply_mission_progress_changes(changes)
+    apply_at_risk_changes(changes)
+    apply_session_tally_changes(changes)
+    apply_rollup_changes(changes)
+    apply_point_changes(changes)
+    awarded = award_badges_for_changes(changes)
+    bump_course_versions({item.course_id for item in changes})
+    invalidate_dashboards(
+        {item.student_id for item in changes},
+        {item.course_id for item in changes},
+    )
+    publish_attendance_events(changes)
+    return awarded
+
+
+def remove_student_attendances(student_ids):
+    """Borra las asistencias de los estudiantes y las registra como retiros.
+
+    El borrado en cascada de un usuario no pasa por ``Attendance.delete``; se
+    llama antes de borrarlo, como hace ``Session.delete`` con su cascada.
+    """
+    attendances = Attendance.objects.filter(student_id__in=student_ids)
+    changes = [
+        AttendanceChange(course_id, session_id, session_date, student_id, status, None)
+        for course_id, session_id, session_date, student_id, status in attendances.values_list(
+            'session__course_id', 'session_id', 'session__date', 'student_id', 'status',
+        )
+    ]
+    if not changes:
+        return
+    attendances.delete()
+    record_attendance_changes(changes)
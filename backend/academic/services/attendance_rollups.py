@@ -0,0 +1,79 @@
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from academic.models import Attendance, DailyAttendanceRollup
+
+ROLLUP_FIELDS = {
+    'PRESENT': 'present',
+    'LATE': 'late',
+    'ABSENT': 'absent',
+    'EXCUSED': 'excused',
+}
+EMPTY_ROLLUP = (0, 0, 0, 0)
+
+
+def apply_rollup_changes(changes):
+    deltas = defaultdict(Counter)
+    for change in changes:
+        key = (change.session_date, change.course_id)
+        if change.previous in ROLLUP_FIELDS:
+            deltas[key][ROLLUP_FIELDS[change.previous]] -= 1
+        if change.current in ROLLUP_FIELDS:
+            deltas[key][ROLLUP_FIELDS[change.current]] += 1
+    DailyAttendanceRollup.objects.bulk_create(
+        [DailyAttendanceRollup(date=day, course_id=course_id) for day, course_id in deltas],
+        ignore_conflicts=True,
+    )
+    for (day, course_id), delta in deltas.items():
+        values = {field: F(field) + amount for field, amount in delta.items() if amount}
+        if values:
+            DailyAttendanceRollup.objects.filter(date=day, course_id=course_id).update(**values)
+
+
+def _expected_rollups(since=None, course_ids=None):
+    attendances = Attendance.objects.all()
+    if since:
+        attendances = attendances.filter(session__date__gte=since)
+    if course_ids:
+        attendances = attendances.filter(session__course_id__in=course_ids)
+    rows = attendances.values('session__date', 'session__course_id').annotate(
+        **{field: Count('id', filter=Q(status=status)) for status, field in ROLLUP_FIELDS.items()}
+    )
+    return {
+        (row['session__date'], row['session__course_id']): tuple(row[field] for field in ROLLUP_FIELDS.values())
+        for row in rows.iterator()
+    }
+
+
+@transaction.atomic
+def backfill_rollups(since: date | None = None, course_ids=None):
+    """Recalcula las filas diarias desde Attendance y retorna cuántas cambiaron."""
+    expected = _expected_rollups(since, course_ids)
+    rollups = DailyAttendanceRollup.objects.all()
+    if since:
+        rollups = rollups.filter(date__gte=since)
+    if course_ids:
+        rollups = rollups.filter(course_id__in=course_ids)
+    current = {
+        (row[0], row[1]): tuple(row[2:])
+        for row in rollups.values_list('date', 'course_id', *ROLLUP_FIELDS.values())
+    }
+    drifted = {
+        key: expected.get(key, EMPTY_ROLLUP)
+        for key in expected.keys() | current.keys()
+        if current.get(key, EMPTY_ROLLUP) != expected.get(key, EMPTY_ROLLUP)
+    }
+    DailyAttendanceRollup.objects.bulk_create(
+        [
+            DailyAttendanceRollup(date=day, course_id=course_id, **dict(zip(ROLLUP_FIELDS.values(), values)))
+            for (day, course_id), values in drifted.items()
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['date', 'course'],
+        update_fields=list(ROLLUP_FIELDS.values()),
+    )
+    return len(drifted)
@@ -0,0 +1,194 @@
+"""Rachas de asistencia por matrícula.
+
+La racha cuenta las sesiones seguidas del curso (por fecha) con asistencia
+(PRESENT o LATE); una falta, una excusa o una sesión sin estado registrado
+la corta. Cada resumen guarda la racha actual, la más larga y la sesión en
+la que termina. Registrar el estado de una sesión más reciente que esa es
+O(1): la racha sigue solo si no hay otra sesión del curso entre la guardada
+y la nueva, y una sola consulta lo revisa para todo el lote. Las ediciones
+retroactivas y los borrados recalculan solo esa matrícula.
+
+La revisión lee la base y no una caché: la API y los workers escriben desde
+contenedores distintos y una sesión recién creada en uno debe cortar la
+racha en el otro. Una sesión creada o borrada entre otras también puede
+unir o cortar rachas ya guardadas (la sesión sin estado corta la racha): al
+confirmarse se recalculan las rachas del curso. Agregar o borrar la última
+sesión no las mueve y no recalcula nada.
+"""
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import models, transaction
+from django.db.models import Q
+
+from academic.models import Attendance, EnrollmentAttendanceSummary, Session
+from academic.services.attendance_summary import ATTENDED_STATUSES
+
+STREAK_FIELDS = ('current_streak', 'longest_streak', 'streak_session_id', 'streak_session_date')
+EMPTY_STREAK = (0, 0, None, None)
+
+
+def apply_streak_changes(changes):
+    """Actualiza las rachas de las matrículas que tocaron los cambios."""
+    by_pair = defaultdict(list)
+    for change in changes:
+        by_pair[(change.course_id, change.student_id)].append(change)
+    summaries = {
+        (summary.course_id, summary.student_id): summary
+        for summary in EnrollmentAttendanceSummary.objects.filter(_pairs_filter(by_pair, 'course_id')).only(
+            'course_id', 'student_id', *STREAK_FIELDS,
+        )
+    }
+    appended = {}
+    stale = set()
+    for pair, items in by_pair.items():
+        summary = summaries.get(pair)
+        if summary is None:
+            continue
+        change = items[0]
+        if len(items) == 1 and change.previous is None and change.current and _is_after(change, summary):
+            appended[pair] = change
+        else:
+            stale.add(pair)
+
+    broken = _broken_runs(appended, summaries)
+    for pair, change in appended.items():
+        summary = summaries[pair]
+        run = 0 if pair in broken else summary.current_streak
+        current = run + 1 if change.current in ATTENDED_STATUSES else 0
+        _assign(summary, (current, max(summary.longest_streak, current), change.session_id, change.session_date))
+    if stale:
+        expected = expected_streaks(pairs=stale)
+        for pair in stale:
+            _assign(summaries[pair], expected.get(pair, EMPTY_STREAK))
+
+    with transaction.atomic(savepoint=False):
+        EnrollmentAttendanceSummary.objects.bulk_update(
+            [summaries[pair] for pair in appended.keys() | stale],
+            STREAK_FIELDS,
+            batch_size=500,
+        )
+
+
+def expected_streaks(course_ids=None, pairs=None):
+    """Recalcula las rachas desde Attendance recorriendo las sesiones de cada curso."""
+    if pairs is not None and not pairs:
+        return {}
+    sessions = Session.objects.order_by('course_id', 'date', 'id')
+    attendances = Attendance.objects.all()
+    if pairs is not None:
+        sessions = sessions.filter(course_id__in={course_id for course_id, _ in pairs})
+        attendances = attendances.filter(_pairs_filter(pairs, 'session__course_id'))
+    elif course_ids:
+        sessions = sessions.filter(course_id__in=course_ids)
+        attendances = attendances.filter(session__course_id__in=course_ids)
+
+    by_course = defaultdict(list)
+    for course_id, session_id, session_date in sessions.values_list('course_id', 'id', 'date'):
+        by_course[course_id].append((session_id, session_date))
+    marked = defaultdict(dict)
+    for course_id, student_id, session_id, status in attendances.values_list(
+        'session__course_id', 'student_id', 'session_id', 'status',
+    ):
+        marked[(course_id, student_id)][session_id] = status
+
+    streaks = {}
+    for (course_id, student_id), statuses in marked.items():
+        run = longest = 0
+        for session_id, session_date in by_course[course_id]:
+            status = statuses.get(session_id)
+            run = run + 1 if status in ATTENDED_STATUSES else 0
+            longest = max(longest, run)
+            if status is not None:
+                streaks[(course_id, student_id)] = (run, longest, session_id, session_date)
+    return streaks
+
+
+@transaction.atomic
+def rebuild_streaks(course_ids=None):
+    """Corrige las rachas con deriva y retorna cuántas matrículas cambiaron."""
+    expected = expected_streaks(course_ids)
+    summaries = EnrollmentAttendanceSummary.objects.only('course_id', 'student_id', *STREAK_FIELDS)
+    if course_ids:
+        summaries = summaries.filter(course_id__in=course_ids)
+    drifted = []
+    for summary in summaries:
+        values = expected.get((summary.course_id, summary.student_id), EMPTY_STREAK)
+        if tuple(getattr(summary, field) for field in STREAK_FIELDS) != values:
+            _assign(summary, values)
+            drifted.append(summary)
+    EnrollmentAttendanceSummary.objects.bulk_update(drifted, STREAK_FIELDS, batch_size=500)
+    return len(drifted)
+
+
+def session_order_changed(course_id, update_fields=None, tail=None):
+    """Recalcula las rachas del curso al confirmar si el guardado pudo mover sus sesiones.
+
+    ``tail`` es ``(fecha, id)`` de la sesión creada o borrada; si al confirmar
+    no queda ninguna sesión después de ella, las rachas no cambian.
+    """
+    if update_fields is not None and 'date' not in update_fields:
+        return
+
+    def rebuild():
+        if tail is None or _sessions_after(course_id, *tail).exists():
+            rebuild_streaks([course_id])
+
+    transaction.on_commit(rebuild)
+
+
+def _sessions_after(course_id, session_date, session_id):
+    session_date = models.DateField().to_python(session_date)
+    return Session.objects.filter(course_id=course_id).filter(
+        Q(date__gt=session_date) | Q(date=session_date, id__gt=session_id),
+    )
+
+
+def _is_after(change, summary):
+    if summary.streak_session_id is None:
+        return True
+    return (change.session_date, change.session_id) > (summary.streak_session_date, summary.streak_session_id)
+
+
+def _broken_runs(appended, summaries):
+    """Matrículas con una sesión del curso entre su racha guardada y la nueva."""
+    spans = {
+        pair: (
+            change.course_id,
+            (summaries[pair].streak_session_date, summaries[pair].streak_session_id),
+            (change.session_date, change.session_id),
+        )
+        for pair, change in appended.items()
+        if summaries[pair].current_streak
+    }
+    if not spans:
+        return set()
+    # Una consulta por lote: en un llamado casi todos comparten el mismo tramo
+    between = reduce(or_, (
+        Q(course_id=course_id)
+        & (Q(date__gt=start[0]) | Q(date=start[0], id__gt=start[1]))
+        & (Q(date__lt=end[0]) | Q(date=end[0], id__lt=end[1]))
+        for course_id, start, end in set(spans.values())
+    ))
+    sessions = list(Session.objects.filter(between).values_list('course_id', 'date', 'id'))
+    return {
+        pair
+        for pair, (course_id, start, end) in spans.items()
+        if any(session_course == course_id and start < (day, session_id) < end for session_course, day, session_id in sessions)
+    }
+
+
+def _assign(summary, values):
+    for field, value in zip(STREAK_FIELDS, values):
+        setattr(summary, field, value)
+
+
+def _pairs_filter(pairs, course_field):
+    by_course = defaultdict(set)
+    for course_id, student_id in pairs:
+        by_course[course_id].add(student_id)
+    return reduce(or_, (
+        Q(**{course_field: course_id, 'student_id__in': student_ids})
+        for course_id, student_ids in by_course.items()
+    ))
@@ -0,0 +1,129 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from academic.models import Attendance, EnrollmentAttendanceSummary
+
+STATUS_FIELDS = {
+    'PRESENT': 'present',
+    'LATE': 'late',
+    'ABSENT': 'absent',
+    'EXCUSED': 'excused',
+}
+ATTENDED_STATUSES = ('PRESENT', 'LATE')
+COUNTER_FIELDS = tuple(STATUS_FIELDS.values())
+EMPTY_SUMMARY = (0, 0, 0, 0, None)
+
+
+def apply_summary_changes(changes):
+    """Aplica deltas a los resúmenes agrupando matrículas con el mismo cambio."""
+    deltas = defaultdict(Counter)
+    latest = {}
+    stale = defaultdict(set)
+    for change in changes:
+        key = (change.course_id, change.student_id)
+        if change.previous in STATUS_FIELDS:
+            deltas[key][STATUS_FIELDS[change.previous]] -= 1
+        if change.current in STATUS_FIELDS:
+            deltas[key][STATUS_FIELDS[change.current]] += 1
+        if change.current in ATTENDED_STATUSES:
+            latest[key] = max(latest.get(key, change.session_date), change.session_date)
+        elif change.previous in ATTENDED_STATUSES:
+            stale[change.course_id].add(change.student_id)
+
+    groups = defaultdict(list)
+    for key, delta in deltas.items():
+        signature = (key[0], tuple(sorted(item for item in delta.items() if item[1])), latest.get(key))
+        groups[signature].append(key[1])
+
+    with transaction.atomic(savepoint=False):
+        EnrollmentAttendanceSummary.objects.bulk_create(
+            [EnrollmentAttendanceSummary(course_id=course_id, student_id=student_id) for course_id, student_id in deltas],
+            ignore_conflicts=True,
+        )
+        for (course_id, delta, last_date), student_ids in groups.items():
+            values = {field: F(field) + amount for field, amount in delta}
+            if last_date:
+                values['last_attended_on'] = Greatest(
+                    Coalesce('last_attended_on', Value(last_date)),
+                    Value(last_date),
+                )
+            if values:
+                EnrollmentAttendanceSummary.objects.filter(
+                    course_id=course_id,
+                    student_id__in=student_ids,
+                ).update(**values)
+        for course_id, student_ids in stale.items():
+            _refresh_last_attended(course_id, student_ids)
+
+
+def _refresh_last_attended(course_id, student_ids):
+    last_date = Attendance.objects.filter(
+        session__course_id=OuterRef('course_id'),
+        student_id=OuterRef('student_id'),
+        status__in=ATTENDED_STATUSES,
+    ).order_by('-session__date').values('session__date')[:1]
+    EnrollmentAttendanceSummary.objects.filter(
+        course_id=course_id,
+        student_id__in=student_ids,
+    ).update(last_attended_on=Subquery(last_date))
+
+
+def expected_summaries(course_ids=None):
+    """Recalcula los resúmenes desde Attendance con una sola consulta agrupada."""
+    attendances = Attendance.objects.all()
+    if course_ids:
+        attendances = attendances.filter(session__course_id__in=course_ids)
+    rows = attendances.values('session__course_id', 'student_id').annotate(
+        **{field: Count('id', filter=Q(status=status)) for status, field in STATUS_FIELDS.items()},
+        last_attended_on=Max('session__date', filter=Q(status__in=ATTENDED_STATUSES)),
+    )
+    return {
+        (row['session__course_id'], row['student_id']): tuple(row[field] for field in COUNTER_FIELDS) + (row['last_attended_on'],)
+        for row in rows
+    }
+
+
+@transaction.atomic
+def rebuild_enrollment_summaries(course_ids=None, dry_run=False):
+    """Corrige la deriva de los resúmenes y retorna cuántas matrículas cambiaron."""
+    expected = expected_summaries(course_ids)
+    summaries = EnrollmentAttendanceSummary.objects.all()
+    if course_ids:
+        summaries = summaries.filter(course_id__in=course_ids)
+    current = dict(
+        ((row[0], row[1]), tuple(row[2:]))
+        for row in summaries.values_list('course_id', 'student_id', *COUNTER_FIELDS, 'last_attended_on')
+    )
+    drifted = {
+        key: expected.get(key, EMPTY_SUMMARY)
+        for key in expected.keys() | current.keys()
+        if current.get(key, EMPTY_SUMMARY) != expected.get(key, EMPTY_SUMMARY)
+    }
+    if dry_run or not drifted:
+        return len(drifted)
+
+    EnrollmentAttendanceSummary.objects.bulk_create(
+        [
+            EnrollmentAttendanceSummary(
+                course_id=course_id,
+                student_id=student_id,
+                **dict(zip(COUNTER_FIELDS + ('last_attended_on',), values)),
+            )
+            for (course_id, student_id), values in drifted.items()
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['course', 'student'],
+        update_fields=list(COUNTER_FIELDS) + ['last_attended_on'],
+    )
+    return len(drifted)
+
+
+def summaries_by_student(course, student_ids=None):
+    summaries = EnrollmentAttendanceSummary.objects.filter(course=course)
+    if student_ids is not None:
+        summaries = summaries.filter(student_id__in=student_ids)
+    return {item.student_id: item for item in summaries}
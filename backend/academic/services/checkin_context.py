@@ -0,0 +1,96 @@
+"""Contexto en caché de una ventana de auto-registro abierta.
+
+Durante la ráfaga de registros (todo el curso marcando en los mismos 30
+segundos) cada solicitud necesita los mismos datos: la semilla del código,
+la apertura y el cierre de la ventana y los estudiantes inscritos. Se leen
+una vez y se guardan en la caché compartida hasta que cierra la ventana, de
+modo que cada registro solo escribe su asistencia.
+
+La entrada se descarta cuando cambia la sesión (reabrir la ventana genera
+otra semilla), cuando se borra y cuando cambia la matrícula del curso.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from academic.models import Course, Session
+
+@dataclass(frozen=True)
+class CheckinContext:
+    session_id: int
+    course_id: int
+    session_date: date
+    seed: str
+    enabled: bool
+    opened_at: datetime | None
+    expires_at: datetime | None
+    student_ids: frozenset
+
+    @property
+    def is_open(self):
+        return bool(self.enabled and self.expires_at and self.expires_at > timezone.now())
+
+    def session(self):
+        """Sesión mínima para asociar la asistencia sin volver a leerla."""
+        return Session.from_db(
+            DEFAULT_DB_ALIAS,
+            ['id', 'course_id', 'date'],
+            [self.session_id, self.course_id, self.session_date],
+        )
+
+
+def checkin_context(session_id):
+    """Contexto de la sesión, desde la caché mientras la ventana siga abierta."""
+    key = _context_key(session_id)
+    context = cache.get(key)
+    if context is not None:
+        return context
+
+    row = Session.objects.filter(id=session_id).values_list(
+        'course_id', 'date', 'self_checkin_code', 'self_checkin_enabled',
+        'self_checkin_opened_at', 'self_checkin_expires_at',
+    ).first()
+    if row is None:
+        return None
+    course_id, session_date, seed, enabled, opened_at, expires_at = row
+    context = CheckinContext(
+        session_id=int(session_id),
+        course_id=course_id,
+        session_date=session_date,
+        seed=seed,
+        enabled=enabled,
+        opened_at=opened_at,
+        expires_at=expires_at,
+        student_ids=frozenset(
+            Course.students.through.objects.filter(course_id=course_id).values_list('user_id', flat=True)
+        ),
+    )
+    if context.is_open:
+        remaining = (context.expires_at - timezone.now()).total_seconds()
+        cache.add(key, context, max(1, int(remaining) + 1))
+    return context
+
+
+def forget_checkin_contexts(session_ids):
+    """Descarta los contextos; se repite al confirmar, como las versiones de curso."""
+    keys = [_context_key(session_id) for session_id in session_ids if session_id]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def forget_course_checkin_contexts(course_id):
+    """Descarta los contextos de las ventanas abiertas del curso."""
+    forget_checkin_contexts(Session.objects.filter(
+        course_id=course_id,
+        self_checkin_enabled=True,
+        self_checkin_expires_at__gt=timezone.now(),
+    ).values_list('id', flat=True))
+
+
+def _context_key(session_id):
+    return f'self_checkin:context:{session_id}'
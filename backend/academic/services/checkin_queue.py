@@ -0,0 +1,104 @@
+"""Escritura diferida de los auto-registros (``SELF_CHECKIN_WRITE_BEHIND``).
+
+En modo diferido cada auto-registro aceptado se guarda en ``PendingCheckin``
+(una fila por sesión y estudiante, sin efectos en los modelos de lectura) y
+la solicitud responde de inmediato. El volcado toma las filas pendientes de
+una sesión y las escribe en ``Attendance`` con un solo upsert, registrando
+los cambios como cualquier otra escritura.
+
+Las solicitudes de los estudiantes nunca vuelcan. Lo hace el worker
+``flush_pending_checkins --loop`` con ``flush_due_checkins``: cada sesión
+cuando su registro pendiente más antiguo cumple
+``SELF_CHECKIN_FLUSH_SECONDS`` o cuando su ventana cierra. También se vuelca
+antes de guardar el llamado del profesor (para que su decisión prevalezca).
+Mientras tanto ``session_attendance`` mezcla las filas pendientes con las
+guardadas.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from academic.models import Attendance, PendingCheckin, Session
+from academic.services.attendance_changes import AttendanceChange, record_attendance_changes
+from academic.services.course_cache import bump_course_versions
+from academic.services.live_events import publish_attendance_events
+
+
+def write_behind_enabled():
+    return settings.SELF_CHECKIN_WRITE_BEHIND
+
+
+def stage_checkin(context, student_id, status):
+    """Encola el auto-registro; repetirlo solo actualiza el estado pendiente."""
+    PendingCheckin.objects.bulk_create(
+        [PendingCheckin(session_id=context.session_id, student_id=student_id, status=status)],
+        update_conflicts=True,
+        unique_fields=['session', 'student'],
+        update_fields=['status'],
+    )
+    # El llamado en pantalla del profesor incluye las filas pendientes
+    bump_course_versions([context.course_id])
+    publish_attendance_events([AttendanceChange(
+        context.course_id, context.session_id, context.session_date, student_id, None, status,
+    )], pending=True)
+
+
+def flush_pending_checkins(session_ids=None):
+    """Vuelca las filas pendientes, una transacción y un upsert por sesión."""
+    pending = PendingCheckin.objects.all()
+    if session_ids is not None:
+        pending = pending.filter(session_id__in=session_ids)
+    flushed = 0
+    for session_id in pending.values_list('session_id', flat=True).distinct().order_by('session_id'):
+        flushed += _flush_session(session_id)
+    return flushed
+
+
+def flush_due_checkins():
+    """Vuelca las sesiones con registros pendientes vencidos o con la ventana cerrada."""
+    now = timezone.now()
+    due = PendingCheckin.objects.filter(
+        Q(created_at__lte=now - timedelta(seconds=settings.SELF_CHECKIN_FLUSH_SECONDS))
+        | Q(session__self_checkin_enabled=False)
+        | Q(session__self_checkin_expires_at__lte=now)
+    ).values_list('session_id', flat=True).distinct()
+    return flush_pending_checkins(list(due))
+
+
+def pending_statuses(course_id, day):
+    """Estados pendientes de la sesión del curso en la fecha, por estudiante."""
+    return dict(PendingCheckin.objects.filter(
+        session__course_id=course_id,
+        session__date=day,
+    ).values_list('student_id', 'status'))
+
+
+@transaction.atomic
+def _flush_session(session_id):
+    rows = list(PendingCheckin.objects.select_for_update().filter(session_id=session_id).values_list(
+        'id', 'student_id', 'status',
+    ))
+    if not rows:
+        return 0
+    course_id, session_date = Session.objects.filter(id=session_id).values_list('course_id', 'date').get()
+    existing = dict(Attendance.objects.filter(
+        session_id=session_id,
+        student_id__in=[student_id for _, student_id, _ in rows],
+    ).values_list('student_id', 'status'))
+    changed = [(student_id, status) for _, student_id, status in rows if existing.get(student_id) != status]
+    if changed:
+        Attendance.objects.bulk_create(
+            [Attendance(session_id=session_id, student_id=student_id, status=status) for student_id, status in changed],
+            update_conflicts=True,
+            unique_fields=['session', 'student'],
+            update_fields=['status'],
+        )
+        record_attendance_changes([
+            AttendanceChange(course_id, session_id, session_date, student_id, existing.get(student_id), status, Attendance.SELF_CHECKIN)
+            for student_id, status in changed
+        ])
+    PendingCheckin.objects.filter(id__in=[row_id for row_id, _, _ in rows]).delete()
+    return len(rows)
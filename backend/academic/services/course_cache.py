@@ -0,0 +1,56 @@
+"""Caché de respuestas de lectura por curso, invalidada por versión.
+
+Cada curso tiene un token de versión en la caché compartida. Toda escritura
+que afecta la asistencia del curso (llamado, auto-registro, excusas, sesiones,
+matrícula o edición del curso) lo rota, y las respuestas se guardan bajo
+``(endpoint, curso, versión, alcance)``: rotar el token deja obsoletas todas
+las entradas del curso sin tener que enumerarlas.
+
+Los datos de perfil del estudiante (nombre, foto, insignias) no rotan la
+versión; se refrescan al vencer ``COURSE_CACHE_SECONDS``.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+COURSE_CACHE_SECONDS = 600
+
+
+def bump_course_versions(course_ids):
+    course_ids = {course_id for course_id in course_ids if course_id}
+    if not course_ids:
+        return
+
+    def rotate():
+        cache.set_many({_version_key(course_id): uuid.uuid4().hex for course_id in course_ids}, None)
+
+    # Se rota de inmediato y otra vez al confirmar: una lectura concurrente que
+    # cachee datos previos al commit bajo el token intermedio queda descartada.
+    rotate()
+    transaction.on_commit(rotate)
+
+
+def course_version(course_id):
+    key = _version_key(course_id)
+    version = cache.get(key)
+    if version is None:
+        # Si la caché desalojó el token, se inicia uno nuevo en lugar de volver
+        # a un valor fijo que podría coincidir con respuestas antiguas.
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def cached_course_payload(endpoint, course_id, scope, build):
+    """Retorna la respuesta cacheada del endpoint o la construye con ``build``."""
+    key = f'course:{endpoint}:{course_id}:{course_version(course_id)}:{scope}'
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, COURSE_CACHE_SECONDS)
+    return payload
+
+
+def _version_key(course_id):
+    return f'course:version:{course_id}'
@@ -0,0 +1,235 @@
+"""Estadísticas del tablero principal con un número fijo de consultas por rol."""
+import uuid
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from academic.models import AtRiskEnrollment, Attendance, Course, EnrollmentAttendanceSummary, Session
+from gamification.models import BadgeSummary, CoursePoints
+
+User = get_user_model()
+
+DASHBOARD_CACHE_SECONDS = 300
+ADMIN_SCOPE = 'admin'
+WEEKDAY_CODES = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+
+
+def effective_role(user):
+    roles = user.roles or [user.role]
+    if 'ADMIN' in roles or user.is_superuser or 'COORDINATOR' in roles:
+        return 'ADMIN'
+    if 'TEACHER' in roles or 'PRACTICE_TEACHER' in roles:
+        return 'TEACHER'
+    return 'STUDENT'
+
+
+def dashboard_stats(user, year=None, period=None):
+    role = effective_role(user)
+    today = date.today()
+    scope = ADMIN_SCOPE if role == 'ADMIN' else user.id
+    key = f'dashboard:stats:{user.id}:{_version(scope)}:{year}:{period}:{today.isoformat()}'
+    payload = cache.get(key)
+    if payload is None:
+        builder = {'ADMIN': _admin_stats, 'TEACHER': _teacher_stats, 'STUDENT': _student_stats}[role]
+        payload = builder(user, _filter_period(year, period), today)
+        cache.set(key, payload, DASHBOARD_CACHE_SECONDS)
+    return payload
+
+
+def invalidate_dashboards(user_ids=(), course_ids=()):
+    """Invalida los tableros de los usuarios afectados al confirmar la transacción."""
+    scopes = {ADMIN_SCOPE, *user_ids}
+    if course_ids:
+        scopes.update(Course.objects.filter(id__in=course_ids).values_list('teacher_id', flat=True))
+    transaction.on_commit(
+        lambda: cache.set_many({_version_key(scope): uuid.uuid4().hex for scope in scopes}, None)
+    )
+
+
+def _version_key(scope):
+    return f'dashboard:version:{scope}'
+
+
+def _version(scope):
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def _filter_period(year, period):
+    filters = {}
+    if year:
+        filters['year'] = year
+    if period:
+        filters['period'] = period
+    return filters
+
+
+def _today_slot(course, today):
+    today_code = WEEKDAY_CODES[today.weekday()]
+    for slot in course.schedule or []:
+        if slot.get('day') == today_code:
+            return f"{slot.get('start')} - {slot.get('end')}"
+    return None
+
+
+def _today_rate(sessions):
+    totals = sessions.aggregate(
+        present=Sum('present_count'),
+        recorded=Sum('present_count') + Sum('late_count') + Sum('absent_count') + Sum('excused_count'),
+    )
+    if not totals['recorded']:
+        return 0
+    return round((totals['present'] / totals['recorded']) * 100, 1)
+
+
+def _student_stats(user, filters, today):
+    courses = list(
+        Course.objects.filter(students=user, **filters)
+        .select_related('teacher')
+        .annotate(
+            session_count=Count('sessions', distinct=True),
+            points=Coalesce(Subquery(
+                CoursePoints.objects.filter(course=OuterRef('pk'), student=user).values('points')[:1]
+            ), 0),
+        )
+    )
+    summaries = {
+        item.course_id: item
+        for item in EnrollmentAttendanceSummary.objects.filter(student=user, course__in=[c.id for c in courses])
+    }
+    at_risk = set(
+        AtRiskEnrollment.objects.filter(student=user, course__in=[c.id for c in courses])
+        .values_list('course_id', flat=True)
+    )
+    total_sessions = total_present = total_absent = total_late = excused = points = 0
+    today_classes = []
+    alerts = []
+    streaks = []
+    for course in courses:
+        summary = summaries.get(course.id) or EnrollmentAttendanceSummary()
+        total_sessions += course.session_count
+        total_present += summary.present
+        total_late += summary.late
+        total_absent += summary.absent
+        excused += summary.excused
+        points += course.points
+        streaks.append({
+            'course_id': course.id,
+            'course_name': course.name,
+            'current': summary.current_streak,
+            'longest': summary.longest_streak,
+        })
+        if course.id in at_risk:
+            alerts.append({'course_name': course.name, 'absences': summary.absent, 'limit': course.absence_threshold})
+        class_time = _today_slot(course, today)
+        if class_time:
+            today_classes.append({
+                'id': course.id,
+                'name': course.name,
+                'code': course.code,
+                'schedule': class_time,
+                'teacher': f"{course.teacher.first_name} {course.teacher.last_name}",
+                'all_schedules': course.schedule,
+            })
+
+    total_recorded = total_present + total_late + total_absent + excused
+    global_rate = round(((total_present + total_late + excused) / total_recorded) * 100, 1) if total_recorded > 0 else 0
+    recent = Attendance.objects.filter(
+        student=user,
+        session__course__in=[course.id for course in courses],
+    ).select_related('session', 'session__course').order_by('-session__date')[:8]
+    return {
+        'role': 'STUDENT',
+        'stats': {
+            'total_courses': len(courses),
+            'attendance_rate': global_rate,
+            'total_absences': total_absent,
+            'total_lates': total_late,
+            'total_present': total_present,
+            'total_recorded': total_recorded,
+            'points': points,
+            'stars': BadgeSummary.objects.filter(user=user).values_list('badge_count', flat=True).first() or 0,
+            'current_streak': max((item['current'] for item in streaks), default=0),
+            'longest_streak': max((item['longest'] for item in streaks), default=0),
+            'streaks': streaks,
+            'alerts': alerts,
+        },
+        'today_classes': today_classes,
+        'recent_attendance': [
+            {
+                'course_name': item.session.course.name,
+                'date': item.session.date.isoformat(),
+                'status': item.status,
+            }
+            for item in recent
+        ],
+    }
+
+
+def _admin_stats(user, filters, today):
+    courses = list(Course.objects.filter(**filters).select_related('teacher'))
+    users = User.objects.aggregate(
+        students=Count('id', filter=Q(role='STUDENT')),
+        teachers=Count('id', filter=Q(role='TEACHER')),
+    )
+    today_classes = []
+    for course in courses:
+        class_time = _today_slot(course, today)
+        if class_time:
+            today_classes.append({
+                'id': course.id,
+                'name': course.name,
+                'code': course.code,
+                'schedule': class_time,
+                'teacher': f"{course.teacher.first_name} {course.teacher.last_name}",
+                'all_schedules': course.schedule,
+            })
+    return {
+        'role': 'ADMIN',
+        'stats': {
+            'total_courses': len(courses),
+            'total_students': users['students'],
+            'total_teachers': users['teachers'],
+            'today_sessions': len(today_classes),
+            'today_attendance_rate': _today_rate(Session.objects.filter(date=today)),
+        },
+        'today_classes': today_classes,
+    }
+
+
+def _teacher_stats(user, filters, today):
+    courses = list(
+        Course.objects.filter(teacher=user, **filters)
+        .annotate(student_count=Count('students', distinct=True))
+    )
+    today_classes = []
+    for course in courses:
+        class_time = _today_slot(course, today)
+        if class_time:
+            today_classes.append({
+                'id': course.id,
+                'name': course.name,
+                'code': course.code,
+                'schedule': class_time,
+                'students_count': course.student_count,
+                'all_schedules': course.schedule,
+            })
+    today_sessions = Session.objects.filter(course__in=[course.id for course in courses], date=today)
+    return {
+        'role': 'TEACHER',
+        'stats': {
+            'total_courses': len(courses),
+            'total_students': sum(course.student_count for course in courses),
+            'today_sessions': len(today_classes),
+            'today_attendance_rate': _today_rate(today_sessions),
+        },
+        'today_classes': today_classes,
+    }
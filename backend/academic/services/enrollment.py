@@ -0,0 +1,28 @@
+"""Altas y bajas de estudiantes en cursos.
+
+Toda modificación de ``Course.students`` pasa por aquí para invalidar las
+cachés que dependen de la matrícula.
+"""
+from academic.services.at_risk import refresh_at_risk
+from academic.services.checkin_context import forget_course_checkin_contexts
+from academic.services.course_cache import bump_course_versions
+from academic.services.dashboard import invalidate_dashboards
+from academic.services.open_checkins import forget_student_courses
+
+
+def enroll_students(course, *students):
+    course.students.add(*students)
+    enrollment_changed(course, students)
+
+
+def unenroll_students(course, *students):
+    course.students.remove(*students)
+    enrollment_changed(course, students)
+
+
+def enrollment_changed(course, students):
+    refresh_at_risk({(course.id, student.id) for student in students})
+    invalidate_dashboards([student.id for student in students], [course.id])
+    bump_course_versions([course.id])
+    forget_course_checkin_contexts(course.id)
+    forget_student_courses([student.id for student in students])
@@ -0,0 +1,177 @@
+"""Exportación de la matriz estudiante × sesión en CSV y XLSX.
+
+Las filas salen de dos cursores ``.iterator()`` recorridos en el mismo orden
+(estudiantes y asistencias por apellido, nombre e id) y se escriben a medida
+que se leen: solo se guarda en memoria la lista de sesiones del curso y la
+fila del estudiante actual. El XLSX se arma como un ZIP que se transmite por
+partes (la hoja con cadenas en línea), sin libro en memoria ni archivo
+temporal.
+"""
+import csv
+import re
+import zipfile
+from itertools import groupby
+from operator import itemgetter
+from xml.sax.saxutils import escape
+
+from django.utils.text import slugify
+
+from academic.models import Attendance, Session
+
+EXPORT_CHUNK_SIZE = 2000
+STATUS_LABELS = dict(Attendance.STATUS_CHOICES)
+SUMMARY_HEADERS = ['Presentes', 'Retardos', 'Faltas', 'Excusas', '% Asistencia']
+XML_ILLEGAL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PACKAGE_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+# Partes mínimas de un libro con una hoja "Asistencia"
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        f'{_XML_DECLARATION}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        f'{_XML_DECLARATION}<Relationships xmlns="{_PACKAGE_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        f'{_XML_DECLARATION}<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+        '<sheets><sheet name="Asistencia" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        f'{_XML_DECLARATION}<Relationships xmlns="{_PACKAGE_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+XLSX_SHEET_START = f'{_XML_DECLARATION}<worksheet xmlns="{_MAIN_NS}"><sheetData>'
+XLSX_SHEET_END = '</sheetData></worksheet>'
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def course_matrix(course):
+    """Encabezado y una fila por estudiante matriculado, en orden alfabético."""
+    sessions = list(Session.objects.filter(course=course).order_by('date', 'id').values_list('id', 'date'))
+    session_ids = [session_id for session_id, _ in sessions]
+    yield ['Documento', 'Apellidos', 'Nombres', *[day.isoformat() for _, day in sessions], *SUMMARY_HEADERS]
+
+    students = course.students.order_by('last_name', 'first_name', 'id').values_list(
+        'id', 'document_number', 'last_name', 'first_name',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    attendances = Attendance.objects.filter(
+        session__course=course,
+        student__in=course.students.all(),
+    ).order_by('student__last_name', 'student__first_name', 'student_id').values_list(
+        'student_id', 'session_id', 'status',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    groups = groupby(attendances, key=itemgetter(0))
+    current = next(groups, None)
+
+    for student_id, document, last_name, first_name in students:
+        statuses = {}
+        if current and current[0] == student_id:
+            statuses = {session_id: status for _, session_id, status in current[1]}
+            current = next(groups, None)
+        counts = [sum(1 for value in statuses.values() if value == status) for status in STATUS_LABELS]
+        present, late, absent, excused = counts
+        rate = round((present + late + excused) / len(sessions) * 100, 1) if sessions else 0
+        yield [
+            document or '',
+            last_name,
+            first_name,
+            *[STATUS_LABELS.get(statuses.get(session_id), '') for session_id in session_ids],
+            present, late, absent, excused, rate,
+        ]
+
+
+def export_chunks(course, export_format):
+    rows = course_matrix(course)
+    if export_format == 'xlsx':
+        return _xlsx_chunks(rows)
+    return _csv_chunks(rows)
+
+
+def export_filename(course, export_format):
+    return f'asistencia_{course.code}_{slugify(course.name) or "curso"}.{export_format}'
+
+
+def archive_chunks(courses, export_format):
+    """ZIP con un archivo por curso, escrito y transmitido por partes."""
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for course in courses.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            with archive.open(export_filename(course, export_format), 'w', force_zip64=True) as entry:
+                for chunk in export_chunks(course, export_format):
+                    entry.write(chunk.encode() if isinstance(chunk, str) else chunk)
+                    yield from buffer.drain()
+    yield from buffer.drain()
+
+
+def _csv_chunks(rows):
+    writer = csv.writer(_Echo())
+    # BOM para que Excel abra el archivo con tildes correctas
+    yield '\ufeff'
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _xlsx_chunks(rows):
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as package:
+        for name, content in XLSX_PARTS.items():
+            package.writestr(name, content)
+        with package.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(XLSX_SHEET_START.encode())
+            for row in rows:
+                sheet.write(_xlsx_row(row).encode())
+                yield from buffer.drain()
+            sheet.write(XLSX_SHEET_END.encode())
+    yield from buffer.drain()
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            text = escape(XML_ILLEGAL_CHARS.sub('', str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row>{"".join(cells)}</row>'
+
+
+class _Echo:
+    """Pseudo-archivo para ``csv.writer``: retorna la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+class _StreamBuffer:
+    """Destino no posicionable para ``zipfile``; se vacía después de cada escritura."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
@@ -0,0 +1,153 @@
+"""Eventos de asistencia en vivo para las transmisiones SSE.
+
+Cada cambio de asistencia (y cada auto-registro en cola) se guarda como
+``AttendanceEvent``. Al confirmar la transacción se avisa a las conexiones
+abiertas del mismo proceso por un pub/sub en memoria; las de otros procesos
+(entre ellas las del servicio ASGI, que no recibe las escrituras de la API)
+lo leen en su siguiente consulta periódica a la tabla. En ambos casos se
+envían los eventos posteriores al último id transmitido, de modo que el
+aviso en memoria solo adelanta la lectura y ``Last-Event-ID`` permite
+retomar la transmisión sin perder eventos.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from academic.models import AttendanceEvent
+
+STREAM_SECONDS = 300
+POLL_SECONDS = 2
+HEARTBEAT_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+EVENT_RETENTION = timedelta(days=1)
+REORDER_GRACE = timedelta(seconds=5)
+EVENT_FIELDS = ('id', 'session_id', 'student_id', 'previous', 'status', 'pending')
+
+
+class _Broker:
+    """Suscripciones por curso de las conexiones abiertas en este proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, course_id):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=1))
+        with self._lock:
+            self._subscribers[course_id].add(subscriber)
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers[course_id].discard(subscriber)
+                if not self._subscribers[course_id]:
+                    del self._subscribers[course_id]
+
+        return subscriber[1], unsubscribe
+
+    def notify(self, course_ids):
+        with self._lock:
+            subscribers = [item for course_id in course_ids for item in self._subscribers.get(course_id, ())]
+        for loop, queue in subscribers:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_wake, queue)
+
+
+broker = _Broker()
+
+
+def publish_attendance_events(changes, pending=False):
+    """Registra los cambios como eventos y avisa al confirmar."""
+    AttendanceEvent.objects.bulk_create([
+        AttendanceEvent(
+            course_id=change.course_id,
+            session_id=change.session_id,
+            student_id=change.student_id,
+            previous=change.previous or '',
+            status=change.current or '',
+            pending=pending,
+        )
+        for change in changes
+    ])
+    course_ids = {change.course_id for change in changes}
+    transaction.on_commit(lambda: broker.notify(course_ids))
+    if cache.add('live_events:pruned', 1, 3600):
+        AttendanceEvent.objects.filter(created_at__lt=timezone.now() - EVENT_RETENTION).delete()
+
+
+def latest_event_id(course_id):
+    return AttendanceEvent.objects.filter(course_id=course_id).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def events_after(course_id, event_id, since=None, floor=0):
+    """Eventos posteriores al id; con ``since`` también los recientes desde ``floor``."""
+    after = Q(id__gt=event_id)
+    if since is not None:
+        after |= Q(id__gt=floor, created_at__gte=since)
+    return list(AttendanceEvent.objects.filter(after, course_id=course_id).order_by('id').values(*EVENT_FIELDS))
+
+
+def event_name(event):
+    return 'checkin' if event['pending'] or not event['previous'] else 'status'
+
+
+def stream_preamble():
+    return f'retry: {RETRY_MILLISECONDS}\n\n'
+
+
+def format_event(name, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {name}', f'data: {json.dumps(data, default=str)}']
+    return '\n'.join(lines) + '\n\n'
+
+
+async def follow_course(course_id, cursor, render):
+    """Transmite lo que ``render`` arme con cada lote de eventos nuevos.
+
+    Termina tras ``STREAM_SECONDS``; el cliente se reconecta con
+    ``Last-Event-ID`` y la transmisión sigue desde ahí.
+    """
+    queue, unsubscribe = broker.subscribe(course_id)
+    loop = asyncio.get_running_loop()
+    started = last_sent = loop.time()
+    floor = cursor
+    # Un id menor puede confirmarse después de uno mayor ya enviado: se releen
+    # los eventos recientes y se descartan los ya transmitidos.
+    recent = {}
+    try:
+        while True:
+            since = timezone.now() - REORDER_GRACE
+            recent = {event_id: sent_at for event_id, sent_at in recent.items() if sent_at >= since}
+            events = [
+                event for event in await sync_to_async(events_after)(course_id, cursor, since, floor)
+                if event['id'] not in recent
+            ]
+            if events:
+                cursor = max(cursor, events[-1]['id'])
+                recent.update((event['id'], timezone.now()) for event in events)
+                for chunk in await render(events):
+                    yield chunk
+                last_sent = loop.time()
+            elif loop.time() - last_sent >= HEARTBEAT_SECONDS:
+                yield ': ping\n\n'
+                last_sent = loop.time()
+            if loop.time() - started >= STREAM_SECONDS:
+                break
+            try:
+                await asyncio.wait_for(queue.get(), POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        unsubscribe()
+
+
+def _wake(queue):
+    if queue.empty():
+        queue.put_nowait(True)
@@ -0,0 +1,117 @@
+"""Progreso de misiones materializado por estudiante.
+
+Una misión queda completada (y su inventario desbloqueado) cuando el
+estudiante tiene una asistencia que cuenta (PRESENT o LATE) en el curso de
+la misión. Las escrituras de asistencia crean las filas de ``MissionProgress``
+de las misiones del curso y las borran cuando la matrícula se queda sin
+asistencias que cuenten; las misiones nuevas toman a quienes ya asistieron.
+Así el resumen del estudiante lee sus misiones completadas por índice.
+
+Los cursos con misiones se guardan en caché: las escrituras de asistencia de
+cursos sin misiones no consultan nada.
+"""
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from academic.models import EnrollmentAttendanceSummary, Mission, MissionProgress
+from academic.services.attendance_summary import ATTENDED_STATUSES
+
+ATTENDED_SUMMARY = Q(present__gt=0) | Q(late__gt=0)
+MISSION_COURSES_KEY = 'academic:mission_courses'
+MISSION_COURSES_CACHE_SECONDS = 3600
+
+
+def mission_course_ids():
+    course_ids = cache.get(MISSION_COURSES_KEY)
+    if course_ids is None:
+        course_ids = frozenset(Mission.objects.values_list('course_id', flat=True).distinct())
+        cache.set(MISSION_COURSES_KEY, course_ids, MISSION_COURSES_CACHE_SECONDS)
+    return course_ids
+
+
+def forget_mission_courses():
+    cache.delete(MISSION_COURSES_KEY)
+    transaction.on_commit(lambda: cache.delete(MISSION_COURSES_KEY))
+
+
+def apply_mission_progress_changes(changes):
+    """Completa o retira las misiones de las matrículas que tocaron los cambios."""
+    gained = defaultdict(set)
+    lost = defaultdict(set)
+    with_missions = mission_course_ids()
+    for change in changes:
+        if change.course_id not in with_missions:
+            continue
+        if change.current in ATTENDED_STATUSES:
+            gained[change.course_id].add(change.student_id)
+        elif change.previous in ATTENDED_STATUSES:
+            lost[change.course_id].add(change.student_id)
+
+    if not gained and not lost:
+        return
+    with transaction.atomic(savepoint=False):
+        if gained:
+            MissionProgress.objects.bulk_create(
+                [
+                    MissionProgress(mission_id=mission_id, student_id=student_id)
+                    for course_id, mission_id in Mission.objects.filter(course_id__in=gained).values_list('course_id', 'id')
+                    for student_id in gained[course_id]
+                ],
+                ignore_conflicts=True,
+            )
+        for course_id, student_ids in lost.items():
+            # El resumen ya tiene los cambios: se retira solo sin asistencias que cuenten
+            student_ids -= gained[course_id]
+            if not student_ids:
+                continue
+            emptied = EnrollmentAttendanceSummary.objects.filter(
+                course_id=course_id,
+                student_id__in=student_ids,
+            ).exclude(ATTENDED_SUMMARY).values_list('student_id', flat=True)
+            MissionProgress.objects.filter(mission__course_id=course_id, student_id__in=list(emptied)).delete()
+
+
+def backfill_mission_progress(mission):
+    """Marca la misión nueva como completada para quienes ya asistieron al curso."""
+    MissionProgress.objects.bulk_create(
+        [
+            MissionProgress(mission_id=mission.id, student_id=student_id)
+            for student_id in EnrollmentAttendanceSummary.objects.filter(
+                ATTENDED_SUMMARY,
+                course_id=mission.course_id,
+            ).values_list('student_id', flat=True)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+@transaction.atomic
+def rebuild_mission_progress(course_ids=None):
+    """Corrige el progreso desde los resúmenes y retorna cuántas filas cambiaron."""
+    missions = Mission.objects.all()
+    summaries = EnrollmentAttendanceSummary.objects.filter(ATTENDED_SUMMARY)
+    progress = MissionProgress.objects.all()
+    if course_ids:
+        missions = missions.filter(course_id__in=course_ids)
+        summaries = summaries.filter(course_id__in=course_ids)
+        progress = progress.filter(mission__course_id__in=course_ids)
+
+    attended = defaultdict(set)
+    for course_id, student_id in summaries.values_list('course_id', 'student_id'):
+        attended[course_id].add(student_id)
+    expected = {
+        (mission_id, student_id)
+        for course_id, mission_id in missions.values_list('course_id', 'id')
+        for student_id in attended[course_id]
+    }
+    current = {(row[1], row[2]): row[0] for row in progress.values_list('id', 'mission_id', 'student_id')}
+    stale = [current[key] for key in current.keys() - expected]
+    MissionProgress.objects.filter(id__in=stale).delete()
+    created = MissionProgress.objects.bulk_create(
+        [MissionProgress(mission_id=mission_id, student_id=student_id) for mission_id, student_id in expected - current.keys()],
+        batch_size=500,
+    )
+    return len(stale) + len(created)
@@ -5,7 +5,8 @@ import uuid
 from django.utils import timezone
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
-from academic.models import Attendance, Course, Mission, Session
+from academic.models import Attendance, Course, Mission, MissionProgress, Session
+from academic.services.course_cache import cached_course_payload
 
 IMAGE_TYPES = {'image/png', 'image/jpeg', 'image/jpg', 'image/webp'}
 IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}
@@ -13,6 +14,7 @@ RESOURCE_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'webp', 'doc', 'docx'}
 MAX_IMAGE_SIZE = 5 * 1024 * 1024
 MAX_RESOURCE_SIZE = 10 * 1024 * 1024
 YOUTUBE_RE = re.compile(r'^https?://(www\.)?(youtube\.com|youtu\.be)/.+', re.I)
+ONLINE_ENDPOINT = 'mission_online'
 
 
 def user_roles(user):
@@ -83,6 +85,11 @@ def latest_attendance_session(course):
 
 
 def present_students_for_course(course):
+    """Presentes de la sesión de hoy o la última, cacheados con la versión del curso."""
+    return cached_course_payload(ONLINE_ENDPOINT, course.id, timezone.localdate().isoformat(), lambda: _build_online(course))
+
+
+def _build_online(course):
     session = latest_attendance_session(course)
     if not session:
         return {'session_id': None, 'count': 0, 'students': []}
@@ -116,13 +123,12 @@ def student_mission_summary(student):
             'inventory': {'count': 0, 'items': []},
         }
 
-    attended_course_ids = set(Attendance.objects.filter(
+    completed_ids = set(MissionProgress.objects.filter(
         student=student,
-        session__course_id__in=[item.course_id for item in missions],
-        status__in=['PRESENT', 'LATE'],
-    ).values_list('session__course_id', flat=True).distinct())
+        mission_id__in=[item.id for item in missions],
+    ).values_list('mission_id', flat=True))
 
-    completed = [item for item in missions if item.course_id in attended_course_ids]
+    completed = [item for item in missions if item.id in completed_ids]
     inventory = [
         {
             'id': item.id,
@@ -0,0 +1,112 @@
+"""Registro en caché de las ventanas de auto-registro abiertas.
+
+Todas las apps de estudiante consultan ``my_open_checkins`` aunque en la
+institución solo haya unas pocas ventanas abiertas a la vez. El registro
+guarda esas ventanas por curso en la caché compartida y cada estudiante
+guarda sus cursos matriculados; la consulta se vuelve una intersección de
+conjuntos y solo va a la base de datos cuando hay ventanas en sus cursos.
+
+El registro se reconstruye con una consulta cuando falta: se descarta al
+abrir, cerrar o borrar una ventana, y vence con la primera ventana que
+cierra. Descartarlo en vez de editarlo evita perder aperturas simultáneas.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from academic.models import Course, Session
+from academic.services.course_cache import COURSE_CACHE_SECONDS
+
+REGISTRY_KEY = 'self_checkin:open_windows'
+SELF_CHECKIN_FIELDS = {
+    'self_checkin_enabled',
+    'self_checkin_code',
+    'self_checkin_opened_at',
+    'self_checkin_expires_at',
+}
+
+
+@dataclass(frozen=True)
+class OpenWindow:
+    session_id: int
+    course_id: int
+    course_name: str
+    session_date: date
+    expires_at: datetime
+
+
+def open_windows():
+    """Ventanas abiertas por curso: ``{course_id: [OpenWindow, ...]}``."""
+    registry = cache.get(REGISTRY_KEY)
+    if registry is None:
+        registry = {}
+        for window in Session.objects.filter(
+            self_checkin_enabled=True,
+            self_checkin_expires_at__gt=timezone.now(),
+        ).order_by('self_checkin_expires_at').values_list(
+            'id', 'course_id', 'course__name', 'date', 'self_checkin_expires_at',
+        ):
+            window = OpenWindow(*window)
+            registry.setdefault(window.course_id, []).append(window)
+        cache.add(REGISTRY_KEY, registry, _registry_timeout(registry))
+    now = timezone.now()
+    return {
+        course_id: [window for window in windows if window.expires_at > now]
+        for course_id, windows in registry.items()
+    }
+
+
+def student_open_windows(user_id):
+    """Ventanas abiertas en los cursos del estudiante, por hora de cierre."""
+    registry = open_windows()
+    if not any(registry.values()):
+        return []
+    windows = [
+        window
+        for course_id in registry.keys() & student_course_ids(user_id)
+        for window in registry[course_id]
+    ]
+    return sorted(windows, key=lambda window: window.expires_at)
+
+
+def student_course_ids(user_id):
+    key = _student_courses_key(user_id)
+    course_ids = cache.get(key)
+    if course_ids is None:
+        course_ids = frozenset(
+            Course.students.through.objects.filter(user_id=user_id).values_list('course_id', flat=True)
+        )
+        cache.set(key, course_ids, COURSE_CACHE_SECONDS)
+    return course_ids
+
+
+def forget_open_windows():
+    cache.delete(REGISTRY_KEY)
+    transaction.on_commit(lambda: cache.delete(REGISTRY_KEY))
+
+
+def session_saved(update_fields):
+    """Descarta el registro si el guardado pudo abrir o cerrar una ventana."""
+    if update_fields is None or SELF_CHECKIN_FIELDS & set(update_fields):
+        forget_open_windows()
+
+
+def forget_student_courses(user_ids):
+    keys = [_student_courses_key(user_id) for user_id in user_ids]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _registry_timeout(registry):
+    closes = [window.expires_at for windows in registry.values() for window in windows]
+    if not closes:
+        return COURSE_CACHE_SECONDS
+    return max(1, int((min(closes) - timezone.now()).total_seconds()) + 1)
+
+
+def _student_courses_key(user_id):
+    return f'self_checkin:student_courses:{user_id}'
@@ -0,0 +1,95 @@
+"""ETags de los endpoints que el frontend consulta durante la clase.
+
+Cada función valida el acceso con una sola consulta y arma la ETag con
+sellos de versión: el token de versión del curso (rotado por toda escritura
+de asistencia, excusa, sesión o matrícula) o los campos de la sesión abierta.
+Retornan ``None`` cuando la acción debe seguir su camino normal.
+
+Las ventanas de auto-registro incluyen una cuenta regresiva por segundo
+(``code_expires_in``); sus ETags son débiles y cambian con cada rotación
+del código.
+"""
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from academic.models import Course, Session
+from academic.serializers import AttendanceSessionQuerySerializer
+from academic.services.course_cache import course_version
+from academic.services.open_checkins import student_open_windows
+from academic.services.self_checkin import ROTATION_SECONDS, marked_session_ids
+from core.etags import make_etag
+
+
+def session_attendance_etag(view, request):
+    query = AttendanceSessionQuerySerializer(data=request.query_params)
+    if not query.is_valid():
+        return None
+    course_id, day = query.validated_data['course_id'], query.validated_data['date']
+    actor = view._actor(request.user)
+    enrolled = Course.students.through.objects.filter(course_id=OuterRef('pk'), user_id=request.user.id)
+    course = Course.objects.filter(id=course_id).values_list('teacher_id', Exists(enrolled)).first()
+    if not course:
+        return None
+    teacher_id, is_enrolled = course
+    if not (actor.puede_administrar(teacher_id) or ('STUDENT' in actor.roles and is_enrolled)):
+        return None
+    return make_etag('session_attendance', course_id, day.isoformat(), course_version(course_id))
+
+
+def pending_excuses_etag(view, request):
+    course_id = request.query_params.get('course_id')
+    if not str(course_id or '').isdigit():
+        return None
+    if not Course.objects.filter(id=course_id, teacher=request.user).exists():
+        return None
+    return make_etag('pending_excuses', course_id, course_version(course_id))
+
+
+def current_self_checkin_etag(view, request):
+    session_id = request.query_params.get('session_id')
+    if not str(session_id or '').isdigit():
+        return None
+    session = Session.objects.select_related('course').filter(id=session_id).first()
+    if not session or session.course.is_archived:
+        return None
+    roles = getattr(request.user, 'roles', None) or [getattr(request.user, 'role', '')]
+    can_manage = request.user.is_superuser or 'ADMIN' in roles or session.course.teacher_id == request.user.id
+    if not can_manage or not session.self_checkin_enabled or not session.self_checkin_expires_at:
+        return None
+    if session.self_checkin_expires_at <= timezone.now():
+        return None
+    return make_etag(
+        'current_self_checkin',
+        session.id,
+        session.self_checkin_code,
+        session.self_checkin_expires_at.isoformat(),
+        session.course.name,
+        _rotation_window(),
+        weak=True,
+    )
+
+
+def my_open_checkins_etag(view, request):
+    user = request.user
+    roles = getattr(user, 'roles', None) or [getattr(user, 'role', '')]
+    # Sin ventanas abiertas en sus cursos la respuesta es vacía y no consulta la base
+    windows = student_open_windows(user.id) if 'STUDENT' in roles else []
+    if not windows:
+        return make_etag('my_open_checkins', user.id, 'none', weak=True)
+    marked = marked_session_ids(user, [window.session_id for window in windows])
+    states = [
+        (window.session_id, window.course_name, window.expires_at.isoformat(), window.session_id in marked)
+        for window in windows
+    ]
+    return make_etag('my_open_checkins', user.id, states, _rotation_window(), weak=True)
+
+
+def online_students_etag(view, request, pk=None):
+    course_id = view.get_queryset().filter(pk=pk).values_list('course_id', flat=True).first()
+    if course_id is None:
+        return None
+    return make_etag('online_students', course_id, course_version(course_id), timezone.localdate().isoformat())
+
+
+def _rotation_window():
+    return int(timezone.now().timestamp() // ROTATION_SECONDS)
@@ -1,15 +1,23 @@
 import hashlib
 import hmac
+import json
 import random
 import string
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
-from academic.models import Attendance, Course, Session
+from academic.models import Attendance, Course, PendingCheckin, Session
+from academic.services.checkin_context import checkin_context
+from academic.services.checkin_queue import stage_checkin, write_behind_enabled
+from academic.services.open_checkins import student_open_windows
+from gamification.services.points import points_for
 
 ROTATION_SECONDS = 30
+SCHEDULE_SALT = 'academic.self_checkin.schedule'
 
 
 def open_self_checkin_for_teacher(user, course_id, minutes=10):
@@ -42,48 +50,102 @@ def get_self_checkin_for_teacher(user, session_id):
     return _teacher_payload(session)
 
 
+def get_self_checkin_schedule(user, session_id):
+    """Códigos de la ventana desde el actual hasta el cierre, firmados.
+
+    La pantalla del profesor rota el código localmente con esta lista y solo
+    la vuelve a pedir si se reabre la ventana. La verificación no cambia:
+    se aceptan el código vigente y el anterior.
+    """
+    session = Session.objects.select_related('course').get(id=session_id)
+    _get_manageable_course(user, session.course_id)
+    if not _is_open(session):
+        return None
+    last_window = int(session.self_checkin_expires_at.timestamp() // ROTATION_SECONDS)
+    local_zone = timezone.get_current_timezone()
+    schedule = {
+        'session_id': session.id,
+        'course': session.course.name,
+        'server_time': timezone.now().isoformat(),
+        'expires_at': session.self_checkin_expires_at.isoformat(),
+        'rotation_seconds': ROTATION_SECONDS,
+        'windows': [{
+            'starts_at': datetime.fromtimestamp(window * ROTATION_SECONDS, tz=local_zone).isoformat(),
+            'code': _window_code(session.id, session.self_checkin_code, window),
+        } for window in range(_current_window(), last_window + 1)],
+    }
+    schedule['signature'] = _schedule_signature(schedule)
+    return schedule
+
+
 def list_open_checkins_for_student(user):
     if not _has_role(user, 'STUDENT'):
         return []
 
-    sessions = Session.objects.filter(
-        course__students=user,
-        self_checkin_enabled=True,
-        self_checkin_expires_at__gt=timezone.now(),
-    ).select_related('course').order_by('self_checkin_expires_at')
-
-    marked_ids = set(Attendance.objects.filter(
-        student=user,
-        session_id__in=sessions.values_list('id', flat=True),
-    ).values_list('session_id', flat=True))
+    windows = student_open_windows(user.id)
+    if not windows:
+        return []
+    marked_ids = marked_session_ids(user, [window.session_id for window in windows])
 
     return [{
-        'session_id': session.id,
-        'course_id': session.course_id,
-        'course_name': session.course.name,
-        'date': session.date.isoformat(),
-        'expires_at': session.self_checkin_expires_at.isoformat(),
+        'session_id': window.session_id,
+        'course_id': window.course_id,
+        'course_name': window.course_name,
+        'date': window.session_date.isoformat(),
+        'expires_at': window.expires_at.isoformat(),
         'code_expires_in': _code_expires_in(),
-        'already_marked': session.id in marked_ids,
-    } for session in sessions]
+        'already_marked': window.session_id in marked_ids,
+    } for window in windows]
+
+
+def marked_session_ids(user, session_ids):
+    """Sesiones donde el estudiante ya marcó, guardadas o en cola."""
+    return set(Attendance.objects.filter(
+        student=user,
+        session_id__in=session_ids,
+    ).values_list('session_id', flat=True).union(PendingCheckin.objects.filter(
+        student=user,
+        session_id__in=session_ids,
+    ).values_list('session_id', flat=True)))
 
 
 def mark_student_self_checkin(user, session_id, code):
-    session = Session.objects.select_related('course').get(id=session_id)
-    if not session.course.students.filter(id=user.id).exists():
+    context = checkin_context(session_id)
+    if context is None:
+        raise Session.DoesNotExist
+    if user.id not in context.student_ids:
         return None, 'No estás inscrito en esta clase', 403, None
-    if not _is_open(session):
+    if not context.is_open:
         return None, 'La ventana de asistencia ya cerró', 400, None
-    if str(code or '').strip().upper() not in _valid_codes(session):
+    if str(code or '').strip().upper() not in _valid_codes(context.session_id, context.seed):
         return None, 'Código de asistencia inválido o vencido', 400, None
 
-    status = _status_for_checkin(session)
-    attendance, _ = Attendance.objects.update_or_create(
-        session=session,
-        student=user,
-        defaults={'status': status},
-    )
-    return attendance, None, None, _reward_for(user, attendance)
+    status = _status_for_checkin(context.opened_at)
+    if write_behind_enabled():
+        # Las insignias se otorgan al volcar la cola
+        stage_checkin(context, user.id, status)
+        return {'attendance_id': None, 'status': status, 'pending': True}, None, None, _reward_for(status, False)
+    attendance = _save_attendance(context, user, status)
+    result = {'attendance_id': attendance.id, 'status': attendance.status, 'pending': False}
+    return result, None, None, _reward_for(status, bool(attendance.awarded_badges))
+
+
+def _save_attendance(context, user, status):
+    attendance = Attendance(session=context.session(), student=user, status=status)
+    # La insignia de primera llegada a tiempo solo se gana auto-registrándose
+    attendance.change_source = Attendance.SELF_CHECKIN
+    try:
+        # En la ráfaga casi todos marcan por primera vez: se inserta sin leer antes
+        with transaction.atomic():
+            attendance.save(force_insert=True)
+            return attendance
+    except IntegrityError:
+        with transaction.atomic():
+            attendance = Attendance.objects.select_for_update().get(session_id=context.session_id, student=user)
+            attendance.status = status
+            attendance.change_source = Attendance.SELF_CHECKIN
+            attendance.save(update_fields=['status'])
+            return attendance
 
 
 def _get_manageable_course(user, course_id):
@@ -117,15 +179,35 @@ def _teacher_payload(session):
 
 
 def _current_code(session, offset=0):
-    window = int(timezone.now().timestamp() // ROTATION_SECONDS) + offset
-    raw = f'{session.id}:{session.self_checkin_code}:{window}'.encode()
+    return _code_for(session.id, session.self_checkin_code, offset)
+
+
+def _code_for(session_id, seed, offset=0):
+    return _window_code(session_id, seed, _current_window() + offset)
+
+
+def _window_code(session_id, seed, window):
+    raw = f'{session_id}:{seed}:{window}'.encode()
     secret = settings.SECRET_KEY.encode()
     digest = hmac.new(secret, raw, hashlib.sha256).hexdigest().upper()
     return ''.join(char for char in digest if char.isalnum())[:6]
 
 
-def _valid_codes(session):
-    return {_current_code(session), _current_code(session, -1)}
+def _current_window():
+    return int(timezone.now().timestamp() // ROTATION_SECONDS)
+
+
+def _schedule_signature(schedule):
+    body = json.dumps(
+        {key: value for key, value in schedule.items() if key != 'signature'},
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    return signing.Signer(salt=SCHEDULE_SALT).signature(body)
+
+
+def _valid_codes(session_id, seed):
+    return {_code_for(session_id, seed), _code_for(session_id, seed, -1)}
 
 
 def _code_expires_in():
@@ -133,45 +215,28 @@ def _code_expires_in():
     return ROTATION_SECONDS - elapsed
 
 
-def _status_for_checkin(session):
-    opened_at = session.self_checkin_opened_at or timezone.now()
+def _status_for_checkin(opened_at):
+    opened_at = opened_at or timezone.now()
     return 'PRESENT' if timezone.now() <= opened_at + timedelta(minutes=20) else 'LATE'
 
 
-def _reward_for(user, attendance):
-    if attendance.status == 'LATE':
+def _reward_for(status, badge_awarded):
+    if status == 'LATE':
         return {
             'title': 'Registro recibido',
             'message': 'Llegaste tarde, pero quedó registrado. Recupera ritmo en la próxima.',
             'icon': '⏰',
-            'points': 2,
-            'badge_awarded': False,
+            'points': points_for(status),
+            'badge_awarded': badge_awarded,
         }
     return {
         'title': '¡Asistencia confirmada!',
         'message': 'Llegaste a tiempo. Sumaste una estrella de asistencia.',
         'icon': '⭐',
-        'points': 10,
-        'badge_awarded': _award_first_badge(user),
+        'points': points_for(status),
+        'badge_awarded': badge_awarded,
     }
 
 
-def _award_first_badge(user):
-    try:
-        from gamification.models import Badge, UserBadge
-        badge, _ = Badge.objects.get_or_create(
-            name='Primera estrella',
-            defaults={
-                'description': 'Primera asistencia marcada a tiempo.',
-                'icon': 'star',
-                'criteria': 'first_on_time_checkin',
-            },
-        )
-        _, created = UserBadge.objects.get_or_create(user=user, badge=badge)
-        return created
-    except Exception:
-        return False
-
-
 def _seed():
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
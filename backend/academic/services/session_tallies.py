@@ -0,0 +1,56 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from academic.models import Attendance, Session
+
+TALLY_FIELDS = {
+    'PRESENT': 'present_count',
+    'LATE': 'late_count',
+    'ABSENT': 'absent_count',
+    'EXCUSED': 'excused_count',
+}
+
+
+def apply_session_tally_changes(changes):
+    deltas = defaultdict(Counter)
+    for change in changes:
+        if change.previous in TALLY_FIELDS:
+            deltas[change.session_id][TALLY_FIELDS[change.previous]] -= 1
+        if change.current in TALLY_FIELDS:
+            deltas[change.session_id][TALLY_FIELDS[change.current]] += 1
+    for session_id, delta in deltas.items():
+        values = {field: F(field) + amount for field, amount in delta.items() if amount}
+        if values:
+            Session.objects.filter(id=session_id).update(**values)
+
+
+def expected_tallies(course_ids=None):
+    attendances = Attendance.objects.all()
+    if course_ids:
+        attendances = attendances.filter(session__course_id__in=course_ids)
+    rows = attendances.values('session_id').annotate(
+        **{field: Count('id', filter=Q(status=status)) for status, field in TALLY_FIELDS.items()}
+    )
+    return {row['session_id']: tuple(row[field] for field in TALLY_FIELDS.values()) for row in rows}
+
+
+@transaction.atomic
+def check_session_tallies(course_ids=None, fix=False):
+    """Compara los conteos guardados con Attendance y retorna las sesiones con deriva."""
+    expected = expected_tallies(course_ids)
+    sessions = Session.objects.all()
+    if course_ids:
+        sessions = sessions.filter(course_id__in=course_ids)
+    empty = (0,) * len(TALLY_FIELDS)
+    drifted = []
+    for session in sessions.only('id', *TALLY_FIELDS.values()).iterator(chunk_size=500):
+        stored = tuple(getattr(session, field) for field in TALLY_FIELDS.values())
+        if stored != expected.get(session.id, empty):
+            for field, value in zip(TALLY_FIELDS.values(), expected.get(session.id, empty)):
+                setattr(session, field, value)
+            drifted.append(session)
+    if fix and drifted:
+        Session.objects.bulk_update(drifted, list(TALLY_FIELDS.values()), batch_size=500)
+    return [session.id for session in drifted]
@@ -0,0 +1,93 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from academic.models import Attendance, Course, DailyAttendanceRollup, Session
+from academic.services.analytics import month_starts
+from academic.services.attendance_rollups import backfill_rollups
+from academic.services.session_tallies import check_session_tallies
+
+User = get_user_model()
+
+
+class AdminAnalyticsRollupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='analytics-admin', role='ADMIN')
+        self.client.force_authenticate(self.admin)
+        self.today = date.today()
+
+    def _course_with_attendance(self, index, statuses):
+        teacher = User.objects.create_user(username=f'analytics-teacher-{index}', role='TEACHER')
+        course = Course.objects.create(teacher=teacher, name=f'Curso {index}', code=f'ANL{index:03d}')
+        session = Session.objects.create(course=course, date=self.today)
+        for position, status in enumerate(statuses):
+            student = User.objects.create_user(username=f'analytics-{index}-{position}', role='STUDENT')
+            course.students.add(student)
+            Attendance.objects.create(session=session, student=student, status=status)
+        return course
+
+    def _analytics(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/academic/dashboard/admin-analytics/')
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def test_rollups_feed_kpis_series_and_rankings(self):
+        self._course_with_attendance(1, ['PRESENT', 'ABSENT'])
+        best = self._course_with_attendance(2, ['PRESENT', 'PRESENT'])
+
+        payload, _ = self._analytics()
+
+        self.assertEqual(payload['kpis']['today_present'], 3)
+        self.assertEqual(payload['kpis']['today_absent'], 1)
+        self.assertEqual(payload['kpis']['today_attendance_rate'], 75.0)
+        self.assertEqual(payload['charts']['monthly_attendance'][-1]['total'], 4)
+        self.assertEqual(len(payload['charts']['monthly_attendance']), 6)
+        self.assertEqual(payload['charts']['top_courses'][0]['code'], best.code)
+        self.assertEqual(payload['charts']['top_courses'][0]['students'], 2)
+        self.assertEqual(payload['charts']['teacher_performance'][0]['attendance_rate'], 100.0)
+        self.assertEqual(payload['system']['total_db_records']['attendance_records'], 4)
+
+    def test_query_count_does_not_grow_with_courses_or_students(self):
+        self._course_with_attendance(1, ['PRESENT', 'ABSENT', 'ABSENT'])
+        _, before = self._analytics()
+        for index in range(2, 8):
+            self._course_with_attendance(index, ['LATE', 'ABSENT', 'PRESENT'])
+        _, after = self._analytics()
+        self.assertEqual(before, after)
+
+    def test_backfill_command_rebuilds_rollups(self):
+        course = self._course_with_attendance(1, ['PRESENT', 'LATE'])
+        DailyAttendanceRollup.objects.all().delete()
+
+        call_command('backfill_attendance_rollups', stdout=StringIO())
+
+        rollup = DailyAttendanceRollup.objects.get(course=course, date=self.today)
+        self.assertEqual((rollup.present, rollup.late, rollup.recorded), (1, 1, 2))
+
+    def test_deleting_a_marked_student_leaves_rollups_and_tallies_clean(self):
+        course = self._course_with_attendance(1, ['PRESENT', 'ABSENT'])
+        present = Attendance.objects.get(session__course=course, status='PRESENT').student
+
+        self.assertEqual(self.client.delete(f'/api/users/{present.id}/').status_code, 204)
+
+        rollup = DailyAttendanceRollup.objects.get(course=course, date=self.today)
+        self.assertEqual((rollup.present, rollup.absent, rollup.recorded), (0, 1, 1))
+        self.assertEqual(backfill_rollups(), 0)
+        self.assertEqual(check_session_tallies(), [])
+        payload, _ = self._analytics()
+        self.assertEqual(payload['kpis']['today_present'], 0)
+
+    def test_month_starts_cover_year_boundaries(self):
+        self.assertEqual(
+            month_starts(date(2026, 2, 15)),
+            [date(2025, 9, 1), date(2025, 10, 1), date(2025, 11, 1),
+             date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1)],
+        )
@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from academic.models import AtRiskEnrollment, Course
+from users.models import Faculty, Program
+
+User = get_user_model()
+
+
+class AtRiskEnrollmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='risk-admin', role='ADMIN')
+        self.teacher = User.objects.create_user(username='risk-teacher', role='TEACHER')
+        self.other_teacher = User.objects.create_user(username='risk-other', role='TEACHER')
+        faculty = Faculty.objects.create(name='Educación', code='EDU')
+        self.program = Program.objects.create(name='Recreación', code='REC', faculty=faculty)
+        self.student = User.objects.create_user(username='risk-student', role='STUDENT', program=self.program)
+        self.course = Course.objects.create(teacher=self.teacher, name='Riesgo', code='RSK01')
+        self.other_course = Course.objects.create(teacher=self.other_teacher, name='Otro', code='RSK02')
+        self.course.students.add(self.student)
+        self.other_course.students.add(self.student)
+
+    def _roll_call(self, course, day, status):
+        self.client.force_authenticate(course.teacher)
+        response = self.client.post('/api/academic/attendance/bulk_create/', {
+            'course_id': course.id,
+            'date': day,
+            'attendances': [{'student_id': self.student.id, 'status': status}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def _flagged(self, course=None):
+        return AtRiskEnrollment.objects.filter(course=course or self.course, student=self.student).exists()
+
+    def test_index_follows_threshold_in_both_directions(self):
+        for day in ('2026-08-01', '2026-08-02'):
+            self._roll_call(self.course, day, 'ABSENT')
+        self.assertFalse(self._flagged())
+
+        self._roll_call(self.course, '2026-08-03', 'ABSENT')
+        self.assertTrue(self._flagged())
+
+        self._roll_call(self.course, '2026-08-03', 'PRESENT')
+        self.assertFalse(self._flagged())
+
+    def test_course_threshold_and_enrollment_changes_refresh_index(self):
+        for day in ('2026-08-01', '2026-08-02'):
+            self._roll_call(self.course, day, 'ABSENT')
+
+        self.client.force_authenticate(self.teacher)
+        response = self.client.patch(f'/api/academic/courses/{self.course.id}/', {'absence_threshold': 2}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self._flagged())
+
+        stats = self.client.get(f'/api/academic/courses/{self.course.id}/attendance_stats/').json()
+        self.assertEqual(stats['alert_count'], 1)
+        self.assertEqual(stats['students_with_alerts'][0]['absences'], 2)
+
+        self.client.force_authenticate(self.admin)
+        overview = self.client.get(f'/api/academic/courses/student-overview/{self.student.id}/').json()
+        in_alert = {item['course_id']: item['in_alert'] for item in overview['courses']}
+        self.assertEqual(in_alert, {self.course.id: True, self.other_course.id: False})
+
+        self.client.delete(f'/api/academic/courses/{self.course.id}/remove_student/', {'user_id': self.student.id})
+        self.assertFalse(self._flagged())
+
+    def test_endpoint_is_scoped_filtered_and_paginated(self):
+        Course.objects.filter(id__in=[self.course.id, self.other_course.id]).update(absence_threshold=1)
+        self._roll_call(self.course, '2026-08-01', 'ABSENT')
+        self._roll_call(self.other_course, '2026-08-01', 'ABSENT')
+
+        self.client.force_authenticate(self.teacher)
+        payload = self.client.get('/api/academic/at-risk/').json()
+        self.assertEqual(payload['count'], 1)
+        self.assertEqual(payload['results'][0]['course_code'], 'RSK01')
+        self.assertEqual(payload['results'][0]['threshold'], 1)
+
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get('/api/academic/at-risk/').json()['count'], 2)
+        filtered = self.client.get(f'/api/academic/at-risk/?teacher={self.other_teacher.id}&program={self.program.id}')
+        self.assertEqual(filtered.json()['count'], 1)
+        self.assertEqual(self.client.get('/api/academic/at-risk/?faculty=999').json()['count'], 0)
+        self.assertEqual(self.client.get('/api/academic/at-risk/?course=abc').status_code, 400)
+
+        analytics = self.client.get('/api/academic/dashboard/admin-analytics/').json()
+        self.assertEqual(analytics['kpis']['at_risk_students'], 1)
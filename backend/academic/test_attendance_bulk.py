@@ -0,0 +1,116 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from academic.models import Attendance, Course, Session
+from modulos.asistencia.aplicacion import RegistrarAsistenciaUseCase
+from modulos.asistencia.dominio import ActorAsistencia
+from modulos.asistencia.infraestructura import DjangoAsistenciaRepository
+
+User = get_user_model()
+
+
+class BulkAttendanceWriteTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='bulk-teacher', role='TEACHER')
+        self.course = Course.objects.create(teacher=self.teacher, name='Roll call', code='BULK01')
+        self.actor = ActorAsistencia.crear(usuario_id=self.teacher.id, roles=['TEACHER'])
+        self.client = APIClient()
+
+    def _roster(self, size, prefix):
+        students = User.objects.bulk_create([
+            User(username=f'{prefix}-{index}', role='STUDENT', roles=['STUDENT'])
+            for index in range(size)
+        ])
+        self.course.students.add(*students)
+        return students
+
+    def _register(self, students, status, day):
+        return RegistrarAsistenciaUseCase(DjangoAsistenciaRepository()).ejecutar(
+            actor=self.actor,
+            curso_id=self.course.id,
+            fecha=day,
+            asistencias=[{'student_id': item.id, 'status': status} for item in students],
+        )
+
+    def test_endpoint_reports_created_updated_and_unchanged_rows(self):
+        first, second = self._roster(2, 'counts')
+        self.client.force_authenticate(self.teacher)
+        endpoint = '/api/academic/attendance/bulk_create/'
+        payload = {
+            'course_id': self.course.id,
+            'date': '2026-08-10',
+            'attendances': [
+                {'student_id': first.id, 'status': 'PRESENT'},
+                {'student_id': second.id, 'status': 'PRESENT'},
+            ],
+        }
+
+        created = self.client.post(endpoint, payload, format='json')
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual((created.data['created'], created.data['updated'], created.data['unchanged']), (2, 0, 0))
+
+        payload['attendances'][1]['status'] = 'ABSENT'
+        updated = self.client.post(endpoint, payload, format='json')
+        self.assertEqual((updated.data['created'], updated.data['updated'], updated.data['unchanged']), (0, 1, 1))
+        self.assertEqual(Attendance.objects.get(student=second).status, 'ABSENT')
+        self.assertEqual(Attendance.objects.count(), 2)
+
+    def test_query_count_does_not_grow_with_roster_size(self):
+        small = self._roster(3, 'small')
+        large = self._roster(45, 'large')
+
+        with CaptureQueriesContext(connection) as small_create:
+            self._register(small, 'PRESENT', date(2026, 8, 11))
+        with CaptureQueriesContext(connection) as large_create:
+            self._register(large, 'PRESENT', date(2026, 8, 12))
+        with CaptureQueriesContext(connection) as small_update:
+            self._register(small, 'LATE', date(2026, 8, 11))
+        with CaptureQueriesContext(connection) as large_update:
+            result = self._register(large, 'LATE', date(2026, 8, 12))
+
+        self.assertEqual(len(small_create), len(large_create))
+        self.assertEqual(len(small_update), len(large_update))
+        self.assertEqual(result.actualizados, 45)
+        self.assertEqual(Attendance.objects.filter(status='LATE').count(), 48)
+
+    def test_unchanged_roll_call_skips_the_write(self):
+        students = self._roster(5, 'same')
+        self._register(students, 'PRESENT', date(2026, 8, 13))
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self._register(students, 'PRESENT', date(2026, 8, 13))
+
+        self.assertEqual(result.sin_cambios, 5)
+        self.assertFalse(any('INSERT' in item['sql'] or 'UPDATE' in item['sql'] for item in queries))
+
+    def test_row_created_in_parallel_is_read_back_as_previous_status(self):
+        student, = self._roster(1, 'race')
+        day = date(2026, 8, 14)
+        real_select_for_update = Attendance.objects.select_for_update
+        reads = []
+
+        def select_for_update():
+            # Simula un auto-registro que llega entre la primera lectura y el INSERT
+            if reads:
+                return real_select_for_update()
+            session = Session.objects.get(course=self.course, date=day)
+            reads.append(list(real_select_for_update().filter(session=session).values_list('student_id', 'status')))
+            Attendance.objects.create(session=session, student=student, status='PRESENT')
+            stale = MagicMock()
+            stale.filter.return_value.values_list.return_value = reads[0]
+            return stale
+
+        with patch.object(Attendance.objects, 'select_for_update', side_effect=select_for_update):
+            with patch('modulos.asistencia.infraestructura.repositorios.record_attendance_changes') as record:
+                result = self._register([student], 'ABSENT', day)
+
+        change, = record.call_args.args[0]
+        self.assertEqual((change.previous, change.current), ('PRESENT', 'ABSENT'))
+        self.assertEqual((result.creados, result.actualizados), (0, 1))
+        self.assertEqual(Attendance.objects.get(student=student).status, 'ABSENT')
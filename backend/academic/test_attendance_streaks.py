@@ -0,0 +1,142 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from academic.models import Course, EnrollmentAttendanceSummary, Session
+from academic.services.attendance_streaks import STREAK_FIELDS, expected_streaks
+
+User = get_user_model()
+
+
+class AttendanceStreakTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='streak-teacher', role='TEACHER')
+        self.ana = User.objects.create_user(username='streak-ana', first_name='Ana', role='STUDENT')
+        self.beto = User.objects.create_user(username='streak-beto', first_name='Beto', role='STUDENT')
+        self.course = Course.objects.create(teacher=self.teacher, name='Rachas', code='STK01')
+        self.course.students.add(self.ana, self.beto)
+
+    def _roll_call(self, day, statuses):
+        self.client.force_authenticate(self.teacher)
+        response = self.client.post('/api/academic/attendance/bulk_create/', {
+            'course_id': self.course.id,
+            'date': day,
+            'attendances': [{'student_id': student.id, 'status': status} for student, status in statuses],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def _streak(self, student):
+        summary = EnrollmentAttendanceSummary.objects.get(course=self.course, student=student)
+        return summary.current_streak, summary.longest_streak
+
+    def _assert_matches_history(self):
+        stored = {
+            (row[0], row[1]): tuple(row[2:])
+            for row in EnrollmentAttendanceSummary.objects.filter(course=self.course).values_list(
+                'course_id', 'student_id', *STREAK_FIELDS,
+            )
+        }
+        expected = expected_streaks([self.course.id])
+        self.assertEqual(stored, {key: expected.get(key, (0, 0, None, None)) for key in stored})
+
+    def test_new_sessions_extend_or_reset_the_streak(self):
+        self._roll_call('2026-08-03', [(self.ana, 'PRESENT'), (self.beto, 'PRESENT')])
+        self._roll_call('2026-08-04', [(self.ana, 'LATE'), (self.beto, 'ABSENT')])
+        self._roll_call('2026-08-05', [(self.ana, 'PRESENT'), (self.beto, 'PRESENT')])
+        self.assertEqual((self._streak(self.ana), self._streak(self.beto)), ((3, 3), (1, 1)))
+
+        # Beto no tiene estado el 6: la sesión cuenta como corte
+        self._roll_call('2026-08-06', [(self.ana, 'EXCUSED')])
+        self._roll_call('2026-08-07', [(self.ana, 'PRESENT'), (self.beto, 'PRESENT')])
+        self.assertEqual((self._streak(self.ana), self._streak(self.beto)), ((1, 3), (1, 1)))
+        self._assert_matches_history()
+
+    def test_appending_a_session_does_not_read_the_history(self):
+        for day in ('2026-08-03', '2026-08-04', '2026-08-05'):
+            self._roll_call(day, [(self.ana, 'PRESENT'), (self.beto, 'LATE')])
+        self.client.force_authenticate(self.teacher)
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            self._roll_call('2026-08-06', [(self.ana, 'PRESENT'), (self.beto, 'PRESENT')])
+        history_reads = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'ORDER BY "academic_session"."course_id" ASC' in query['sql']
+        ]
+        self.assertEqual(history_reads, [])
+        self.assertEqual((self._streak(self.ana), self._streak(self.beto)), ((4, 4), (4, 4)))
+
+    def test_retroactive_edits_and_deleted_sessions_recompute_the_enrollment(self):
+        for day in ('2026-08-03', '2026-08-04', '2026-08-05', '2026-08-06'):
+            self._roll_call(day, [(self.ana, 'PRESENT'), (self.beto, 'PRESENT')])
+        self._roll_call('2026-08-04', [(self.ana, 'ABSENT'), (self.beto, 'PRESENT')])
+        self.assertEqual((self._streak(self.ana), self._streak(self.beto)), ((2, 2), (4, 4)))
+
+        deleted = self.client.delete(
+            f'/api/academic/attendance/delete_session/?course_id={self.course.id}&date=2026-08-04'
+        )
+        self.assertEqual(deleted.status_code, 200)
+        self.assertEqual((self._streak(self.ana), self._streak(self.beto)), ((3, 3), (3, 3)))
+
+        self.client.delete(f'/api/academic/attendance/delete_session/?course_id={self.course.id}&date=2026-08-06')
+        self.assertEqual(self._streak(self.ana), (2, 2))
+        self._assert_matches_history()
+
+    def test_sessions_inserted_between_others_recompute_the_course(self):
+        for day in ('2026-08-03', '2026-08-05'):
+            self._roll_call(day, [(self.ana, 'PRESENT'), (self.beto, 'PRESENT')])
+        self.assertEqual((self._streak(self.ana), self._streak(self.beto)), ((2, 2), (2, 2)))
+
+        # La sesión del 4 solo registra a Ana: corta la racha de Beto sin tocar su matrícula
+        with self.captureOnCommitCallbacks(execute=True):
+            self._roll_call('2026-08-04', [(self.ana, 'PRESENT')])
+        self.assertEqual((self._streak(self.ana), self._streak(self.beto)), ((3, 3), (1, 1)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/academic/attendance/delete_session/?course_id={self.course.id}&date=2026-08-04')
+        self.assertEqual((self._streak(self.ana), self._streak(self.beto)), ((2, 2), (2, 2)))
+        self._assert_matches_history()
+
+    def test_appends_check_the_sessions_in_between_against_the_database(self):
+        for day in ('2026-08-03', '2026-08-04'):
+            self._roll_call(day, [(self.ana, 'PRESENT'), (self.beto, 'PRESENT')])
+        # Una sesión que este proceso no vio crear (otro contenedor, carga masiva)
+        Session.objects.bulk_create([Session(course=self.course, date='2026-08-05')])
+
+        self._roll_call('2026-08-06', [(self.ana, 'PRESENT'), (self.beto, 'LATE')])
+        self.assertEqual((self._streak(self.ana), self._streak(self.beto)), ((1, 2), (1, 2)))
+        self._roll_call('2026-08-07', [(self.ana, 'PRESENT')])
+        self.assertEqual(self._streak(self.ana), (2, 2))
+        self._assert_matches_history()
+
+    def test_rebuild_command_repairs_streaks(self):
+        self._roll_call('2026-08-03', [(self.ana, 'PRESENT')])
+        self._roll_call('2026-08-04', [(self.ana, 'PRESENT')])
+        EnrollmentAttendanceSummary.objects.filter(student=self.ana).update(current_streak=9, longest_streak=1)
+
+        output = StringIO()
+        call_command('rebuild_attendance_summaries', stdout=output)
+        self.assertIn('1 rachas', output.getvalue())
+        self.assertEqual(self._streak(self.ana), (2, 2))
+
+    def test_streaks_are_exposed_in_the_report_and_dashboard(self):
+        self._roll_call('2026-08-03', [(self.ana, 'PRESENT'), (self.beto, 'ABSENT')])
+        self._roll_call('2026-08-04', [(self.ana, 'LATE'), (self.beto, 'PRESENT')])
+
+        report = self.client.get(f'/api/academic/courses/{self.course.id}/student_report/').json()
+        self.assertEqual(
+            {row['first_name']: (row['current_streak'], row['longest_streak']) for row in report},
+            {'Ana': (2, 2), 'Beto': (1, 1)},
+        )
+        self.client.force_authenticate(self.ana)
+        stats = self.client.get('/api/academic/dashboard/stats/').json()['stats']
+        self.assertEqual((stats['current_streak'], stats['longest_streak']), (2, 2))
+        self.assertEqual(stats['streaks'], [
+            {'course_id': self.course.id, 'course_name': 'Rachas', 'current': 2, 'longest': 2},
+        ])
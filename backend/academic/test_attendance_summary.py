@@ -0,0 +1,117 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from academic.models import Attendance, Course, EnrollmentAttendanceSummary, Session
+
+User = get_user_model()
+
+
+class EnrollmentAttendanceSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='summary-teacher', role='TEACHER')
+        self.student = User.objects.create_user(username='summary-student', role='STUDENT')
+        self.course = Course.objects.create(teacher=self.teacher, name='Resúmenes', code='SUM01')
+        self.course.students.add(self.student)
+        self.client.force_authenticate(self.teacher)
+
+    def _roll_call(self, day, status, students=None):
+        return self.client.post('/api/academic/attendance/bulk_create/', {
+            'course_id': self.course.id,
+            'date': day,
+            'attendances': [
+                {'student_id': item.id, 'status': status}
+                for item in students or [self.student]
+            ],
+        }, format='json')
+
+    def _summary(self, student=None):
+        return EnrollmentAttendanceSummary.objects.get(course=self.course, student=student or self.student)
+
+    def test_roll_call_and_corrections_keep_counts_in_sync(self):
+        self._roll_call('2026-08-01', 'PRESENT')
+        self._roll_call('2026-08-02', 'ABSENT')
+        summary = self._summary()
+        self.assertEqual((summary.present, summary.absent), (1, 1))
+        self.assertEqual(summary.last_attended_on, date(2026, 8, 1))
+
+        self._roll_call('2026-08-02', 'LATE')
+        summary = self._summary()
+        self.assertEqual((summary.present, summary.late, summary.absent), (1, 1, 0))
+        self.assertEqual(summary.last_attended_on, date(2026, 8, 2))
+
+        self._roll_call('2026-08-02', 'ABSENT')
+        self.assertEqual(self._summary().last_attended_on, date(2026, 8, 1))
+
+    def test_excuse_approval_and_session_delete_update_counts(self):
+        self._roll_call('2026-08-03', 'ABSENT')
+        attendance = Attendance.objects.get(student=self.student)
+        self.client.post('/api/academic/attendance/review_excuse/', {
+            'attendance_id': attendance.id,
+            'decision': 'APPROVED',
+        }, format='json')
+        summary = self._summary()
+        self.assertEqual((summary.absent, summary.excused), (0, 1))
+
+        deleted = self.client.delete(
+            f'/api/academic/attendance/delete_session/?course_id={self.course.id}&date=2026-08-03'
+        )
+        self.assertEqual(deleted.status_code, 200)
+        self.assertEqual(self._summary().recorded, 0)
+
+    def test_self_checkin_updates_summary(self):
+        opened = self.client.post(
+            '/api/academic/attendance/open_self_checkin/',
+            {'course_id': self.course.id},
+            format='json',
+        )
+        self.client.force_authenticate(self.student)
+        self.client.post('/api/academic/attendance/self_checkin/', {
+            'session_id': opened.data['session_id'],
+            'code': opened.data['code'],
+        }, format='json')
+        self.assertEqual(self._summary().present, 1)
+
+    def test_rebuild_command_repairs_drift(self):
+        self._roll_call('2026-08-04', 'PRESENT')
+        EnrollmentAttendanceSummary.objects.filter(student=self.student).update(present=7, absent=2)
+
+        output = StringIO()
+        call_command('rebuild_attendance_summaries', '--dry-run', stdout=output)
+        self.assertIn('1 resúmenes', output.getvalue())
+        self.assertEqual(self._summary().present, 7)
+
+        call_command('rebuild_attendance_summaries', stdout=StringIO())
+        summary = self._summary()
+        self.assertEqual((summary.present, summary.absent), (1, 0))
+
+    def test_report_and_alerts_do_not_query_per_student(self):
+        session = Session.objects.create(course=self.course, date='2026-08-05')
+        Attendance.objects.create(session=session, student=self.student, status='ABSENT')
+
+        def measure(endpoint):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(endpoint)
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        report = f'/api/academic/courses/{self.course.id}/student_report/'
+        stats = f'/api/academic/courses/{self.course.id}/attendance_stats/'
+        before = (measure(report), measure(stats))
+        others = User.objects.bulk_create([
+            User(username=f'summary-extra-{index}', role='STUDENT', roles=['STUDENT'])
+            for index in range(12)
+        ])
+        self.course.students.add(*others)
+        self._roll_call('2026-08-06', 'ABSENT', others)
+
+        self.assertEqual(before, (measure(report), measure(stats)))
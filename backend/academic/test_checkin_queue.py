@@ -0,0 +1,117 @@
+import io
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from academic.models import Attendance, Course, EnrollmentAttendanceSummary, PendingCheckin, Session
+from academic.services.checkin_queue import flush_due_checkins, flush_pending_checkins
+from users.models import User
+
+
+@override_settings(SELF_CHECKIN_WRITE_BEHIND=True)
+class WriteBehindCheckinTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='queue-teacher', role='TEACHER')
+        self.course = Course.objects.create(teacher=self.teacher, name='Cola', code='QUE01')
+        self.students = [
+            User.objects.create_user(username=f'queue-student-{index}', role='STUDENT')
+            for index in range(3)
+        ]
+        self.course.students.add(*self.students)
+        self.client.force_authenticate(self.teacher)
+        self.opened = self.client.post(
+            '/api/academic/attendance/open_self_checkin/', {'course_id': self.course.id}, format='json',
+        ).data
+
+    def _check_in(self, student):
+        self.client.force_authenticate(student)
+        return self.client.post(
+            '/api/academic/attendance/self_checkin/',
+            {'session_id': self.opened['session_id'], 'code': self.opened['code']},
+            format='json',
+        )
+
+    def _session_attendance(self):
+        self.client.force_authenticate(self.teacher)
+        return self.client.get('/api/academic/attendance/session_attendance/', {
+            'course_id': self.course.id,
+            'date': timezone.localdate().isoformat(),
+        }).data
+
+    def test_checkin_is_staged_idempotently_and_visible_to_the_teacher(self):
+        student = self.students[0]
+        first = self._check_in(student)
+        second = self._check_in(student)
+
+        for response in (first, second):
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNone(response.data['attendance_id'])
+            self.assertEqual(response.data['status'], 'PRESENT')
+            self.assertTrue(response.data['pending'])
+        self.assertEqual(PendingCheckin.objects.count(), 1)
+        self.assertFalse(Attendance.objects.exists())
+        self.assertEqual(self._session_attendance(), {str(student.id): 'PRESENT'})
+
+        self.client.force_authenticate(student)
+        available = self.client.get('/api/academic/attendance/my_open_checkins/')
+        self.assertTrue(available.data[0]['already_marked'])
+
+    def test_flush_upserts_each_session_in_one_statement(self):
+        for student in self.students:
+            with self.captureOnCommitCallbacks(execute=True):
+                self._check_in(student)
+        # La solicitud del estudiante no vuelca, ni siquiera al confirmar
+        self.assertEqual(PendingCheckin.objects.count(), 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(flush_pending_checkins(), 3)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "academic_attendance"')]
+        self.assertEqual(len(inserts), 1)
+
+        self.assertFalse(PendingCheckin.objects.exists())
+        self.assertEqual(Session.objects.get(id=self.opened['session_id']).present_count, 3)
+        self.assertEqual(EnrollmentAttendanceSummary.objects.filter(course=self.course, present=1).count(), 3)
+        self.assertEqual(set(self._session_attendance().values()), {'PRESENT'})
+
+    @override_settings(SELF_CHECKIN_FLUSH_SECONDS=60)
+    def test_worker_flushes_sessions_when_due_or_closed(self):
+        self._check_in(self.students[0])
+        self.assertEqual(flush_due_checkins(), 0)
+
+        PendingCheckin.objects.update(created_at=timezone.now() - timedelta(seconds=61))
+        self._check_in(self.students[1])
+        self.assertEqual(flush_due_checkins(), 2)
+
+        self._check_in(self.students[2])
+        self.assertEqual(flush_due_checkins(), 0)
+        Session.objects.filter(id=self.opened['session_id']).update(self_checkin_expires_at=timezone.now())
+        self.assertEqual(flush_due_checkins(), 1)
+        self.assertEqual(Attendance.objects.filter(status='PRESENT').count(), 3)
+
+    def test_teacher_call_list_overrides_pending_checkins(self):
+        student = self.students[0]
+        self._check_in(student)
+        self.client.force_authenticate(self.teacher)
+        response = self.client.post('/api/academic/attendance/bulk_create/', {
+            'course_id': self.course.id,
+            'date': timezone.localdate().isoformat(),
+            'attendances': [{'student_id': student.id, 'status': 'ABSENT'}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(PendingCheckin.objects.exists())
+        self.assertEqual(Attendance.objects.get(student=student).status, 'ABSENT')
+
+    def test_management_command_flushes_every_session(self):
+        for student in self.students:
+            self._check_in(student)
+        call_command('flush_pending_checkins', stdout=io.StringIO())
+        self.assertEqual(Attendance.objects.filter(status='PRESENT').count(), 3)
@@ -0,0 +1,116 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from academic.models import Attendance, Course, Session
+
+User = get_user_model()
+
+
+class CourseResponseCacheMixin:
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='cache-teacher', role='TEACHER')
+        self.student = User.objects.create_user(username='cache-student', role='STUDENT', roles=['STUDENT'])
+        self.course = Course.objects.create(teacher=self.teacher, name='Caché', code='CCH01')
+        self.course.students.add(self.student)
+        self.client.force_authenticate(self.teacher)
+        self.endpoints = {
+            'history': f'/api/academic/courses/{self.course.id}/attendance_history/',
+            'report': f'/api/academic/courses/{self.course.id}/student_report/',
+            'stats': f'/api/academic/courses/{self.course.id}/attendance_stats/',
+            'sessions': f'/api/academic/attendance/course_sessions/?course_id={self.course.id}',
+            'session': f'/api/academic/attendance/session_attendance/?course_id={self.course.id}&date=2026-09-01',
+        }
+
+    def _get(self, name):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.endpoints[name])
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def _roll_call(self, status):
+        self.client.force_authenticate(self.teacher)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/academic/attendance/bulk_create/', {
+                'course_id': self.course.id,
+                'date': '2026-09-01',
+                'attendances': [{'student_id': self.student.id, 'status': status}],
+            }, format='json')
+
+    def test_repeated_reads_are_served_from_cache(self):
+        self._roll_call('PRESENT')
+        for name in self.endpoints:
+            first, cold = self._get(name)
+            second, warm = self._get(name)
+            self.assertEqual(first, second)
+            self.assertLess(warm, cold, name)
+
+    def test_writes_rotate_the_course_version(self):
+        self._roll_call('PRESENT')
+        self.assertEqual(self._get('history')[0][0]['present'], 1)
+        self.assertEqual(self._get('session')[0], {str(self.student.id): 'PRESENT'})
+
+        self._roll_call('ABSENT')
+        self.assertEqual(self._get('history')[0][0]['absent'], 1)
+        self.assertEqual(self._get('session')[0], {str(self.student.id): 'ABSENT'})
+
+        self.assertEqual(self._get('report')[0][0]['pending_excuses'], [])
+        self.assertEqual(self._get('stats')[0]['total_students'], 1)
+        self.assertEqual(len(self._get('sessions')[0]), 1)
+
+        self.client.force_authenticate(self.student)
+        attendance = Attendance.objects.get(student=self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/academic/attendance/submit_excuse/', {
+                'attendance_id': attendance.id,
+                'excuse_note': 'Cita médica',
+            })
+        self.client.force_authenticate(self.teacher)
+        report, _ = self._get('report')
+        self.assertEqual(len(report[0]['pending_excuses']), 1)
+
+        other = User.objects.create_user(username='cache-other', role='STUDENT')
+        admin = User.objects.create_user(username='cache-admin', role='ADMIN')
+        self.client.force_authenticate(admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/academic/courses/{self.course.id}/add_student/', {'user_id': other.id})
+        self.client.force_authenticate(self.teacher)
+        self.assertEqual(self._get('stats')[0]['total_students'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Session.objects.get(course=self.course).delete()
+        self.assertEqual(self._get('sessions')[0], [])
+
+
+class DatabaseCourseResponseCacheTests(CourseResponseCacheMixin, TestCase):
+    cache_settings = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'test_course_cache',
+        }
+    }
+
+    def setUp(self):
+        self.override = override_settings(CACHES=self.cache_settings)
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+        call_command('createcachetable', verbosity=0)
+        super().setUp()
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(prefix='course-cache-'),
+    }
+})
+class FileCourseResponseCacheTests(CourseResponseCacheMixin, TestCase):
+    pass
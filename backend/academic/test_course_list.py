@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from academic.models import Course
+
+User = get_user_model()
+
+
+class LeanCourseListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='list-admin', role='ADMIN')
+        self.teacher = User.objects.create_user(username='list-teacher', role='TEACHER')
+        self.courses = [
+            Course.objects.create(teacher=self.teacher, name=f'Curso {index}', code=f'LST{index:02d}')
+            for index in range(3)
+        ]
+
+    def _enroll(self, count, prefix):
+        students = User.objects.bulk_create([
+            User(username=f'{prefix}-{index}', role='STUDENT', first_name=f'Nombre{index}', last_name=f'Apellido{index:03d}')
+            for index in range(count)
+        ])
+        for course in self.courses:
+            course.students.add(*students)
+        return students
+
+    def _list(self):
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/academic/courses/')
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(response.content), len(queries)
+
+    def test_list_size_and_queries_do_not_grow_with_enrollment(self):
+        self._enroll(10, 'few')
+        payload, size, queries = self._list()
+        self.assertNotIn('students', payload[0])
+        self.assertEqual(payload[0]['student_count'], 10)
+
+        self._enroll(40, 'many')
+        payload, more_size, more_queries = self._list()
+        self.assertEqual(payload[0]['student_count'], 50)
+        self.assertEqual(queries, more_queries)
+        self.assertEqual(size, more_size)
+
+    def test_students_see_the_full_enrollment_count(self):
+        students = self._enroll(3, 'viewer')
+        self.client.force_authenticate(students[0])
+        response = self.client.get('/api/academic/courses/')
+        self.assertEqual([course['student_count'] for course in response.json()], [3, 3, 3])
+
+    def test_detail_keeps_nested_students(self):
+        self._enroll(2, 'detail')
+        self.client.force_authenticate(self.teacher)
+        response = self.client.get(f'/api/academic/courses/{self.courses[0].id}/')
+        self.assertEqual(len(response.json()['students']), 2)
+
+    def test_roster_is_cursor_paginated_and_searchable(self):
+        self._enroll(5, 'roster')
+        self.client.force_authenticate(self.teacher)
+        url = f'/api/academic/courses/{self.courses[0].id}/roster/'
+
+        first = self.client.get(url, {'page_size': 2}).json()
+        self.assertEqual([item['last_name'] for item in first['results']], ['Apellido000', 'Apellido001'])
+        seen = [item['id'] for item in first['results']]
+        next_url = first['next']
+        while next_url:
+            page = self.client.get(next_url).json()
+            seen.extend(item['id'] for item in page['results'])
+            next_url = page['next']
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), 5)
+
+        found = self.client.get(url, {'search': 'apellido003'}).json()
+        self.assertEqual([item['first_name'] for item in found['results']], ['Nombre3'])
+
+        outsider = User.objects.create_user(username='roster-outsider', role='TEACHER')
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get('/api/academic/courses/').json(), [])
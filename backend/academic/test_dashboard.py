@@ -0,0 +1,88 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from academic.models import Course
+
+User = get_user_model()
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='dash-teacher', role='TEACHER')
+        self.student = User.objects.create_user(username='dash-student', role='STUDENT')
+        self.today_code = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN'][date.today().weekday()]
+
+    def _course(self, index):
+        course = Course.objects.create(
+            teacher=self.teacher,
+            name=f'Curso {index}',
+            code=f'DSH{index:03d}',
+            schedule=[{'day': self.today_code, 'start': '08:00', 'end': '10:00'}],
+        )
+        course.students.add(self.student)
+        return course
+
+    def _roll_call(self, course, day, status):
+        self.client.force_authenticate(self.teacher)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/academic/attendance/bulk_create/', {
+                'course_id': course.id,
+                'date': day,
+                'attendances': [{'student_id': self.student.id, 'status': status}],
+            }, format='json')
+
+    def _stats(self, user):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/academic/dashboard/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def test_query_plan_is_independent_of_course_count(self):
+        course = self._course(0)
+        self._roll_call(course, '2026-08-01', 'PRESENT')
+        cache.clear()
+        _, student_queries = self._stats(self.student)
+        _, teacher_queries = self._stats(self.teacher)
+
+        for index in range(1, 6):
+            self._roll_call(self._course(index), '2026-08-01', 'ABSENT')
+        cache.clear()
+        student_payload, more_student_queries = self._stats(self.student)
+        teacher_payload, more_teacher_queries = self._stats(self.teacher)
+
+        self.assertEqual(student_queries, more_student_queries)
+        self.assertEqual(teacher_queries, more_teacher_queries)
+        self.assertEqual(student_payload['stats']['total_courses'], 6)
+        self.assertEqual(student_payload['stats']['total_absences'], 5)
+        self.assertEqual(len(student_payload['today_classes']), 6)
+        self.assertEqual(teacher_payload['stats']['total_students'], 6)
+
+    def test_cached_stats_are_invalidated_by_attendance_and_enrollment(self):
+        course = self._course(0)
+        self._stats(self.student)
+        _, cached_queries = self._stats(self.student)
+        self.assertEqual(cached_queries, 0)
+
+        for day in ('2026-08-02', '2026-08-03', '2026-08-04'):
+            self._roll_call(course, day, 'ABSENT')
+        payload, _ = self._stats(self.student)
+        self.assertEqual(payload['stats']['total_absences'], 3)
+        self.assertEqual(payload['stats']['alerts'][0]['absences'], 3)
+
+        admin = User.objects.create_user(username='dash-admin', role='ADMIN')
+        self.client.force_authenticate(admin)
+        other = self._course(1)
+        other.students.remove(self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/academic/courses/{other.id}/add_student/', {'user_id': self.student.id})
+        payload, _ = self._stats(self.student)
+        self.assertEqual(payload['stats']['total_courses'], 2)
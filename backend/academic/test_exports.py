@@ -0,0 +1,101 @@
+import csv
+import io
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from academic.models import Attendance, Course, Session
+
+User = get_user_model()
+
+
+class CourseExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='export-teacher', role='TEACHER')
+        self.course = Course.objects.create(teacher=self.teacher, name='Didáctica', code='EXP01', year=2026, period=1)
+        self.ana = User.objects.create_user(username='export-ana', role='STUDENT', first_name='Ana', last_name='Bernal', document_number='100')
+        self.luis = User.objects.create_user(username='export-luis', role='STUDENT', first_name='Luis', last_name='Álvarez', document_number='200')
+        self.course.students.add(self.ana, self.luis)
+        first = Session.objects.create(course=self.course, date='2026-03-02')
+        second = Session.objects.create(course=self.course, date='2026-03-09')
+        Attendance.objects.create(session=first, student=self.ana, status='PRESENT')
+        Attendance.objects.create(session=second, student=self.ana, status='ABSENT')
+        Attendance.objects.create(session=first, student=self.luis, status='LATE')
+        self.client.force_authenticate(self.teacher)
+
+    def _download(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv_streams_student_by_session_matrix(self):
+        content = self._download(f'/api/academic/courses/{self.course.id}/export/', format='csv')
+        rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+
+        self.assertEqual(rows[0][:5], ['Documento', 'Apellidos', 'Nombres', '2026-03-02', '2026-03-09'])
+        by_document = {row[0]: row for row in rows[1:]}
+        self.assertEqual(by_document['100'][3:], ['Presente', 'Falta', '1', '0', '1', '0', '50.0'])
+        self.assertEqual(by_document['200'][3:], ['Retardo', '', '0', '1', '0', '0', '50.0'])
+
+    def test_xlsx_uses_the_same_matrix(self):
+        content = self._download(f'/api/academic/courses/{self.course.id}/export/', format='xlsx')
+        sheet = load_workbook(io.BytesIO(content), read_only=True)['Asistencia']
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][-1], '% Asistencia')
+        by_document = {row[0]: row for row in rows[1:]}
+        self.assertEqual(by_document['200'][1:5], ('Álvarez', 'Luis', 'Retardo', ''))
+        self.assertEqual(by_document['100'][5:], (1, 0, 1, 0, 50.0))
+
+    def test_query_count_does_not_depend_on_course_size(self):
+        url = f'/api/academic/courses/{self.course.id}/export/'
+
+        def measure():
+            with CaptureQueriesContext(connection) as queries:
+                self._download(url, format='csv')
+            return len(queries)
+
+        before = measure()
+        others = User.objects.bulk_create([
+            User(username=f'export-extra-{index}', role='STUDENT', last_name=f'Zz{index}')
+            for index in range(30)
+        ])
+        self.course.students.add(*others)
+        session = Session.objects.create(course=self.course, date='2026-03-16')
+        Attendance.objects.bulk_create([Attendance(session=session, student=item, status='ABSENT') for item in others])
+        self.assertEqual(before, measure())
+
+    def test_admin_archive_contains_every_course_of_the_period(self):
+        Course.objects.create(teacher=self.teacher, name='Otra', code='EXP02', year=2026, period=1)
+        Course.objects.create(teacher=self.teacher, name='Fuera', code='EXP03', year=2026, period=2)
+        admin = User.objects.create_user(username='export-admin', role='ADMIN')
+
+        self.assertEqual(self.client.get('/api/academic/courses/export-archive/', {'year': 2026, 'period': 1}).status_code, 403)
+
+        self.client.force_authenticate(admin)
+        content = self._download('/api/academic/courses/export-archive/', year=2026, period=1, format='xlsx')
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        names = sorted(archive.namelist())
+        self.assertEqual(names, ['asistencia_EXP01_didactica.xlsx', 'asistencia_EXP02_otra.xlsx'])
+
+        # Cada libro del archivo abre completo en openpyxl (no solo en modo lectura)
+        workbook = load_workbook(io.BytesIO(archive.read(names[0])))
+        self.assertEqual(workbook.sheetnames, ['Asistencia'])
+        sheet = workbook['Asistencia']
+        self.assertEqual((sheet.max_row, sheet.max_column), (3, 10))
+        self.assertEqual([sheet.cell(1, column).value for column in (1, 4, 5, 10)], ['Documento', '2026-03-02', '2026-03-09', '% Asistencia'])
+        rows = {row[0]: row for row in sheet.iter_rows(min_row=2, values_only=True)}
+        self.assertEqual(rows['100'], ('100', 'Bernal', 'Ana', 'Presente', 'Falta', 1, 0, 1, 0, 50))
+        self.assertEqual(rows['200'][3:], ('Retardo', '', 0, 1, 0, 0, 50))
+
+    def test_students_cannot_export(self):
+        self.client.force_authenticate(self.ana)
+        response = self.client.get(f'/api/academic/courses/{self.course.id}/export/', {'format': 'csv'})
+        self.assertEqual(response.status_code, 403)
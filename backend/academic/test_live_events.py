@@ -0,0 +1,117 @@
+import json
+from datetime import date
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, Client, TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from academic.models import Attendance, AttendanceEvent, Course, Mission, Session
+from users.models import User
+
+
+def _auth(user, **headers):
+    return {'Authorization': f'Bearer {AccessToken.for_user(user)}', **headers}
+
+
+async def _next_event(stream):
+    async for chunk in stream:
+        text = chunk.decode()
+        if text.startswith(':'):
+            return {'event': 'heartbeat'}
+        fields = dict(line.split(': ', 1) for line in text.strip().splitlines())
+        if 'event' in fields:
+            return {'id': int(fields['id']), 'event': fields['event'], 'data': json.loads(fields['data'])}
+    return None
+
+
+@mock.patch('academic.services.live_events.POLL_SECONDS', 0.05)
+class LiveFeedTests(TestCase):
+    def setUp(self):
+        self.client = AsyncClient()
+        self.teacher = User.objects.create_user(username='live-teacher', role='TEACHER')
+        self.other_teacher = User.objects.create_user(username='live-other', role='TEACHER')
+        self.student = User.objects.create_user(username='live-student', role='STUDENT')
+        self.classmate = User.objects.create_user(username='live-classmate', role='STUDENT')
+        self.course = Course.objects.create(teacher=self.teacher, name='En vivo', code='LIV01')
+        self.course.students.add(self.student, self.classmate)
+        self.session = Session.objects.create(course=self.course, date=date.today())
+        self.url = f'/api/academic/attendance/live/?session_id={self.session.id}'
+
+    def _mark(self, student, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.update_or_create(session=self.session, student=student, defaults={'status': status})
+
+    async def test_teacher_gets_a_snapshot_then_checkins_and_status_changes(self):
+        response = await self.client.get(self.url, headers=_auth(self.teacher))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+
+        snapshot = await _next_event(stream)
+        self.assertEqual((snapshot['event'], snapshot['data']['statuses']), ('snapshot', {}))
+
+        await sync_to_async(self._mark)(self.student, 'PRESENT')
+        checkin = await _next_event(stream)
+        self.assertEqual(checkin['event'], 'checkin')
+        self.assertEqual((checkin['data']['student_id'], checkin['data']['status']), (self.student.id, 'PRESENT'))
+
+        await sync_to_async(self._mark)(self.student, 'LATE')
+        change = await _next_event(stream)
+        self.assertEqual(change['event'], 'status')
+        self.assertEqual((change['data']['previous'], change['data']['status']), ('PRESENT', 'LATE'))
+        self.assertGreater(change['id'], checkin['id'])
+        await stream.aclose()
+
+    async def test_reconnect_replays_events_after_last_event_id(self):
+        await sync_to_async(self._mark)(self.student, 'PRESENT')
+        await sync_to_async(self._mark)(self.classmate, 'ABSENT')
+        first_id = await AttendanceEvent.objects.filter(student_id=self.student.id).values_list('id', flat=True).aget()
+
+        response = await self.client.get(self.url, headers=_auth(self.teacher, **{'Last-Event-ID': str(first_id)}))
+        stream = response.streaming_content
+        replayed = await _next_event(stream)
+        self.assertEqual((replayed['event'], replayed['data']['student_id']), ('checkin', self.classmate.id))
+        await stream.aclose()
+
+    async def test_heartbeats_keep_idle_streams_open(self):
+        with mock.patch('academic.services.live_events.HEARTBEAT_SECONDS', 0):
+            response = await self.client.get(self.url, headers=_auth(self.teacher))
+            stream = response.streaming_content
+            await _next_event(stream)
+            self.assertEqual(await _next_event(stream), {'event': 'heartbeat'})
+            await stream.aclose()
+
+    async def test_only_the_course_manager_can_follow_a_session(self):
+        self.assertEqual((await self.client.get(self.url)).status_code, 401)
+        self.assertEqual((await self.client.get(self.url, headers=_auth(self.other_teacher))).status_code, 404)
+        self.assertEqual((await self.client.get(self.url, headers=_auth(self.student))).status_code, 404)
+
+    async def test_students_follow_online_classmates_of_a_mission(self):
+        mission = await Mission.objects.acreate(course=self.course, name='Reto en vivo')
+        url = f'/api/academic/missions/{mission.id}/online-students/live/'
+        outsider = await User.objects.acreate(username='live-outsider', role='STUDENT')
+        self.assertEqual((await self.client.get(url, headers=_auth(outsider))).status_code, 404)
+
+        response = await self.client.get(url, headers=_auth(self.student))
+        stream = response.streaming_content
+        initial = await _next_event(stream)
+        self.assertEqual((initial['event'], initial['data']['count']), ('online', 0))
+
+        await sync_to_async(self._mark)(self.classmate, 'PRESENT')
+        online = await _next_event(stream)
+        self.assertEqual([item['id'] for item in online['data']['students']], [self.classmate.id])
+        await stream.aclose()
+
+    def test_streams_are_refused_under_wsgi(self):
+        response = Client().get(self.url, headers=_auth(self.teacher))
+        self.assertEqual(response.status_code, 503)
+
+    async def test_asgi_entry_point_serves_only_live_streams(self):
+        from config.asgi import application
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await application({'type': 'http', 'path': '/api/academic/courses/'}, None, send)
+        self.assertEqual(sent[0]['status'], 404)
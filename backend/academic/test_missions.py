@@ -1,10 +1,16 @@
 from datetime import date
 
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 
-from academic.models import Attendance, Course, Mission, Session
+from academic.models import Attendance, Course, Mission, MissionProgress, Session
 
 User = get_user_model()
 
@@ -65,3 +71,68 @@ class MissionSecurityTests(TestCase):
             'url': 'https://example.com/video',
         })
         self.assertEqual(response.status_code, 400)
+
+
+class MissionProgressTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='progress-teacher', role='TEACHER')
+        self.student = User.objects.create_user(username='progress-student', first_name='Ana', role='STUDENT')
+        self.course = Course.objects.create(teacher=self.teacher, name='Progreso', code='MIS02')
+        self.course.students.add(self.student)
+        self.mission = Mission.objects.create(course=self.course, name='Reto', inventory_name='Brújula')
+
+    def _roll_call(self, day, status):
+        self.client.force_authenticate(self.teacher)
+        response = self.client.post('/api/academic/attendance/bulk_create/', {
+            'course_id': self.course.id,
+            'date': day,
+            'attendances': [{'student_id': self.student.id, 'status': status}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def _summary(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get('/api/academic/missions/student-summary/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_attendance_completes_missions_and_unlocks_inventory(self):
+        self._roll_call(str(date.today()), 'ABSENT')
+        summary = self._summary()
+        self.assertEqual((summary['completed']['count'], summary['inventory']['count']), (0, 0))
+
+        self._roll_call(str(date.today()), 'LATE')
+        later = Mission.objects.create(course=self.course, name='Reto nuevo')
+        self.assertTrue(MissionProgress.objects.filter(mission=later, student=self.student).exists())
+        summary = self._summary()
+        self.assertEqual(summary['completed']['count'], 2)
+        self.assertEqual([item['name'] for item in summary['inventory']['items']], ['Brújula'])
+        self.assertEqual(summary['online']['students'][0]['status'], 'LATE')
+
+        self._roll_call(str(date.today()), 'ABSENT')
+        self.assertFalse(MissionProgress.objects.exists())
+        self.assertEqual(self._summary()['online']['count'], 0)
+
+    def test_summary_reads_a_fixed_number_of_queries(self):
+        self._roll_call(str(date.today()), 'PRESENT')
+        self._summary()
+        with CaptureQueriesContext(connection) as warm:
+            self._summary()
+        for index in range(5):
+            Mission.objects.create(course=self.course, name=f'Reto {index}', inventory_name=f'Objeto {index}')
+        self._summary()
+        with CaptureQueriesContext(connection) as more:
+            summary = self._summary()
+        self.assertEqual(summary['completed']['count'], 6)
+        self.assertEqual(len(warm), len(more))
+        tables = ' '.join(query['sql'] for query in more.captured_queries)
+        self.assertNotIn('"academic_attendance"', tables)
+        self.assertNotIn('"academic_session"', tables)
+
+    def test_rebuild_command_repairs_progress(self):
+        self._roll_call(str(date.today()), 'PRESENT')
+        MissionProgress.objects.all().delete()
+        call_command('rebuild_attendance_summaries', stdout=StringIO())
+        self.assertEqual(self._summary()['completed']['count'], 1)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from academic.models import Course
+from academic.services.enrollment import enroll_students
+from academic.services.open_checkins import student_open_windows
+from users.models import User
+
+
+class OpenCheckinRegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='registry-teacher', role='TEACHER')
+        self.student = User.objects.create_user(username='registry-student', role='STUDENT')
+        self.bystander = User.objects.create_user(username='registry-bystander', role='STUDENT')
+        self.course = Course.objects.create(teacher=self.teacher, name='Registro', code='REG01')
+        self.other_course = Course.objects.create(teacher=self.teacher, name='Otro', code='REG02')
+        self.course.students.add(self.student)
+        self.other_course.students.add(self.bystander)
+
+    def _poll(self, user):
+        self.client.force_authenticate(user)
+        self.client.get('/api/academic/attendance/my_open_checkins/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/academic/attendance/my_open_checkins/')
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def _open(self):
+        self.client.force_authenticate(self.teacher)
+        return self.client.post(
+            '/api/academic/attendance/open_self_checkin/', {'course_id': self.course.id}, format='json',
+        ).data
+
+    def test_polls_without_windows_in_the_students_courses_skip_the_database(self):
+        self.assertEqual(self._poll(self.student), ([], 0))
+
+        opened = self._open()
+        self.assertEqual(self._poll(self.bystander), ([], 0))
+
+        windows, _ = self._poll(self.student)
+        self.assertEqual([item['session_id'] for item in windows], [opened['session_id']])
+        self.assertFalse(windows[0]['already_marked'])
+
+    def test_registry_follows_enrollment_and_expiry(self):
+        opened = self._open()
+        self.assertEqual(self._poll(self.bystander)[0], [])
+
+        enroll_students(self.course, self.bystander)
+        self.assertEqual(
+            [item['session_id'] for item in self._poll(self.bystander)[0]],
+            [opened['session_id']],
+        )
+
+        later = timezone.now() + timedelta(minutes=31)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(student_open_windows(self.student.id), [])
@@ -0,0 +1,74 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from academic.models import Attendance, Course, Mission, Session
+
+User = get_user_model()
+
+
+class PollingETagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='etag-teacher', role='TEACHER')
+        self.other_teacher = User.objects.create_user(username='etag-other', role='TEACHER')
+        self.student = User.objects.create_user(username='etag-student', role='STUDENT', roles=['STUDENT'])
+        self.course = Course.objects.create(teacher=self.teacher, name='Sondeo', code='ETG01')
+        self.course.students.add(self.student)
+        self.session = Session.objects.create(course=self.course, date=date.today())
+        self.attendance = Attendance.objects.create(session=self.session, student=self.student, status='ABSENT')
+
+    def _poll(self, user, url):
+        self.client.force_authenticate(user)
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200, url)
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304, url)
+        self.assertLessEqual(len(queries), 1, url)
+        self.assertEqual(second['ETag'], first['ETag'])
+        return first['ETag']
+
+    def test_polling_endpoints_answer_304_with_at_most_one_query(self):
+        mission = Mission.objects.create(course=self.course, name='Reto')
+        self._poll(self.teacher, f'/api/academic/attendance/session_attendance/?course_id={self.course.id}&date={date.today()}')
+        self._poll(self.student, f'/api/academic/attendance/session_attendance/?course_id={self.course.id}&date={date.today()}')
+        self._poll(self.teacher, f'/api/academic/attendance/pending_excuses/?course_id={self.course.id}')
+        self._poll(self.student, '/api/academic/attendance/my_open_checkins/')
+        self._poll(self.student, f'/api/academic/missions/{mission.id}/online-students/')
+
+        self.client.force_authenticate(self.teacher)
+        opened = self.client.post('/api/academic/attendance/open_self_checkin/', {'course_id': self.course.id}, format='json')
+        self._poll(self.teacher, f"/api/academic/attendance/current_self_checkin/?session_id={opened.data['session_id']}")
+        self._poll(self.student, '/api/academic/attendance/my_open_checkins/')
+
+    def test_writes_change_the_etag(self):
+        url = f'/api/academic/attendance/pending_excuses/?course_id={self.course.id}'
+        etag = self._poll(self.teacher, url)
+
+        self.client.force_authenticate(self.student)
+        self.client.post('/api/academic/attendance/submit_excuse/', {
+            'attendance_id': self.attendance.id,
+            'excuse_note': 'Incapacidad',
+        })
+
+        self.client.force_authenticate(self.teacher)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_matching_etag_does_not_bypass_authorization(self):
+        url = f'/api/academic/attendance/session_attendance/?course_id={self.course.id}&date={date.today()}'
+        etag = self._poll(self.teacher, url)
+
+        self.client.force_authenticate(self.other_teacher)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn('ETag', response)
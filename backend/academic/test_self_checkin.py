@@ -1,16 +1,21 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework.test import APIClient
 
 from academic.models import Attendance, Course, Session
-from academic.services.self_checkin import _current_code
+from academic.services.enrollment import enroll_students, unenroll_students
+from academic.services.self_checkin import _current_code, _schedule_signature
 from users.models import User
 
 
 class SelfCheckinTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.teacher = User.objects.create_user(
             username='checkin-teacher', password='pass', role='TEACHER'
@@ -60,6 +65,66 @@ class SelfCheckinTests(TestCase):
         self.assertEqual(checked.data['status'], 'PRESENT')
         self.assertEqual(Attendance.objects.count(), 1)
 
+    def _check_in(self, user, opened, code=None):
+        self.client.force_authenticate(user=user)
+        return self.client.post(
+            '/api/academic/attendance/self_checkin/',
+            {'session_id': opened.data['session_id'], 'code': code or opened.data['code']},
+            format='json',
+        )
+
+    def test_burst_checkins_do_not_read_session_roster_or_badge(self):
+        classmate = User.objects.create_user(username='checkin-classmate', password='pass', role='STUDENT')
+        self.course.students.add(classmate)
+        opened = self._open()
+        self.assertEqual(self._check_in(self.student, opened).status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._check_in(classmate, opened)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['reward']['badge_awarded'])
+        reads = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        # Sin misiones en el curso no se buscan; la insignia llega del registro del cambio
+        for table in ('"academic_session"', '"academic_course_students"', '"gamification_badge"', '"academic_mission"'):
+            self.assertFalse(any(f'FROM {table}' in sql for sql in reads), table)
+        self.assertFalse(any('"gamification_userbadge"."awarded_at" >=' in sql for sql in reads))
+        self.assertLessEqual(len(queries), 23)
+
+    def test_reopening_and_enrollment_changes_refresh_the_cached_window(self):
+        first = self._open()
+        self.assertEqual(self._check_in(self.student, first).status_code, 200)
+
+        reopened = self._open()
+        session = Session.objects.get(id=reopened.data['session_id'])
+        self.assertEqual(self._check_in(self.student, reopened, first.data['code']).status_code, 400)
+        self.assertEqual(self._check_in(self.student, reopened, _current_code(session)).status_code, 200)
+
+        newcomer = User.objects.create_user(username='checkin-newcomer', password='pass', role='STUDENT')
+        self.assertEqual(self._check_in(newcomer, reopened).status_code, 403)
+        enroll_students(self.course, newcomer)
+        self.assertEqual(self._check_in(newcomer, reopened).status_code, 200)
+        unenroll_students(self.course, self.student)
+        self.assertEqual(self._check_in(self.student, reopened).status_code, 403)
+
+    def test_schedule_lists_signed_codes_until_expiry(self):
+        opened = self._open()
+        url = f"/api/academic/attendance/self_checkin_schedule/?session_id={opened.data['session_id']}"
+        schedule = self.client.get(url).data
+
+        self.assertEqual(schedule['rotation_seconds'], 30)
+        self.assertGreaterEqual(len(schedule['windows']), 20)
+        last_start = datetime.fromisoformat(schedule['windows'][-1]['starts_at'])
+        self.assertLessEqual(last_start, datetime.fromisoformat(schedule['expires_at']))
+        self.assertGreater(last_start + timedelta(seconds=30), datetime.fromisoformat(schedule['expires_at']))
+        self.assertEqual(schedule['signature'], _schedule_signature(schedule))
+        self.assertNotEqual(schedule['signature'], _schedule_signature({**schedule, 'expires_at': 'x'}))
+
+        self.assertEqual(self._check_in(self.student, opened, schedule['windows'][0]['code']).status_code, 200)
+        self.assertEqual(self._check_in(self.student, opened, schedule['windows'][3]['code']).status_code, 400)
+
+        self.client.force_authenticate(user=self.other_teacher)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
     def test_repeated_checkin_is_idempotent(self):
         opened = self._open()
         self.client.force_authenticate(user=self.student)
@@ -0,0 +1,122 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from academic.models import Attendance, Course, Session
+from academic.services.session_tallies import check_session_tallies
+
+User = get_user_model()
+
+
+class SessionTallyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='tally-teacher', role='TEACHER')
+        self.first = User.objects.create_user(username='tally-first', role='STUDENT')
+        self.second = User.objects.create_user(username='tally-second', role='STUDENT')
+        self.course = Course.objects.create(teacher=self.teacher, name='Historial', code='TAL01')
+        self.course.students.add(self.first, self.second)
+        self.client.force_authenticate(self.teacher)
+
+    def _roll_call(self, day, first_status, second_status):
+        self.client.post('/api/academic/attendance/bulk_create/', {
+            'course_id': self.course.id,
+            'date': day,
+            'attendances': [
+                {'student_id': self.first.id, 'status': first_status},
+                {'student_id': self.second.id, 'status': second_status},
+            ],
+        }, format='json')
+        return Session.objects.get(course=self.course, date=day)
+
+    def test_counters_follow_roll_call_edits_and_deletes(self):
+        session = self._roll_call('2026-09-01', 'PRESENT', 'LATE')
+        self.assertEqual((session.present_count, session.late_count, session.total_count), (1, 1, 2))
+
+        session = self._roll_call('2026-09-01', 'ABSENT', 'LATE')
+        self.assertEqual((session.present_count, session.absent_count), (0, 1))
+
+        Attendance.objects.get(session=session, student=self.second).delete()
+        session.refresh_from_db()
+        self.assertEqual(session.total_count, 1)
+
+        response = self.client.get(f'/api/academic/attendance/course_sessions/?course_id={self.course.id}')
+        self.assertEqual(response.json()[0]['count_absent'], 1)
+        self.assertEqual(response.json()[0]['total'], 1)
+
+    def test_history_endpoints_use_one_query_over_sessions(self):
+        self._roll_call('2026-09-02', 'PRESENT', 'ABSENT')
+        sessions_url = f'/api/academic/attendance/course_sessions/?course_id={self.course.id}'
+        history_url = f'/api/academic/courses/{self.course.id}/attendance_history/'
+
+        def measure(endpoint):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(endpoint).status_code, 200)
+            return len(queries)
+
+        before = (measure(sessions_url), measure(history_url))
+        for day in range(3, 13):
+            self._roll_call(f'2026-09-{day:02d}', 'PRESENT', 'LATE')
+        self.assertEqual(before, (measure(sessions_url), measure(history_url)))
+
+        history = self.client.get(history_url).json()
+        self.assertEqual(len(history), 11)
+        self.assertEqual(history[-1]['attendance_rate'], 50.0)
+
+    def test_checker_reports_and_fixes_drift(self):
+        session = self._roll_call('2026-09-20', 'PRESENT', 'PRESENT')
+        Session.objects.filter(id=session.id).update(present_count=5)
+
+        output = StringIO()
+        call_command('check_session_tallies', stdout=output)
+        self.assertIn(str(session.id), output.getvalue())
+
+        call_command('check_session_tallies', '--fix', stdout=StringIO())
+        session.refresh_from_db()
+        self.assertEqual(session.present_count, 2)
+
+    def test_deleting_students_discounts_their_marks(self):
+        session = self._roll_call('2026-09-21', 'PRESENT', 'ABSENT')
+        self.first.delete()
+        session.refresh_from_db()
+        self.assertEqual((session.present_count, session.absent_count), (0, 1))
+
+        # El borrado por queryset (reversión de cargas, admin) también descuenta
+        User.objects.filter(id=self.second.id).delete()
+        session.refresh_from_db()
+        self.assertEqual(session.total_count, 0)
+        self.assertEqual(check_session_tallies([self.course.id]), [])
+
+
+class SessionEditTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='edit-teacher', role='TEACHER')
+        self.course = Course.objects.create(teacher=self.teacher, name='Edición', code='EDI01')
+        self.other = Course.objects.create(teacher=self.teacher, name='Otra', code='EDI02')
+        self.session = Session.objects.create(course=self.course, date='2026-09-01')
+        self.client.force_authenticate(self.teacher)
+
+    def test_course_and_date_are_fixed_after_creation(self):
+        url = f'/api/academic/sessions/{self.session.id}/'
+        for payload in ({'date': '2026-09-02'}, {'course': self.other.id}):
+            self.assertEqual(self.client.patch(url, payload, format='json').status_code, 400)
+        response = self.client.patch(url, {'date': '2026-09-01', 'topic': 'Saltos'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.session.refresh_from_db()
+        self.assertEqual((str(self.session.date), self.session.course_id, self.session.topic), ('2026-09-01', self.course.id, 'Saltos'))
+
+    def test_edits_do_not_overwrite_concurrent_counts(self):
+        url = f'/api/academic/sessions/{self.session.id}/'
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(url, {'topic': 'Relevos'}, format='json')
+        update = next(query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE "academic_session"'))
+        self.assertNotIn('present_count', update)
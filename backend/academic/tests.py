@@ -1,6 +1,7 @@
 ﻿from datetime import date, timedelta
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from rest_framework.test import APIClient
 
@@ -9,6 +10,7 @@ from modulos.asistencia.aplicacion import RegistrarAsistenciaUseCase
 from modulos.asistencia.dominio import (
     AsistenciaInvalidaError,
     AsistenciaRepositoryPort,
+    ResultadoRegistroLote,
 )
 
 
@@ -19,6 +21,7 @@ class AttendanceContractTests(TestCase):
     """Caracteriza los contratos que deben sobrevivir la reestructuracion."""
 
     def setUp(self):
+        cache.clear()
         self.teacher = User.objects.create_user(
             username="teacher",
             password="safe-password",
@@ -310,7 +313,7 @@ class FakeAttendanceRepository(AsistenciaRepositoryPort):
 
     def registrar_lote(self, curso_id, fecha, registros):
         self.received = (curso_id, fecha, registros)
-        return len(registros)
+        return ResultadoRegistroLote(creados=len(registros))
 
     def obtener_docente_id(self, curso_id):
         return 10
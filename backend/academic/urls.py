@@ -1,6 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import CourseViewSet, SessionViewSet, AttendanceViewSet, DashboardViewSet, MissionViewSet
+from .views.at_risk import AtRiskEnrollmentListView
+from .views.live import online_students_feed, session_live_feed
 from .views.student_overview import StudentAttendanceOverviewView
 
 router = DefaultRouter()
@@ -11,6 +13,9 @@ router.register(r'dashboard', DashboardViewSet, basename='dashboard')
 router.register(r'missions', MissionViewSet, basename='missions')
 
 urlpatterns = [
+    path('at-risk/', AtRiskEnrollmentListView.as_view()),
+    path('attendance/live/', session_live_feed),
+    path('missions/<int:pk>/online-students/live/', online_students_feed),
     path('courses/student-overview/<int:student_id>/', StudentAttendanceOverviewView.as_view()),
     path('', include(router.urls)),
 ]
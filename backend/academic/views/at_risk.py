@@ -0,0 +1,26 @@
+from rest_framework import generics, permissions
+from rest_framework.pagination import PageNumberPagination
+
+from academic.serializers import AtRiskEnrollmentSerializer, AtRiskQuerySerializer
+from academic.services.at_risk import at_risk_enrollments
+
+
+class AtRiskPagination(PageNumberPagination):
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class AtRiskEnrollmentListView(generics.ListAPIView):
+    """
+    Matrículas en riesgo por inasistencia.
+    Admite ?course=, ?teacher=, ?program= y ?faculty= para filtrar.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = AtRiskEnrollmentSerializer
+    pagination_class = AtRiskPagination
+
+    def get_queryset(self):
+        query = AtRiskQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        return at_risk_enrollments(self.request.user, query.validated_data)
@@ -9,8 +9,17 @@ from academic.serializers import (
     AttendanceSerializer,
     AttendanceSessionQuerySerializer,
 )
+from academic.services.course_cache import cached_course_payload
+from academic.services.dashboard import effective_role
+from academic.services.poll_etags import (
+    current_self_checkin_etag,
+    my_open_checkins_etag,
+    pending_excuses_etag,
+    session_attendance_etag,
+)
 from academic.services.self_checkin import (
     get_self_checkin_for_teacher,
+    get_self_checkin_schedule,
     list_open_checkins_for_student,
     mark_student_self_checkin,
     open_self_checkin_for_teacher,
@@ -27,6 +36,7 @@ from modulos.asistencia.dominio import (
     CursoNoEncontradoError,
     SesionNoEncontradaError,
 )
+from core.etags import conditional_get
 from modulos.asistencia.infraestructura import DjangoAsistenciaRepository
 
 
@@ -49,7 +59,7 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             data = serializer.validated_data
             try:
-                RegistrarAsistenciaUseCase(DjangoAsistenciaRepository()).ejecutar(
+                resultado = RegistrarAsistenciaUseCase(DjangoAsistenciaRepository()).ejecutar(
                     actor=self._actor(request.user),
                     curso_id=data['course_id'],
                     fecha=data['date'],
@@ -65,7 +75,12 @@ class AttendanceViewSet(viewsets.ModelViewSet):
                     {'error': str(error)},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            return Response({'status': 'success'}, status=status.HTTP_201_CREATED)
+            return Response({
+                'status': 'success',
+                'created': resultado.creados,
+                'updated': resultado.actualizados,
+                'unchanged': resultado.sin_cambios,
+            }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['post'], url_path='open_self_checkin')
@@ -81,6 +96,7 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         return Response(result)
 
     @action(detail=False, methods=['get'], url_path='current_self_checkin')
+    @conditional_get(current_self_checkin_etag)
     def current_self_checkin(self, request):
         try:
             result = get_self_checkin_for_teacher(
@@ -93,7 +109,21 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             return Response({'error': 'La ventana ya cerró'}, status=400)
         return Response(result)
 
+    @action(detail=False, methods=['get'], url_path='self_checkin_schedule')
+    def self_checkin_schedule(self, request):
+        try:
+            result = get_self_checkin_schedule(
+                request.user,
+                request.query_params.get('session_id'),
+            )
+        except (Course.DoesNotExist, Session.DoesNotExist, ValueError):
+            return Response({'error': 'Ventana no encontrada'}, status=404)
+        if not result:
+            return Response({'error': 'La ventana ya cerró'}, status=400)
+        return Response(result)
+
     @action(detail=False, methods=['get'], url_path='my_open_checkins')
+    @conditional_get(my_open_checkins_etag)
     def my_open_checkins(self, request):
         return Response(list_open_checkins_for_student(request.user))
 
@@ -109,7 +139,7 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Código y sesión requeridos'}, status=400)
 
         try:
-            attendance, error, code_status, reward = mark_student_self_checkin(
+            result, error, code_status, reward = mark_student_self_checkin(
                 request.user, session_id, code
             )
         except Session.DoesNotExist:
@@ -119,12 +149,12 @@ class AttendanceViewSet(viewsets.ModelViewSet):
 
         return Response({
             'success': True,
-            'attendance_id': attendance.id,
-            'status': attendance.status,
+            **result,
             'reward': reward,
             'message': 'Asistencia registrada correctamente.',
         })
     @action(detail=False, methods=['get'], url_path='session_attendance')
+    @conditional_get(session_attendance_etag)
     def session_attendance(self, request):
         """
         Devuelve la asistencia existente para un curso + fecha.
@@ -189,19 +219,17 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         if not is_admin and not is_teacher_owner:
             return Response({'error': 'No autorizado para ver las sesiones de esta clase'}, status=403)
 
-        sessions = Session.objects.filter(course=course).order_by('-date')
-        result = []
-        for session in sessions:
-            atts = Attendance.objects.filter(session=session)
-            result.append({
+        return Response(cached_course_payload('course_sessions', course.id, effective_role(user), lambda: [
+            {
                 'id':            session.id,
                 'date':          str(session.date),
-                'count_present': atts.filter(status='PRESENT').count(),
-                'count_absent':  atts.filter(status='ABSENT').count(),
-                'count_late':    atts.filter(status='LATE').count(),
-                'total':         atts.count(),
-            })
-        return Response(result)
+                'count_present': session.present_count,
+                'count_absent':  session.absent_count,
+                'count_late':    session.late_count,
+                'total':         session.total_count,
+            }
+            for session in Session.objects.filter(course=course).order_by('-date')
+        ]))
 
     @action(detail=False, methods=['post'])
     def submit_excuse(self, request):
@@ -241,6 +269,7 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=False, methods=['get'])
+    @conditional_get(pending_excuses_etag)
     def pending_excuses(self, request):
         """Obtener excusas pendientes de revisión para un profesor"""
         course_id = request.query_params.get('course_id')
@@ -1,16 +1,44 @@
+from collections import defaultdict
 from datetime import date, datetime
 
 from django.contrib.auth import get_user_model
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-from academic.models import Attendance, Course, Session
-from academic.serializers import CourseSerializer
+from academic.models import AtRiskEnrollment, Attendance, Course, Session
+from academic.renderers import CSVExportRenderer, XLSXExportRenderer
+from academic.serializers import (
+    CourseListSerializer,
+    CourseSerializer,
+    ExportArchiveQuerySerializer,
+    SimpleStudentSerializer,
+)
+from academic.services.at_risk import rebuild_at_risk
+from academic.services.attendance_summary import summaries_by_student
+from academic.services.course_cache import bump_course_versions, cached_course_payload
+from academic.services.dashboard import effective_role, invalidate_dashboards
+from academic.services.enrollment import enroll_students, unenroll_students
+from academic.services.exports import CONTENT_TYPES, archive_chunks, export_chunks, export_filename
+from gamification.models import BadgeSummary, CoursePoints
 
 User = get_user_model()
 
+EXPORT_RENDERERS = [JSONRenderer, CSVExportRenderer, XLSXExportRenderer]
+
+
+class RosterPagination(CursorPagination):
+    ordering = ('last_name', 'first_name', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
 
 class CourseViewSet(viewsets.ModelViewSet):
     queryset = Course.objects.all().prefetch_related('students')
@@ -38,22 +66,46 @@ class CourseViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(is_archived=True)
             elif archived != 'all':
                 queryset = queryset.filter(is_archived=False)
+            # Subconsulta y no ``Count('students')``: para el estudiante ese conteo
+            # reusaría el join de ``filter(students=user)`` y siempre daría 1
+            enrolled = Course.students.through.objects.filter(course_id=OuterRef('pk')).order_by().values(
+                'course_id',
+            ).annotate(total=Count('id')).values('total')
+            return queryset.annotate(student_count=Coalesce(Subquery(enrolled), 0))
+        if self.action == 'roster':
+            return queryset
         return queryset.prefetch_related('students')
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CourseListSerializer
+        return super().get_serializer_class()
+
     def perform_create(self, serializer):
         roles = self.request.user.roles or [self.request.user.role]
         if not ({'ADMIN', 'TEACHER'} & set(roles)) and not self.request.user.is_superuser:
             raise PermissionDenied("Solo docentes o administradores pueden crear clases")
-        serializer.save(teacher=self.request.user)
+        course = serializer.save(teacher=self.request.user)
+        invalidate_dashboards(course_ids=[course.id])
+        bump_course_versions([course.id])
 
     def perform_update(self, serializer):
         self._ensure_can_manage(self.get_object(), "editar")
-        serializer.save()
+        previous_threshold = serializer.instance.absence_threshold
+        course = serializer.save()
+        if course.absence_threshold != previous_threshold:
+            rebuild_at_risk([course.id])
+        self._invalidate_caches(course)
 
     def perform_destroy(self, instance):
         self._ensure_can_manage(instance, "eliminar")
+        self._invalidate_caches(instance)
         instance.delete()
 
+    def _invalidate_caches(self, course):
+        invalidate_dashboards(list(course.students.values_list('id', flat=True)), [course.id])
+        bump_course_versions([course.id])
+
     def _ensure_can_manage(self, course, action_name="gestionar"):
         user = self.request.user
         roles = user.roles or [user.role]
@@ -68,6 +120,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         course = self.get_object()
         self._ensure_can_manage(course, "archivar")
         course.archive()
+        self._invalidate_caches(course)
         return Response(self.get_serializer(course).data)
 
     @action(detail=True, methods=['post'])
@@ -75,8 +128,72 @@ class CourseViewSet(viewsets.ModelViewSet):
         course = self.get_object()
         self._ensure_can_manage(course, "restaurar")
         course.restore()
+        self._invalidate_caches(course)
         return Response(self.get_serializer(course).data)
 
+    @action(detail=True, methods=['get'])
+    def roster(self, request, pk=None):
+        """
+        Estudiantes del curso paginados por cursor (orden apellido, nombre).
+        GET /api/academic/courses/<id>/roster/?search=texto&page_size=50
+        """
+        course = self.get_object()
+        students = course.students.order_by('last_name', 'first_name', 'id')
+        search = request.query_params.get('search', '').strip()
+        if search:
+            students = students.filter(
+                Q(first_name__icontains=search)
+                | Q(last_name__icontains=search)
+                | Q(document_number__icontains=search)
+                | Q(email__icontains=search)
+            )
+        paginator = RosterPagination()
+        page = paginator.paginate_queryset(students, request, view=self)
+        return paginator.get_paginated_response(SimpleStudentSerializer(page, many=True).data)
+
+    @action(detail=True, methods=['get'], renderer_classes=EXPORT_RENDERERS)
+    def export(self, request, pk=None):
+        """
+        Matriz estudiante × sesión con totales, transmitida por partes.
+        GET /api/academic/courses/<id>/export/?format=csv|xlsx
+        """
+        course = self.get_object()
+        self._ensure_can_manage(course, "exportar")
+        export_format = self._export_format(request)
+        return self._attachment(
+            export_chunks(course, export_format),
+            CONTENT_TYPES[export_format],
+            export_filename(course, export_format),
+        )
+
+    @action(detail=False, methods=['get'], url_path='export-archive', renderer_classes=EXPORT_RENDERERS)
+    def export_archive(self, request):
+        """
+        ZIP con la exportación de todas las clases de un año y periodo.
+        GET /api/academic/courses/export-archive/?year=2026&period=1&format=csv|xlsx
+        """
+        self._ensure_admin("exportar todas las clases")
+        query = ExportArchiveQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        year, period = query.validated_data['year'], query.validated_data['period']
+        courses = Course.objects.filter(year=year, period=period).order_by('code')
+        return self._attachment(
+            archive_chunks(courses, self._export_format(request)),
+            'application/zip',
+            f'asistencia_{year}_{period}.zip',
+        )
+
+    def _export_format(self, request):
+        export_format = request.query_params.get('format', 'csv')
+        if export_format not in CONTENT_TYPES:
+            raise ValidationError("Formato no soportado. Usa csv o xlsx.")
+        return export_format
+
+    def _attachment(self, chunks, content_type, filename):
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
     @action(detail=True, methods=['get'], url_path='debug-students')
     def debug_students(self, request, pk=None):
         course = self.get_object()
@@ -91,11 +208,18 @@ class CourseViewSet(viewsets.ModelViewSet):
             ],
         })
 
+    def _cached(self, endpoint, course, build):
+        return Response(cached_course_payload(endpoint, course.id, effective_role(self.request.user), build))
+
     @action(detail=True, methods=['get'])
     def attendance_stats(self, request, pk=None):
         course = self.get_object()
+        today = date.today()
+        return self._cached(f'attendance_stats:{today.isoformat()}', course, lambda: self._attendance_stats(course, today))
+
+    def _attendance_stats(self, course, today):
         sessions = Session.objects.filter(course=course)
-        today_session = sessions.filter(date=date.today()).first()
+        today_session = sessions.filter(date=today).first()
         payload = {
             'total_students': course.students.count(),
             'total_sessions': sessions.count(),
@@ -106,42 +230,44 @@ class CourseViewSet(viewsets.ModelViewSet):
         }
         if today_session:
             payload.update({
-                'today_present': Attendance.objects.filter(session=today_session, status='PRESENT').count(),
-                'today_late': Attendance.objects.filter(session=today_session, status='LATE').count(),
-                'today_absent': Attendance.objects.filter(session=today_session, status='ABSENT').count(),
+                'today_present': today_session.present_count,
+                'today_late': today_session.late_count,
+                'today_absent': today_session.absent_count,
             })
         payload['alert_count'] = len(payload['students_with_alerts'])
-        return Response(payload)
+        return payload
 
     def _students_with_alerts(self, course):
-        alerts = []
-        for student in course.students.all():
-            absences = Attendance.objects.filter(session__course=course, student=student, status='ABSENT').count()
-            lates = Attendance.objects.filter(session__course=course, student=student, status='LATE').count()
-            if absences >= 3:
-                alerts.append({
-                    'id': student.id,
-                    'first_name': student.first_name,
-                    'last_name': student.last_name,
-                    'email': student.email,
-                    'phone_number': student.phone_number,
-                    'photo': student.photo.url if student.photo else None,
-                    'document_number': student.document_number,
-                    'absences': absences,
-                    'lates': lates,
-                })
-        return alerts
+        flagged = AtRiskEnrollment.objects.filter(course=course).select_related(
+            'student', 'summary',
+        ).order_by('student__first_name', 'student__last_name')
+        return [
+            {
+                'id': item.student.id,
+                'first_name': item.student.first_name,
+                'last_name': item.student.last_name,
+                'email': item.student.email,
+                'phone_number': item.student.phone_number,
+                'photo': item.student.photo.url if item.student.photo else None,
+                'document_number': item.student.document_number,
+                'absences': item.summary.absent,
+                'lates': item.summary.late,
+            }
+            for item in flagged
+        ]
 
     @action(detail=True, methods=['get'])
     def attendance_history(self, request, pk=None):
-        sessions = Session.objects.filter(course=self.get_object()).order_by('-date')
-        return Response([self._session_summary(session) for session in sessions])
+        course = self.get_object()
+        return self._cached('attendance_history', course, lambda: [
+            self._session_summary(session)
+            for session in Session.objects.filter(course=course).order_by('-date')
+        ])
 
     def _session_summary(self, session):
-        attendances = Attendance.objects.filter(session=session)
-        present = attendances.filter(status='PRESENT').count()
-        late = attendances.filter(status='LATE').count()
-        absent = attendances.filter(status='ABSENT').count()
+        present = session.present_count
+        late = session.late_count
+        absent = session.absent_count
         total = present + late + absent
         return {
             'session_id': session.id,
@@ -157,20 +283,33 @@ class CourseViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def student_report(self, request, pk=None):
         course = self.get_object()
+        return self._cached('student_report', course, lambda: self._student_report(course))
+
+    def _student_report(self, course):
         total_sessions = Session.objects.filter(course=course).count()
+        students = course.students.annotate(
+            stars=Coalesce(Subquery(
+                BadgeSummary.objects.filter(user=OuterRef('pk')).values('badge_count')[:1]
+            ), 0),
+            points=Coalesce(Subquery(
+                CoursePoints.objects.filter(course=course, student=OuterRef('pk')).values('points')[:1]
+            ), 0),
+        )
+        summaries = summaries_by_student(course)
+        attendances = defaultdict(list)
+        for attendance in Attendance.objects.filter(session__course=course).select_related('session').order_by('session__date'):
+            attendances[attendance.student_id].append(attendance)
         report = [
-            self._student_report_row(course, student, total_sessions)
-            for student in course.students.all()
+            self._student_report_row(student, total_sessions, summaries.get(student.id), attendances[student.id])
+            for student in students
         ]
         report.sort(key=lambda item: item['attendance_rate'])
-        return Response(report)
+        return report
 
-    def _student_report_row(self, course, student, total_sessions):
-        attendances = Attendance.objects.filter(
-            session__course=course,
-            student=student,
-        ).select_related('session').order_by('session__date')
+    def _student_report_row(self, student, total_sessions, summary, attendances):
         grouped = self._group_student_attendance(attendances)
+        if summary:
+            grouped.update(present=summary.present, late=summary.late, absent=summary.absent, excused=summary.excused)
         denom = total_sessions if total_sessions > 0 else 1
         rate = round((grouped['present'] + grouped['late'] + grouped['excused']) / denom * 100, 1)
         return {
@@ -183,8 +322,10 @@ class CourseViewSet(viewsets.ModelViewSet):
             'document_number': student.document_number,
             'total_sessions': total_sessions,
             'attendance_rate': rate,
-            'points': grouped['present'] * 10 + grouped['late'] * 2,
-            'stars': student.badges.count(),
+            'points': student.points,
+            'stars': student.stars,
+            'current_streak': summary.current_streak if summary else 0,
+            'longest_streak': summary.longest_streak if summary else 0,
             **grouped,
         }
 
@@ -286,7 +427,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         user = self._get_user_from_request(request)
         if course.students.filter(id=user.id).exists():
             return Response({'error': f'{user.first_name} {user.last_name} ya está en esta clase'}, status=400)
-        course.students.add(user)
+        enroll_students(course, user)
         return Response({'message': f'{user.first_name} {user.last_name} agregado exitosamente', 'user_id': user.id})
 
     @action(detail=True, methods=['delete'], url_path='remove_student')
@@ -296,7 +437,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         user = self._get_user_from_request(request)
         if not course.students.filter(id=user.id).exists():
             return Response({'error': f'{user.first_name} {user.last_name} no está en esta clase'}, status=400)
-        course.students.remove(user)
+        unenroll_students(course, user)
         return Response({'message': f'{user.first_name} {user.last_name} quitado exitosamente', 'user_id': user.id})
 
     def _ensure_admin(self, action_name):
@@ -0,0 +1,155 @@
+"""Transmisiones SSE de asistencia en vivo.
+
+Vistas asíncronas de Django (fuera de DRF, que no admite respuestas en
+streaming asíncronas). Las sirve el servicio ASGI (``config.asgi``), aparte
+de la API en WSGI; una solicitud que llega por WSGI se rechaza con 503 para
+que la transmisión no retenga un hilo de la API. La autenticación acepta el
+JWT del encabezado ``Authorization``, igual que la API, o la sesión de Django.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from academic.models import Attendance, Mission, PendingCheckin, Session
+from academic.services.live_events import (
+    event_name,
+    follow_course,
+    format_event,
+    latest_event_id,
+    stream_preamble,
+)
+from academic.services.missions import can_manage_course, ensure_can_view_mission, present_students_for_course
+
+
+async def session_live_feed(request):
+    """Llamado en vivo de una sesión para su profesor.
+
+    GET /api/academic/attendance/live/?session_id=X
+    Eventos: ``snapshot`` al conectar, ``checkin`` y ``status`` por cambio.
+    """
+    if not isinstance(request, ASGIRequest):
+        return _wsgi_refused()
+    user = await _authenticate(request)
+    if user is None:
+        return JsonResponse({'error': 'Autenticación requerida'}, status=401)
+    session_id = request.GET.get('session_id', '')
+    if not session_id.isdigit():
+        return JsonResponse({'error': 'session_id requerido'}, status=400)
+    session = await sync_to_async(_manageable_session)(user, int(session_id))
+    if session is None:
+        return JsonResponse({'error': 'Sesión no encontrada'}, status=404)
+    return _event_stream(_session_events(session, _last_event_id(request)))
+
+
+async def online_students_feed(request, pk):
+    """Estudiantes presentes en la clase de una misión, en vivo.
+
+    GET /api/academic/missions/<id>/online-students/live/
+    Envía un evento ``online`` con la lista completa en cada cambio.
+    """
+    if not isinstance(request, ASGIRequest):
+        return _wsgi_refused()
+    user = await _authenticate(request)
+    if user is None:
+        return JsonResponse({'error': 'Autenticación requerida'}, status=401)
+    course = await sync_to_async(_viewable_mission_course)(user, pk)
+    if course is None:
+        return JsonResponse({'error': 'Misión no encontrada'}, status=404)
+    return _event_stream(_online_events(course, _last_event_id(request)))
+
+
+async def _session_events(session, cursor):
+    yield stream_preamble()
+    if cursor is None:
+        cursor, statuses = await sync_to_async(_session_snapshot)(session)
+        yield format_event('snapshot', {'session_id': session.id, 'statuses': statuses}, cursor)
+
+    async def render(events):
+        return [
+            format_event(event_name(event), _event_data(event), event['id'])
+            for event in events
+            if event['session_id'] == session.id
+        ]
+
+    async for chunk in follow_course(session.course_id, cursor, render):
+        yield chunk
+
+
+async def _online_events(course, cursor):
+    yield stream_preamble()
+    if cursor is None:
+        cursor = await sync_to_async(latest_event_id)(course.id)
+        yield format_event('online', await sync_to_async(present_students_for_course)(course), cursor)
+
+    async def render(events):
+        payload = await sync_to_async(present_students_for_course)(course)
+        return [format_event('online', payload, events[-1]['id'])]
+
+    async for chunk in follow_course(course.id, cursor, render):
+        yield chunk
+
+
+def _event_stream(chunks):
+    response = StreamingHttpResponse(chunks, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Evita que el proxy acumule la respuesta antes de enviarla
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _wsgi_refused():
+    return JsonResponse({'error': 'Las transmisiones en vivo se sirven por el servicio ASGI'}, status=503)
+
+
+async def _authenticate(request):
+    try:
+        authenticated = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    if authenticated:
+        return authenticated[0]
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def _last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id') or ''
+    return int(value) if value.isdigit() else None
+
+
+def _manageable_session(user, session_id):
+    session = Session.objects.select_related('course').filter(id=session_id).first()
+    if session is None or not can_manage_course(user, session.course):
+        return None
+    return session
+
+
+def _viewable_mission_course(user, mission_id):
+    mission = Mission.objects.select_related('course').filter(id=mission_id).first()
+    if mission is None or not (mission.is_active or can_manage_course(user, mission.course)):
+        return None
+    try:
+        ensure_can_view_mission(user, mission)
+    except PermissionDenied:
+        return None
+    return mission.course
+
+
+def _session_snapshot(session):
+    # El id se lee antes que los estados: un cambio intermedio se reenvía, no se pierde
+    cursor = latest_event_id(session.course_id)
+    statuses = dict(Attendance.objects.filter(session=session).values_list('student_id', 'status'))
+    statuses.update(PendingCheckin.objects.filter(session=session).values_list('student_id', 'status'))
+    return cursor, statuses
+
+
+def _event_data(event):
+    return {
+        'session_id': event['session_id'],
+        'student_id': event['student_id'],
+        'previous': event['previous'] or None,
+        'status': event['status'] or None,
+        'pending': event['pending'],
+    }
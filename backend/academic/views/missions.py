@@ -13,6 +13,8 @@ from academic.services.missions import (
     user_roles,
     validate_mission_payload,
 )
+from academic.services.poll_etags import online_students_etag
+from core.etags import conditional_get
 
 
 class MissionViewSet(viewsets.ModelViewSet):
@@ -51,6 +53,7 @@ class MissionViewSet(viewsets.ModelViewSet):
         instance.delete()
 
     @action(detail=True, methods=['get'], url_path='online-students')
+    @conditional_get(online_students_etag)
     def online_students(self, request, pk=None):
         mission = self.get_object()
         ensure_can_view_mission(request.user, mission)
@@ -1,10 +1,13 @@
+from collections import defaultdict
+
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from rest_framework import permissions, status
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from academic.models import Attendance, Course, Session
+from academic.models import Attendance, Course, EnrollmentAttendanceSummary
 
 User = get_user_model()
 
@@ -22,8 +25,23 @@ class StudentAttendanceOverviewView(APIView):
         except User.DoesNotExist:
             return Response({'error': 'Estudiante no encontrado'}, status=status.HTTP_404_NOT_FOUND)
 
-        courses = Course.objects.filter(students=student).select_related('teacher').prefetch_related('sessions')
-        overview = [self._build_course_summary(course, student) for course in courses]
+        courses = Course.objects.filter(students=student).select_related('teacher').annotate(
+            session_count=Count('sessions', distinct=True),
+        )
+        summaries = {
+            item.course_id: item
+            for item in EnrollmentAttendanceSummary.objects.filter(student=student)
+        }
+        absent_dates = defaultdict(list)
+        for course_id, session_date in Attendance.objects.filter(
+            student=student,
+            status='ABSENT',
+        ).values_list('session__course_id', 'session__date'):
+            absent_dates[course_id].append(session_date.isoformat())
+        overview = [
+            self._build_course_summary(course, summaries.get(course.id), absent_dates[course.id])
+            for course in courses
+        ]
         overview.sort(key=lambda item: item['attendance_rate'])
 
         return Response({
@@ -33,17 +51,10 @@ class StudentAttendanceOverviewView(APIView):
             'global_rate': self._global_rate(overview),
         })
 
-    def _build_course_summary(self, course, student):
-        sessions = Session.objects.filter(course=course)
-        attendances = Attendance.objects.filter(
-            session__course=course,
-            student=student,
-        ).select_related('session')
-        present = attendances.filter(status='PRESENT').count()
-        late = attendances.filter(status='LATE').count()
-        absent = attendances.filter(status='ABSENT').count()
-        excused = attendances.filter(status='EXCUSED').count()
-        total = present + late + absent + excused
+    def _build_course_summary(self, course, summary, absent_dates):
+        summary = summary or EnrollmentAttendanceSummary()
+        present, late, absent, excused = summary.present, summary.late, summary.absent, summary.excused
+        total = summary.recorded
         return {
             'course_id': course.id,
             'course_name': course.name,
@@ -53,17 +64,14 @@ class StudentAttendanceOverviewView(APIView):
             'year': course.year,
             'period': course.period,
             'is_archived': course.is_archived,
-            'total_sessions': sessions.count(),
+            'total_sessions': course.session_count,
             'present': present,
             'late': late,
             'absent': absent,
             'excused': excused,
             'attendance_rate': round(((present + late + excused) / total * 100) if total > 0 else 0, 1),
-            'absent_dates': [
-                item.session.date.isoformat()
-                for item in attendances.filter(status='ABSENT').select_related('session')
-            ],
-            'in_alert': absent >= 3,
+            'absent_dates': absent_dates,
+            'in_alert': absent >= course.absence_threshold,
         }
 
     def _serialize_student(self, student):
@@ -3,14 +3,39 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Este punto de entrada solo atiende las transmisiones en vivo (SSE) y el
+chequeo de salud; la API sigue en WSGI con hilos (``config.wsgi``), donde
+las vistas síncronas no comparten un único hilo por worker. Cualquier otra
+ruta responde 404.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
 
 import os
+import re
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+ASGI_PATHS = re.compile(
+    r'^/api/(health/|academic/attendance/live/|academic/missions/\d+/online-students/live/)$'
+)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and not ASGI_PATHS.match(scope['path']):
+        await send({
+            'type': 'http.response.start',
+            'status': 404,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'{"error": "Ruta servida por la API (WSGI)"}',
+        })
+        return
+    await django_application(scope, receive, send)
@@ -5,6 +5,7 @@ No usar directamente — importar desde local.py o production.py.
 """
 
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 
@@ -78,6 +79,34 @@ WSGI_APPLICATION = 'config.wsgi.application'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# ── Caché compartida ──────────────────────────────────────────────────────────
+# Los workers de gunicorn de un mismo contenedor comparten la caché por sistema
+# de archivos. Producción la reemplaza por una compartida entre servicios (ver
+# production.py): CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache y
+# CACHE_LOCATION=<tabla>, creada con `manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'agon-cache')),
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+# ── Auto-registro con escritura diferida ─────────────────────────────────────
+# Con SELF_CHECKIN_WRITE_BEHIND=True los auto-registros se encolan en
+# PendingCheckin y el worker `manage.py flush_pending_checkins --loop` los vuelca
+# por sesión a los SELF_CHECKIN_FLUSH_SECONDS o al cerrar la ventana.
+SELF_CHECKIN_WRITE_BEHIND = os.environ.get('SELF_CHECKIN_WRITE_BEHIND', 'False') == 'True'
+SELF_CHECKIN_FLUSH_SECONDS = int(os.environ.get('SELF_CHECKIN_FLUSH_SECONDS', 5))
+
+
+# ── Cargas de directorio ──────────────────────────────────────────────────────
+# El archivo subido lo lee el worker `process_directory_imports`, otro servicio:
+# debe guardarse en un almacenamiento compartido. Vacío = almacenamiento por defecto.
+DIRECTORY_IMPORT_STORAGE = os.environ.get('DIRECTORY_IMPORT_STORAGE', '')
+
+
 # ── Validación de contraseñas ─────────────────────────────────────────────────
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -9,6 +9,7 @@ import dj_database_url
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+from django.core.exceptions import ImproperlyConfigured
 
 from .base import *  # noqa — importa toda la config base
 
@@ -56,6 +57,29 @@ DATABASES = {
 
 
 
+# ── Caché compartida entre servicios ─────────────────────────────────────────
+# La API, las transmisiones en vivo y los workers corren en contenedores
+# distintos: los tokens de versión que rotan al escribir (cursos, dashboards,
+# misiones, orden de sesiones) deben verse en todos. Por defecto se usa la
+# tabla de la base, creada por `createcachetable` en el predeploy; para Redis:
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache y
+# CACHE_LOCATION=redis://...
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'agon_cache'),
+        'TIMEOUT': 300,
+    }
+}
+if CACHES['default']['BACKEND'] == 'django.core.cache.backends.db.DatabaseCache':
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 20000}
+if CACHES['default']['BACKEND'].rsplit('.', 1)[-1] in ('FileBasedCache', 'LocMemCache', 'DummyCache'):
+    raise ImproperlyConfigured(
+        'CACHE_BACKEND debe ser compartido entre servicios (DatabaseCache o RedisCache); '
+        'una caché local deja datos obsoletos en la API y los workers.'
+    )
+
+
 # ── Archivos estáticos (WhiteNoise sirve solo los estáticos de Django) ───────
 STATIC_URL  = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -79,3 +103,7 @@ CLOUDINARY_STORAGE = {
 
 # En producción todos los archivos de media van a Cloudinary (no al disco)
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+# Los Excel/CSV de directorio no son imágenes: se suben como archivos "raw"
+DIRECTORY_IMPORT_STORAGE = os.environ.get(
+    'DIRECTORY_IMPORT_STORAGE', 'cloudinary_storage.storage.RawMediaCloudinaryStorage',
+)
@@ -26,6 +26,7 @@ urlpatterns = [
     path('api/academic/', include('academic.urls')),
     path('api/users/', include('users.urls')),
     path('api/practicas/', include('practicas.urls')),
+    path('api/gamification/', include('gamification.urls')),
 
     # Auth JWT
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
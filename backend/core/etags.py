@@ -0,0 +1,51 @@
+# core/etags.py
+# ETags y respuestas 304 para acciones GET de DRF que el frontend consulta
+# en bucle. La ETag sale de sellos de versión baratos (tokens de versión del
+# curso, campos de la sesión), no del cuerpo: un 304 no ejecuta la acción.
+
+import hashlib
+from functools import wraps
+
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts, weak=False):
+    digest = hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    """Comparación débil de ``If-None-Match`` (RFC 9110 §13.1.2)."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return etag.removeprefix('W/') in candidates
+
+
+def conditional_get(etag_func):
+    """Decora una acción GET para responder 304 cuando la ETag no cambió.
+
+    ``etag_func(view, request, *args, **kwargs)`` valida el acceso con a lo
+    sumo una consulta y retorna la ETag, o ``None`` para seguir el camino
+    normal (que responderá el error correspondiente).
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            etag = etag_func(self, request, *args, **kwargs)
+            if etag and etag_matches(request, etag):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = method(self, request, *args, **kwargs)
+                if not etag or response.status_code != status.HTTP_200_OK:
+                    return response
+            response['ETag'] = etag
+            # El navegador revalida en cada sondeo y no comparte la respuesta
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
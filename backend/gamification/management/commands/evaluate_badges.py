@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from gamification.services.badges import evaluate_badges, rebuild_badge_summaries
+
+
+class Command(BaseCommand):
+    help = 'Evalúa en lote las reglas de insignias y otorga las que falten'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses', help='Limitar a uno o más cursos')
+        parser.add_argument('--rebuild-summaries', action='store_true', help='Recuenta las insignias de todos los usuarios')
+
+    def handle(self, *args, **options):
+        awarded = evaluate_badges(options['courses'])
+        if options['rebuild_summaries']:
+            rebuild_badge_summaries()
+        self.stdout.write(self.style.SUCCESS(f'{awarded} insignias otorgadas'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from gamification.services.points import rebuild_points_ledger
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el libro de puntos y sus totales desde la asistencia guardada'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses', help='Limitar a uno o más cursos')
+
+    def handle(self, *args, **options):
+        created = rebuild_points_ledger(options['courses'])
+        self.stdout.write(self.style.SUCCESS(f'{created} movimientos de puntos registrados'))
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_first_badge_and_summaries(apps, schema_editor):
+    Badge = apps.get_model('gamification', 'Badge')
+    UserBadge = apps.get_model('gamification', 'UserBadge')
+    BadgeSummary = apps.get_model('gamification', 'BadgeSummary')
+    # Antes se creaba en el primer auto-registro; ahora la regla la otorga
+    badge, _ = Badge.objects.get_or_create(
+        name='Primera estrella',
+        defaults={'description': 'Primera asistencia marcada a tiempo.', 'icon': 'star'},
+    )
+    if not badge.criteria:
+        badge.criteria = 'first_on_time_checkin'
+        badge.save(update_fields=['criteria'])
+    BadgeSummary.objects.bulk_create([
+        BadgeSummary(user_id=row['user_id'], badge_count=row['count'], last_awarded_at=row['last'])
+        for row in UserBadge.objects.values('user_id').annotate(
+            count=models.Count('id'),
+            last=models.Max('awarded_at'),
+        )
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0003_points_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='badge',
+            name='criteria',
+            field=models.CharField(blank=True, help_text='Regla: first_on_time_checkin, streak:N o perfect_month[:N]; otro texto = insignia manual', max_length=200),
+        ),
+        migrations.CreateModel(
+            name='BadgeSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('badge_count', models.PositiveIntegerField(default=0)),
+                ('last_awarded_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='badge_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(seed_first_badge_and_summaries, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,27 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 
 class Badge(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField()
     icon = models.CharField(max_length=100, help_text="Icon name or URL")
-    criteria = models.CharField(max_length=200, blank=True, help_text="e.g. 90% attendance")
-    
+    criteria = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Regla: first_on_time_checkin, streak:N o perfect_month[:N]; otro texto = insignia manual",
+    )
+
+    def save(self, *args, **kwargs):
+        from gamification.services.badges import forget_badge_rules
+        super().save(*args, **kwargs)
+        forget_badge_rules()
+
+    def delete(self, *args, **kwargs):
+        from gamification.services.badges import forget_badge_rules
+        result = super().delete(*args, **kwargs)
+        forget_badge_rules()
+        return result
+
     def __str__(self):
         return self.name
 
@@ -17,3 +32,74 @@ class UserBadge(models.Model):
     
     class Meta:
         unique_together = ('user', 'badge')
+
+    def save(self, *args, **kwargs):
+        # Altas manuales (admin, shell): el conteo de estrellas sigue a UserBadge
+        from gamification.services.badges import refresh_badge_summaries
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            refresh_badge_summaries([self.user_id])
+
+    def delete(self, *args, **kwargs):
+        from gamification.services.badges import refresh_badge_summaries
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            refresh_badge_summaries([self.user_id])
+        return result
+
+
+class BadgeSummary(models.Model):
+    """Insignias del usuario, contadas al otorgarlas para no contarlas en cada reporte."""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='badge_summary')
+    badge_count = models.PositiveIntegerField(default=0)
+    last_awarded_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user}: {self.badge_count}"
+
+
+class PointEvent(models.Model):
+    """Movimiento del libro de puntos.
+
+    Cada cambio de asistencia agrega la diferencia de puntos entre el estado
+    nuevo y el anterior; los movimientos no se editan. La sesión se guarda
+    sin llave foránea para conservar los movimientos de sesiones borradas.
+    """
+    course = models.ForeignKey('academic.Course', on_delete=models.CASCADE, related_name='point_events')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='point_events')
+    session_id = models.IntegerField()
+    status = models.CharField(max_length=10, blank=True)
+    points = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['course', 'student'])]
+
+    def __str__(self):
+        return f"{self.student} - {self.course}: {self.points:+d}"
+
+
+class CoursePoints(models.Model):
+    """Total de puntos por matrícula, ordenado por el índice del ranking del curso."""
+    course = models.ForeignKey('academic.Course', on_delete=models.CASCADE, related_name='point_totals')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='course_points')
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('course', 'student')
+        indexes = [models.Index(fields=['course', '-points', 'student'], name='course_points_rank')]
+
+    def __str__(self):
+        return f"{self.student} - {self.course}: {self.points}"
+
+
+class StudentPoints(models.Model):
+    """Total de puntos del estudiante en todos sus cursos (ranking del programa)."""
+    student = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='point_total')
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['-points', 'student'], name='student_points_rank')]
+
+    def __str__(self):
+        return f"{self.student}: {self.points}"
@@ -0,0 +1,223 @@
+"""Reglas declarativas de insignias.
+
+``Badge.criteria`` declara la regla de la insignia:
+
+- ``first_on_time_checkin``: primer auto-registro a tiempo (PRESENT). El
+  llamado del profesor y las ediciones no la otorgan; como ``Attendance`` no
+  guarda quién escribió, ``evaluate_badges`` tampoco la otorga en retroactivo.
+- ``streak:N``: N sesiones seguidas de un curso con asistencia (PRESENT o LATE),
+  según la racha más larga guardada en el resumen de la matrícula.
+- ``perfect_month`` o ``perfect_month:N``: todas las sesiones de un curso en
+  un mes ya cerrado a tiempo, con al menos N sesiones (4 si no se indica).
+
+Cualquier otro texto es una insignia que se otorga a mano. Las reglas se
+evalúan por lotes, con unas pocas consultas por regla: ``evaluate_badges``
+revisa todas las matrículas (comando ``evaluate_badges``) y
+``award_badges_for_changes`` solo las que tocó una escritura de asistencia,
+omitiendo a quienes ya tienen la insignia. Las insignias no se retiran
+automáticamente; ``BadgeSummary`` se recalcula con cada alta o baja.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from academic.models import Attendance, EnrollmentAttendanceSummary, Session
+from academic.services.attendance_streaks import expected_streaks
+from academic.services.attendance_summary import ATTENDED_STATUSES
+from gamification.models import Badge, BadgeSummary, UserBadge
+
+FIRST_ON_TIME = 'first_on_time_checkin'
+STREAK = 'streak'
+PERFECT_MONTH = 'perfect_month'
+PERFECT_MONTH_MIN_SESSIONS = 4
+RULES_KEY = 'gamification:badge_rules'
+RULES_CACHE_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class BadgeRule:
+    badge_id: int
+    kind: str
+    amount: int | None = None
+
+
+def parse_criteria(criteria):
+    """``(regla, cantidad)`` de un criterio, o ``None`` si es una insignia manual."""
+    kind, _, amount = (criteria or '').strip().lower().partition(':')
+    if kind == FIRST_ON_TIME and not amount:
+        return FIRST_ON_TIME, None
+    if kind == STREAK and amount.isdigit() and int(amount) > 0:
+        return STREAK, int(amount)
+    if kind == PERFECT_MONTH and (not amount or amount.isdigit()):
+        return PERFECT_MONTH, int(amount) if amount else PERFECT_MONTH_MIN_SESSIONS
+    return None
+
+
+def badge_rules():
+    rules = cache.get(RULES_KEY)
+    if rules is None:
+        rules = []
+        for badge_id, criteria in Badge.objects.order_by('id').values_list('id', 'criteria'):
+            parsed = parse_criteria(criteria)
+            if parsed:
+                rules.append(BadgeRule(badge_id, *parsed))
+        cache.set(RULES_KEY, rules, RULES_CACHE_SECONDS)
+    return rules
+
+
+def forget_badge_rules():
+    cache.delete(RULES_KEY)
+    transaction.on_commit(lambda: cache.delete(RULES_KEY))
+
+
+def award_badges_for_changes(changes):
+    """Evalúa las reglas para las matrículas que ganaron una asistencia."""
+    attended = [change for change in changes if change.current in ATTENDED_STATUSES]
+    rules = badge_rules() if attended else []
+    if not rules:
+        return set()
+    held = set(UserBadge.objects.filter(
+        user_id__in={change.student_id for change in attended},
+        badge_id__in=[rule.badge_id for rule in rules],
+    ).values_list('user_id', 'badge_id'))
+    month_start = timezone.localdate().replace(day=1)
+
+    awards = set()
+    for rule in rules:
+        pending = [change for change in attended if (change.student_id, rule.badge_id) not in held]
+        if rule.kind == FIRST_ON_TIME:
+            # El cambio mismo es el primer auto-registro a tiempo que falta
+            winners = {
+                change.student_id for change in pending
+                if change.current == 'PRESENT' and change.source == Attendance.SELF_CHECKIN
+            }
+        elif rule.kind == STREAK:
+            winners = _streak_winners(rule.amount, {(change.course_id, change.student_id) for change in pending})
+        else:
+            # Solo una edición de un mes cerrado puede completarlo
+            closed = {(change.course_id, change.student_id) for change in pending if change.session_date < month_start}
+            winners = _perfect_month_winners(rule.amount, closed) if closed else set()
+        awards.update((student_id, rule.badge_id) for student_id in winners)
+    return _award(awards)
+
+
+def evaluate_badges(course_ids=None):
+    """Evalúa todas las reglas en lote; retorna cuántas insignias otorgó."""
+    awards = set()
+    for rule in badge_rules():
+        if rule.kind == FIRST_ON_TIME:
+            # Solo se gana en el auto-registro; el historial no distingue el origen
+            continue
+        if rule.kind == STREAK:
+            winners = _streak_winners(rule.amount, course_ids=course_ids)
+        else:
+            winners = _perfect_month_winners(rule.amount, course_ids=course_ids)
+        awards.update((student_id, rule.badge_id) for student_id in winners)
+    held = set(UserBadge.objects.filter(
+        badge_id__in={badge_id for _, badge_id in awards},
+    ).values_list('user_id', 'badge_id'))
+    return len(_award(awards - held))
+
+
+def rebuild_badge_summaries():
+    """Recalcula los conteos de todos los usuarios con insignias."""
+    BadgeSummary.objects.all().delete()
+    _refresh_summaries(None)
+
+
+def _award(awards):
+    if not awards:
+        return set()
+    with transaction.atomic(savepoint=False):
+        UserBadge.objects.bulk_create(
+            [UserBadge(user_id=user_id, badge_id=badge_id) for user_id, badge_id in awards],
+            ignore_conflicts=True,
+        )
+        _refresh_summaries({user_id for user_id, _ in awards})
+    return awards
+
+
+def refresh_badge_summaries(user_ids):
+    """Recalcula los conteos de los usuarios; borra el de quien quedó sin insignias."""
+    _refresh_summaries(user_ids)
+    BadgeSummary.objects.filter(user_id__in=user_ids).exclude(
+        user_id__in=UserBadge.objects.filter(user_id__in=user_ids).values('user_id'),
+    ).delete()
+
+
+def _refresh_summaries(user_ids):
+    # Se recuentan desde UserBadge: también corrige altas o bajas manuales
+    badges = UserBadge.objects.all()
+    if user_ids is not None:
+        badges = badges.filter(user_id__in=user_ids)
+    BadgeSummary.objects.bulk_create(
+        [
+            BadgeSummary(user_id=row['user_id'], badge_count=row['count'], last_awarded_at=row['last'])
+            for row in badges.values('user_id').annotate(count=Count('id'), last=Max('awarded_at'))
+        ],
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['badge_count', 'last_awarded_at'],
+    )
+
+
+def _streak_winners(length, pairs=None, course_ids=None):
+    """Estudiantes con ``length`` sesiones seguidas con asistencia en algún curso."""
+    if pairs is not None:
+        # Las matrículas recién escritas ya tienen su racha más larga al día
+        if not pairs:
+            return set()
+        return set(EnrollmentAttendanceSummary.objects.filter(
+            _pairs_filter(pairs, 'course_id'),
+            longest_streak__gte=length,
+        ).values_list('student_id', flat=True))
+    return {
+        student_id
+        for (_, student_id), (_, longest, *_) in expected_streaks(course_ids).items()
+        if longest >= length
+    }
+
+
+def _perfect_month_winners(min_sessions, pairs=None, course_ids=None):
+    """Estudiantes a tiempo en todas las sesiones de un mes cerrado de un curso."""
+    month_start = timezone.localdate().replace(day=1)
+    sessions = Session.objects.filter(date__lt=month_start)
+    present = Attendance.objects.filter(status='PRESENT', session__date__lt=month_start)
+    if pairs is not None:
+        sessions = sessions.filter(course_id__in={course_id for course_id, _ in pairs})
+        present = present.filter(_pairs_filter(pairs))
+    elif course_ids:
+        sessions = sessions.filter(course_id__in=course_ids)
+        present = present.filter(session__course_id__in=course_ids)
+
+    month_sessions = {
+        (row['course_id'], row['month']): row['count']
+        for row in sessions.annotate(month=TruncMonth('date')).values('course_id', 'month').annotate(count=Count('id'))
+        if row['count'] >= min_sessions
+    }
+    if not month_sessions:
+        return set()
+    return {
+        row['student_id']
+        for row in present.annotate(month=TruncMonth('session__date')).values(
+            'session__course_id', 'student_id', 'month',
+        ).annotate(count=Count('id'))
+        if month_sessions.get((row['session__course_id'], row['month'])) == row['count']
+    }
+
+
+def _pairs_filter(pairs, course_field='session__course_id'):
+    by_course = defaultdict(set)
+    for course_id, student_id in pairs:
+        by_course[course_id].add(student_id)
+    return reduce(or_, (
+        Q(**{course_field: course_id, 'student_id__in': student_ids})
+        for course_id, student_ids in by_course.items()
+    ))
@@ -0,0 +1,185 @@
+"""Libro de puntos y rankings.
+
+Los puntos salen del estado de asistencia (``STATUS_POINTS``). Cada cambio
+que pasa por ``record_attendance_changes`` agrega un ``PointEvent`` con la
+diferencia y suma esa diferencia a los totales por matrícula
+(``CoursePoints``) y por estudiante (``StudentPoints``). Los rankings leen
+los totales por su índice: el top sale en orden y el puesto propio es un
+conteo de los totales mayores. Al borrar un curso sus puntos se descuentan
+de los totales por estudiante.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from academic.models import Attendance
+from gamification.models import CoursePoints, PointEvent, StudentPoints
+
+STATUS_POINTS = {'PRESENT': 10, 'LATE': 2}
+LEADERBOARD_SIZE = 10
+MAX_LEADERBOARD_SIZE = 100
+REBUILD_BATCH = 2000
+
+
+def points_for(status):
+    return STATUS_POINTS.get(status, 0)
+
+
+def apply_point_changes(changes):
+    """Registra los movimientos y actualiza los totales con pocas consultas."""
+    events = [
+        PointEvent(
+            course_id=change.course_id,
+            student_id=change.student_id,
+            session_id=change.session_id,
+            status=change.current or '',
+            points=points_for(change.current) - points_for(change.previous),
+        )
+        for change in changes
+    ]
+    events = [event for event in events if event.points]
+    if not events:
+        return
+    course_deltas = defaultdict(int)
+    student_deltas = defaultdict(int)
+    for event in events:
+        course_deltas[(event.course_id, event.student_id)] += event.points
+        student_deltas[event.student_id] += event.points
+
+    with transaction.atomic(savepoint=False):
+        PointEvent.objects.bulk_create(events)
+        CoursePoints.objects.bulk_create(
+            [CoursePoints(course_id=course_id, student_id=student_id) for course_id, student_id in course_deltas],
+            ignore_conflicts=True,
+        )
+        StudentPoints.objects.bulk_create(
+            [StudentPoints(student_id=student_id) for student_id in student_deltas],
+            ignore_conflicts=True,
+        )
+        # Una actualización por curso y diferencia, no por estudiante
+        course_groups = defaultdict(list)
+        for (course_id, student_id), delta in course_deltas.items():
+            course_groups[(course_id, delta)].append(student_id)
+        for (course_id, delta), student_ids in course_groups.items():
+            if delta:
+                CoursePoints.objects.filter(course_id=course_id, student_id__in=student_ids).update(
+                    points=F('points') + delta,
+                )
+        student_groups = defaultdict(list)
+        for student_id, delta in student_deltas.items():
+            student_groups[delta].append(student_id)
+        for delta, student_ids in student_groups.items():
+            if delta:
+                StudentPoints.objects.filter(student_id__in=student_ids).update(points=F('points') + delta)
+
+
+def discount_course_points(course_id):
+    """Resta de ``StudentPoints`` los puntos que el curso aportó a cada estudiante."""
+    groups = defaultdict(list)
+    for student_id, points in CoursePoints.objects.filter(course_id=course_id).exclude(points=0).values_list(
+        'student_id', 'points',
+    ):
+        groups[points].append(student_id)
+    for points, student_ids in groups.items():
+        StudentPoints.objects.filter(student_id__in=student_ids).update(points=F('points') - points)
+
+
+def course_leaderboard(course_id, user, limit=LEADERBOARD_SIZE):
+    """Top del curso entre los matriculados y el puesto de ``user``."""
+    ranked = CoursePoints.objects.filter(course_id=course_id, student__enrolled_courses=course_id)
+    return _leaderboard(ranked, user, limit)
+
+
+def program_leaderboard(program_id, user, limit=LEADERBOARD_SIZE):
+    """Top de los estudiantes del programa por sus puntos en todos los cursos."""
+    ranked = StudentPoints.objects.filter(student__program_id=program_id)
+    return _leaderboard(ranked, user, limit)
+
+
+def _leaderboard(ranked, user, limit):
+    rows = list(ranked.select_related('student').order_by('-points', 'student_id')[:limit])
+    top = []
+    for position, row in enumerate(rows, start=1):
+        # Empates con el mismo puesto (1, 2, 2, 4)
+        rank = top[-1]['rank'] if top and top[-1]['points'] == row.points else position
+        top.append({
+            'rank': rank,
+            'student_id': row.student_id,
+            'name': f"{row.student.first_name} {row.student.last_name}".strip() or row.student.username,
+            'photo': row.student.photo.url if row.student.photo else None,
+            'points': row.points,
+        })
+    return {'top': top, 'me': _my_rank(ranked, user, top)}
+
+
+def _my_rank(ranked, user, top):
+    mine = next((item for item in top if item['student_id'] == user.id), None)
+    if mine:
+        return {'rank': mine['rank'], 'points': mine['points']}
+    points = ranked.filter(student_id=user.id).values_list('points', flat=True).first()
+    if points is None:
+        return None
+    return {'rank': ranked.filter(points__gt=points).count() + 1, 'points': points}
+
+
+@transaction.atomic
+def rebuild_points_ledger(course_ids=None):
+    """Reconstruye el libro desde la asistencia guardada.
+
+    Reemplaza los movimientos del alcance por uno por asistencia con puntos
+    y recalcula los totales. Retorna cuántos movimientos quedaron.
+    """
+    events = PointEvent.objects.all()
+    totals = CoursePoints.objects.all()
+    attendances = Attendance.objects.filter(status__in=STATUS_POINTS)
+    if course_ids:
+        events = events.filter(course_id__in=course_ids)
+        totals = totals.filter(course_id__in=course_ids)
+        attendances = attendances.filter(session__course_id__in=course_ids)
+    affected = set(totals.values_list('student_id', flat=True))
+    events.delete()
+    totals.delete()
+
+    created = 0
+    rows = attendances.values_list('session__course_id', 'session_id', 'student_id', 'status')
+    for chunk in _chunks(rows.iterator(chunk_size=REBUILD_BATCH)):
+        created += len(PointEvent.objects.bulk_create([
+            PointEvent(course_id=course_id, student_id=student_id, session_id=session_id, status=status, points=points_for(status))
+            for course_id, session_id, student_id, status in chunk
+        ]))
+        affected.update(student_id for _, _, student_id, _ in chunk)
+
+    CoursePoints.objects.bulk_create(
+        [
+            CoursePoints(course_id=row['course_id'], student_id=row['student_id'], points=row['total'])
+            for row in events.values('course_id', 'student_id').annotate(total=Sum('points'))
+        ],
+        batch_size=REBUILD_BATCH,
+    )
+    students = StudentPoints.objects.all()
+    course_totals = CoursePoints.objects.all()
+    if course_ids:
+        # Los demás cursos de estos estudiantes también cuentan en su total
+        students = students.filter(student_id__in=affected)
+        course_totals = course_totals.filter(student_id__in=affected)
+    students.delete()
+    StudentPoints.objects.bulk_create(
+        [
+            StudentPoints(student_id=row['student_id'], points=row['total'])
+            for row in course_totals.values('student_id').annotate(total=Sum('points'))
+        ],
+        batch_size=REBUILD_BATCH,
+    )
+    return created
+
+
+def _chunks(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == REBUILD_BATCH:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
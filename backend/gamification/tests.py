@@ -1,3 +1,196 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from academic.models import Course
+from academic.services.enrollment import unenroll_students
+from gamification.models import Badge, BadgeSummary, CoursePoints, PointEvent, StudentPoints, UserBadge
+from gamification.services.badges import parse_criteria
+from users.models import Faculty, Program, User
+
+
+class PointsLedgerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        faculty = Faculty.objects.create(name='Educación')
+        self.program = Program.objects.create(name='Recreación', faculty=faculty, code='REC')
+        self.teacher = User.objects.create_user(username='points-teacher', role='TEACHER')
+        self.ana, self.beto, self.caro = [
+            User.objects.create_user(username=name, first_name=name.title(), role='STUDENT', program=self.program)
+            for name in ('ana', 'beto', 'caro')
+        ]
+        self.course = Course.objects.create(teacher=self.teacher, name='Puntos', code='PTS01')
+        self.other_course = Course.objects.create(teacher=self.teacher, name='Otros puntos', code='PTS02')
+        self.course.students.add(self.ana, self.beto, self.caro)
+        self.other_course.students.add(self.caro)
+
+    def _roll_call(self, course, day, statuses):
+        self.client.force_authenticate(self.teacher)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/academic/attendance/bulk_create/', {
+                'course_id': course.id,
+                'date': day,
+                'attendances': [{'student_id': student.id, 'status': status} for student, status in statuses],
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def _leaderboard(self, user, url):
+        self.client.force_authenticate(user)
+        return self.client.get(url)
+
+    def _totals(self):
+        return (
+            dict(CoursePoints.objects.filter(course=self.course).values_list('student__username', 'points')),
+            dict(StudentPoints.objects.values_list('student__username', 'points')),
+        )
+
+    def test_attendance_writes_append_events_and_keep_running_totals(self):
+        self._roll_call(self.course, '2026-08-03', [(self.ana, 'PRESENT'), (self.beto, 'LATE'), (self.caro, 'ABSENT')])
+        self._roll_call(self.course, '2026-08-03', [(self.ana, 'LATE'), (self.beto, 'LATE'), (self.caro, 'ABSENT')])
+        self._roll_call(self.other_course, '2026-08-03', [(self.caro, 'PRESENT')])
+
+        self.assertEqual(
+            list(PointEvent.objects.filter(student=self.ana).order_by('id').values_list('status', 'points')),
+            [('PRESENT', 10), ('LATE', -8)],
+        )
+        self.assertEqual(self._totals(), ({'ana': 2, 'beto': 2}, {'ana': 2, 'beto': 2, 'caro': 10}))
+
+        self.client.force_authenticate(self.teacher)
+        report = self.client.get(f'/api/academic/courses/{self.course.id}/student_report/').json()
+        self.assertEqual({row['first_name']: row['points'] for row in report}, {'Ana': 2, 'Beto': 2, 'Caro': 0})
+        self.client.force_authenticate(self.caro)
+        self.assertEqual(self.client.get('/api/academic/dashboard/stats/').json()['stats']['points'], 10)
+
+    def test_course_leaderboard_ranks_ties_and_the_callers_position(self):
+        self._roll_call(self.course, '2026-08-03', [(self.ana, 'PRESENT'), (self.beto, 'PRESENT'), (self.caro, 'LATE')])
+        url = f'/api/gamification/courses/{self.course.id}/leaderboard/'
+
+        board = self._leaderboard(self.caro, url).json()
+        self.assertEqual([(item['name'], item['rank']) for item in board['top']], [('Ana', 1), ('Beto', 1), ('Caro', 3)])
+        self.assertEqual(board['me'], {'rank': 3, 'points': 2})
+
+        board = self._leaderboard(self.caro, f'{url}?limit=1').json()
+        self.assertEqual(([item['name'] for item in board['top']], board['me']), (['Ana'], {'rank': 3, 'points': 2}))
+
+        unenroll_students(self.course, self.ana)
+        board = self._leaderboard(self.teacher, url).json()
+        self.assertEqual(([item['name'] for item in board['top']], board['me']), (['Beto', 'Caro'], None))
+        self.assertEqual(self._leaderboard(self.ana, url).status_code, 403)
+
+    def test_program_leaderboard_sums_every_course(self):
+        self._roll_call(self.course, '2026-08-03', [(self.ana, 'PRESENT'), (self.caro, 'LATE')])
+        self._roll_call(self.other_course, '2026-08-03', [(self.caro, 'PRESENT')])
+        outsider = User.objects.create_user(username='outsider', role='STUDENT')
+        url = f'/api/gamification/programs/{self.program.id}/leaderboard/'
+
+        board = self._leaderboard(self.beto, url).json()
+        self.assertEqual([(item['name'], item['points']) for item in board['top']], [('Caro', 12), ('Ana', 10)])
+        self.assertIsNone(board['me'])
+        self.assertEqual(self._leaderboard(outsider, url).status_code, 403)
+
+    def test_deleting_a_course_discounts_its_points(self):
+        self._roll_call(self.course, '2026-08-03', [(self.ana, 'PRESENT'), (self.caro, 'LATE')])
+        self._roll_call(self.other_course, '2026-08-03', [(self.caro, 'PRESENT')])
+        self.client.force_authenticate(self.teacher)
+        self.assertEqual(self.client.delete(f'/api/academic/courses/{self.course.id}/').status_code, 204)
+
+        self.assertEqual(dict(StudentPoints.objects.values_list('student__username', 'points')), {'ana': 0, 'caro': 10})
+        board = self._leaderboard(self.beto, f'/api/gamification/programs/{self.program.id}/leaderboard/').json()
+        self.assertEqual([(item['name'], item['points']) for item in board['top']][:1], [('Caro', 10)])
+
+    def test_rebuild_replays_attendance_into_the_ledger(self):
+        self._roll_call(self.course, '2026-08-03', [(self.ana, 'PRESENT'), (self.beto, 'LATE')])
+        self._roll_call(self.course, '2026-08-04', [(self.ana, 'PRESENT')])
+        self._roll_call(self.other_course, '2026-08-03', [(self.caro, 'PRESENT')])
+        expected = self._totals()
+        CoursePoints.objects.filter(student=self.ana).update(points=999)
+        StudentPoints.objects.filter(student=self.caro).delete()
+        PointEvent.objects.filter(course=self.course).delete()
+
+        call_command('rebuild_points_ledger', '--course', str(self.course.id), stdout=StringIO())
+        self.assertEqual(PointEvent.objects.filter(course=self.course).count(), 3)
+        self.assertEqual(self._totals(), ({'ana': 20, 'beto': 2}, {'ana': 20, 'beto': 2}))
+
+        call_command('rebuild_points_ledger', stdout=StringIO())
+        self.assertEqual(self._totals(), expected)
+
+
+class BadgeRuleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='badge-teacher', role='TEACHER')
+        self.ana = User.objects.create_user(username='badge-ana', first_name='Ana', role='STUDENT')
+        self.beto = User.objects.create_user(username='badge-beto', first_name='Beto', role='STUDENT')
+        self.course = Course.objects.create(teacher=self.teacher, name='Insignias', code='BDG01')
+        self.course.students.add(self.ana, self.beto)
+        self.first = Badge.objects.get(criteria='first_on_time_checkin')
+        self.streak = Badge.objects.create(name='Racha', description='Tres seguidas', icon='flame', criteria='streak:3')
+        self.month = Badge.objects.create(name='Mes perfecto', description='Todo el mes', icon='medal', criteria='perfect_month:2')
+
+    _roll_call = PointsLedgerTests._roll_call
+
+    def _badges(self, user):
+        return set(UserBadge.objects.filter(user=user).values_list('badge__name', flat=True))
+
+    def test_criteria_are_parsed_into_rules(self):
+        self.assertEqual(parse_criteria('streak:5'), ('streak', 5))
+        self.assertEqual(parse_criteria('perfect_month'), ('perfect_month', 4))
+        self.assertEqual(parse_criteria('First_On_Time_Checkin'), ('first_on_time_checkin', None))
+        self.assertIsNone(parse_criteria('90% attendance'))
+        self.assertIsNone(parse_criteria('streak:0'))
+
+    def _self_checkin(self, student):
+        self.client.force_authenticate(self.teacher)
+        opened = self.client.post('/api/academic/attendance/open_self_checkin/', {
+            'course_id': self.course.id, 'minutes': 10,
+        }, format='json').json()
+        self.client.force_authenticate(student)
+        return self.client.post('/api/academic/attendance/self_checkin/', {
+            'session_id': opened['session_id'], 'code': opened['code'],
+        }, format='json').json()
+
+    def test_roll_calls_award_streaks_and_only_self_checkins_the_first_star(self):
+        self._roll_call(self.course, '2026-08-03', [(self.ana, 'LATE'), (self.beto, 'PRESENT')])
+        self.assertEqual((self._badges(self.ana), self._badges(self.beto)), (set(), set()))
+
+        self._roll_call(self.course, '2026-08-04', [(self.ana, 'PRESENT'), (self.beto, 'ABSENT')])
+        self._roll_call(self.course, '2026-08-05', [(self.ana, 'LATE'), (self.beto, 'PRESENT')])
+        self.assertEqual(self._badges(self.ana), {'Racha'})
+        self.assertEqual(self._badges(self.beto), set())
+
+        self.assertTrue(self._self_checkin(self.beto)['reward']['badge_awarded'])
+        self.assertEqual(self._badges(self.beto), {'Primera estrella'})
+
+        self.assertEqual(BadgeSummary.objects.get(user=self.ana).badge_count, 1)
+        self.client.force_authenticate(self.teacher)
+        report = self.client.get(f'/api/academic/courses/{self.course.id}/student_report/').json()
+        self.assertEqual({row['first_name']: row['stars'] for row in report}, {'Ana': 1, 'Beto': 1})
+
+    def test_manual_grants_and_removals_refresh_the_star_count(self):
+        granted = UserBadge.objects.create(user=self.ana, badge=self.month)
+        UserBadge.objects.create(user=self.ana, badge=self.streak)
+        self.assertEqual(BadgeSummary.objects.get(user=self.ana).badge_count, 2)
+
+        granted.delete()
+        self.assertEqual(BadgeSummary.objects.get(user=self.ana).badge_count, 1)
+        UserBadge.objects.get(user=self.ana).delete()
+        self.assertFalse(BadgeSummary.objects.filter(user=self.ana).exists())
+
+    def test_perfect_months_are_awarded_for_closed_months(self):
+        self._roll_call(self.course, '2025-03-03', [(self.ana, 'PRESENT'), (self.beto, 'PRESENT')])
+        self._roll_call(self.course, '2025-03-10', [(self.ana, 'PRESENT'), (self.beto, 'LATE')])
+        self.assertIn('Mes perfecto', self._badges(self.ana))
+        self.assertNotIn('Mes perfecto', self._badges(self.beto))
 
-# Create your tests here.
+        UserBadge.objects.all().delete()
+        call_command('evaluate_badges', '--rebuild-summaries', stdout=StringIO())
+        # La primera estrella no se otorga en retroactivo: el historial no guarda el origen
+        self.assertEqual(self._badges(self.ana), {'Mes perfecto'})
+        self.assertEqual(self._badges(self.beto), set())
+        self.assertEqual(BadgeSummary.objects.get(user=self.ana).badge_count, 1)
+        self.assertFalse(BadgeSummary.objects.filter(user=self.beto).exists())
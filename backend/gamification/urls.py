@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import course_leaderboard_view, program_leaderboard_view
+
+urlpatterns = [
+    path('courses/<int:course_id>/leaderboard/', course_leaderboard_view, name='course-leaderboard'),
+    path('programs/<int:program_id>/leaderboard/', program_leaderboard_view, name='program-leaderboard'),
+]
@@ -1,3 +1,51 @@
-from django.shortcuts import render
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
 
-# Create your views here.
+from academic.models import Course
+from academic.services.missions import can_manage_course, user_roles
+from gamification.services.points import (
+    LEADERBOARD_SIZE,
+    MAX_LEADERBOARD_SIZE,
+    course_leaderboard,
+    program_leaderboard,
+)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def course_leaderboard_view(request, course_id):
+    """Ranking de puntos del curso: ``top`` y el puesto propio en ``me``.
+
+    GET /api/gamification/courses/<id>/leaderboard/?limit=10
+    Lo ven el profesor del curso, los administradores y los matriculados.
+    """
+    course = Course.objects.filter(id=course_id).first()
+    if course is None:
+        return Response({'error': 'Curso no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+    enrolled = Course.students.through.objects.filter(course_id=course.id, user_id=request.user.id).exists()
+    if not (enrolled or can_manage_course(request.user, course)):
+        return Response({'error': 'No tienes acceso a este curso'}, status=status.HTTP_403_FORBIDDEN)
+    return Response(course_leaderboard(course.id, request.user, _limit(request)))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def program_leaderboard_view(request, program_id):
+    """Ranking de los estudiantes del programa por sus puntos en todos los cursos.
+
+    GET /api/gamification/programs/<id>/leaderboard/?limit=10
+    Lo ven los estudiantes del programa, coordinadores y administradores.
+    """
+    roles = user_roles(request.user)
+    is_staff = request.user.is_superuser or 'ADMIN' in roles or 'COORDINATOR' in roles
+    if not (is_staff or request.user.program_id == program_id):
+        return Response({'error': 'No tienes acceso a este programa'}, status=status.HTTP_403_FORBIDDEN)
+    return Response(program_leaderboard(program_id, request.user, _limit(request)))
+
+
+def _limit(request):
+    value = request.query_params.get('limit', '')
+    if not value.isdigit():
+        return LEADERBOARD_SIZE
+    return max(1, min(int(value), MAX_LEADERBOARD_SIZE))
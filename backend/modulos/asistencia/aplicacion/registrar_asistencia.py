@@ -9,6 +9,7 @@ from modulos.asistencia.dominio.entidades import (
     AsistenciaInvalidaError,
     CursoNoEncontradoError,
     RegistroAsistencia,
+    ResultadoRegistroLote,
 )
 from modulos.asistencia.dominio.puertos import AsistenciaRepositoryPort
 
@@ -23,7 +24,7 @@ class RegistrarAsistenciaUseCase:
         curso_id: int,
         fecha: date,
         asistencias: Iterable[Mapping[str, object]],
-    ) -> int:
+    ) -> ResultadoRegistroLote:
         if not isinstance(curso_id, int) or curso_id <= 0:
             raise AsistenciaInvalidaError(
                 "El identificador del curso debe ser positivo."
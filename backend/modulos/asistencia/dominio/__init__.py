@@ -5,6 +5,7 @@ from .entidades import (
     CursoNoEncontradoError,
     EstadoAsistencia,
     RegistroAsistencia,
+    ResultadoRegistroLote,
     SesionNoEncontradaError,
 )
 from .puertos import AsistenciaRepositoryPort
@@ -17,5 +18,6 @@ __all__ = [
     "CursoNoEncontradoError",
     "EstadoAsistencia",
     "RegistroAsistencia",
+    "ResultadoRegistroLote",
     "SesionNoEncontradaError",
 ]
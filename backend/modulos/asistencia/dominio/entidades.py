@@ -69,3 +69,14 @@ class RegistroAsistencia:
                 "El estado de asistencia no es valido."
             ) from error
         return cls(estudiante_id=estudiante_id, estado=estado_valido)
+
+
+@dataclass(frozen=True, slots=True)
+class ResultadoRegistroLote:
+    creados: int = 0
+    actualizados: int = 0
+    sin_cambios: int = 0
+
+    @property
+    def procesados(self) -> int:
+        return self.creados + self.actualizados + self.sin_cambios
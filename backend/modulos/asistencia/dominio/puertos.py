@@ -4,7 +4,7 @@ from abc import ABC, abstractmethod
 from datetime import date
 from typing import Sequence
 
-from .entidades import RegistroAsistencia
+from .entidades import RegistroAsistencia, ResultadoRegistroLote
 
 
 class AsistenciaRepositoryPort(ABC):
@@ -14,8 +14,8 @@ class AsistenciaRepositoryPort(ABC):
         curso_id: int,
         fecha: date,
         registros: Sequence[RegistroAsistencia],
-    ) -> int:
-        """Crea o actualiza registros y retorna la cantidad procesada."""
+    ) -> ResultadoRegistroLote:
+        """Crea o actualiza registros y retorna cuantos cambiaron."""
 
     @abstractmethod
     def obtener_docente_id(self, curso_id: int) -> int | None:
@@ -3,12 +3,16 @@ from __future__ import annotations
 from datetime import date
 from typing import Sequence
 
-from django.db import transaction
+from django.db import IntegrityError, transaction
 
 from academic.models import Attendance, Course, Session
+from academic.services.attendance_changes import AttendanceChange, record_attendance_changes
+from academic.services.checkin_queue import flush_pending_checkins, pending_statuses
+from academic.services.course_cache import cached_course_payload
 from modulos.asistencia.dominio.entidades import (
     AsistenciaInvalidaError,
     RegistroAsistencia,
+    ResultadoRegistroLote,
 )
 from modulos.asistencia.dominio.puertos import AsistenciaRepositoryPort
 
@@ -20,7 +24,7 @@ class DjangoAsistenciaRepository(AsistenciaRepositoryPort):
         curso_id: int,
         fecha: date,
         registros: Sequence[RegistroAsistencia],
-    ) -> int:
+    ) -> ResultadoRegistroLote:
         curso = Course.objects.get(id=curso_id)
         estudiantes = {registro.estudiante_id for registro in registros}
         matriculados = set(
@@ -31,14 +35,78 @@ class DjangoAsistenciaRepository(AsistenciaRepositoryPort):
                 "Todos los estudiantes deben estar matriculados en el curso."
             )
         sesion, _ = Session.objects.get_or_create(course=curso, date=fecha)
+        # Los auto-registros encolados se vuelcan antes para que el llamado prevalezca
+        flush_pending_checkins([sesion.id])
 
-        for registro in registros:
-            Attendance.objects.update_or_create(
+        existentes, cambios = self._escribir_cambios(sesion, registros)
+        if cambios:
+            record_attendance_changes([
+                AttendanceChange(
+                    course_id=curso.id,
+                    session_id=sesion.id,
+                    session_date=sesion.date,
+                    student_id=registro.estudiante_id,
+                    previous=existentes.get(registro.estudiante_id),
+                    current=registro.estado.value,
+                )
+                for registro in cambios
+            ])
+        actualizados = sum(1 for registro in cambios if registro.estudiante_id in existentes)
+        return ResultadoRegistroLote(
+            creados=len(cambios) - actualizados,
+            actualizados=actualizados,
+            sin_cambios=len(registros) - len(cambios),
+        )
+
+    def _escribir_cambios(self, sesion, registros):
+        """Escribe las filas nuevas o con estado distinto y devuelve el estado previo."""
+        while True:
+            # Las filas existentes quedan bloqueadas: un auto-registro concurrente
+            # espera a que termine el llamado y los estados previos no se desfasan.
+            existentes = dict(
+                Attendance.objects.select_for_update()
+                .filter(session=sesion)
+                .values_list("student_id", "status")
+            )
+            cambios = [
+                registro for registro in registros
+                if existentes.get(registro.estudiante_id) != registro.estado.value
+            ]
+            nuevos = [
+                Attendance(
+                    session=sesion,
+                    student_id=registro.estudiante_id,
+                    status=registro.estado.value,
+                )
+                for registro in cambios
+                if registro.estudiante_id not in existentes
+            ]
+            if not nuevos:
+                break
+            try:
+                # Una fila creada en paralelo hace fallar el INSERT y se relee con bloqueo
+                with transaction.atomic():
+                    Attendance.objects.bulk_create(nuevos)
+                break
+            except IntegrityError:
+                continue
+        modificados = [
+            Attendance(
                 session=sesion,
                 student_id=registro.estudiante_id,
-                defaults={"status": registro.estado.value},
+                status=registro.estado.value,
             )
-        return len(registros)
+            for registro in cambios
+            if registro.estudiante_id in existentes
+        ]
+        if modificados:
+            Attendance.objects.bulk_create(
+                modificados,
+                update_conflicts=True,
+                unique_fields=["session", "student"],
+                update_fields=["status"],
+            )
+        return existentes, cambios
 
     def obtener_docente_id(self, curso_id: int) -> int | None:
         return Course.objects.filter(id=curso_id).values_list(
@@ -49,17 +117,19 @@ class DjangoAsistenciaRepository(AsistenciaRepositoryPort):
         return Course.objects.filter(id=curso_id, students__id=usuario_id).exists()
 
     def obtener_asistencia_sesion(self, curso_id: int, fecha: date) -> dict[int, str]:
-        return dict(
-            Attendance.objects.filter(
+        # El caso de uso ya validó el acceso; el resultado es igual para todo lector autorizado
+        return cached_course_payload(f"session_attendance:{fecha.isoformat()}", curso_id, "shared", lambda: {
+            **dict(Attendance.objects.filter(
                 session__course_id=curso_id,
                 session__date=fecha,
-            ).values_list('student_id', 'status')
-        )
+            ).values_list("student_id", "status")),
+            # Auto-registros aceptados que aún no se vuelcan
+            **pending_statuses(curso_id, fecha),
+        })
 
     @transaction.atomic
     def eliminar_sesion(self, curso_id: int, fecha: date) -> bool:
-        eliminados, _ = Session.objects.filter(
-            course_id=curso_id,
-            date=fecha,
-        ).delete()
-        return eliminados > 0
+        sesiones = list(Session.objects.filter(course_id=curso_id, date=fecha))
+        for sesion in sesiones:
+            sesion.delete()
+        return bool(sesiones)
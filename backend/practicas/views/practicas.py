@@ -21,6 +21,7 @@ from practicas.serializers import (
     ReflexionEstudianteSerializer, UserCompactSerializer,
 )
 from users.models import CoordinatorProfile
+from users.services.user_search import search_users
 
 User = get_user_model()
 
@@ -260,13 +261,12 @@ def docentes_del_programa(request):
         except Program.DoesNotExist:
             pass
 
+    ordering = ['first_name', 'last_name']
     if q:
-        qs = qs.filter(
-            Q(first_name__icontains=q) | Q(last_name__icontains=q) |
-            Q(document_number__icontains=q) | Q(email__icontains=q)
-        )
+        qs = search_users(qs, q)
+        ordering.insert(0, 'search_rank')
 
-    return Response(UserCompactSerializer(qs.order_by('first_name', 'last_name'), many=True).data)
+    return Response(UserCompactSerializer(qs.order_by(*ordering), many=True).data)
 
 
 @api_view(['POST'])
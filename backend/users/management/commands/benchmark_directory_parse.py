@@ -0,0 +1,100 @@
+import csv
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+
+from users.services.directory_import import iter_row_chunks, iter_rows
+
+HEADERS = ['Primer nombre', 'Primer apellido', 'Segundo apellido', 'Documento', 'Correo', 'Celular']
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el pico de memoria (RSS) al leer un directorio generado: la lista completa '
+        'de filas frente a la lectura por lotes que usa la importación; no escribe en la base'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000)
+        parser.add_argument('--format', choices=['xlsx', 'csv', 'both'], default='both')
+
+    def handle(self, *args, **options):
+        formats = ['xlsx', 'csv'] if options['format'] == 'both' else [options['format']]
+        with tempfile.TemporaryDirectory() as folder:
+            for file_format in formats:
+                path = Path(folder) / f'directorio.{file_format}'
+                self._write_file(path, options['rows'])
+                size = path.stat().st_size / (1024 * 1024)
+                self.stdout.write(f'{file_format}: {options["rows"]} filas, {size:.1f} MiB')
+                for label, mode in (('lista completa', 'list'), ('por lotes', 'chunks')):
+                    rows, seconds, baseline, peak = self._measure(path, mode)
+                    self.stdout.write(
+                        f'  {label}: {rows} filas en {seconds:.1f} s, RSS base {baseline / 1024:.0f} MiB, '
+                        f'pico {peak / 1024:.0f} MiB (+{(peak - baseline) / 1024:.0f} MiB)'
+                    )
+
+    def _write_file(self, path, total):
+        rows = (
+            [f'Nombre {n}', f'Apellido {n}', 'Peña', str(10_000_000 + n), f'estudiante{n}@upn.edu.co', f'300{n:07d}']
+            for n in range(total)
+        )
+        if path.suffix == '.csv':
+            with path.open('w', newline='', encoding='utf-8') as handle:
+                writer = csv.writer(handle, delimiter=';')
+                writer.writerow(HEADERS)
+                writer.writerows(rows)
+            return
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(HEADERS)
+        for row in rows:
+            sheet.append(row)
+        workbook.save(path)
+
+    def _measure(self, path, mode):
+        # Cada lectura corre en un proceso aparte para que el pico no arrastre el anterior
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        process = context.Process(target=_read, args=(str(path), mode, results))
+        process.start()
+        measured = results.get()
+        process.join()
+        return measured
+
+
+def _read(path, mode, results):
+    _reset_peak()
+    baseline = _rss_kib('VmRSS')
+    started = time.perf_counter()
+    with open(path, 'rb') as handle:
+        if mode == 'list':
+            rows = len(list(iter_rows(handle)))
+        else:
+            rows = sum(len(chunk) for chunk in iter_row_chunks(handle))
+    results.put((rows, time.perf_counter() - started, baseline, _rss_kib('VmHWM')))
+
+
+def _reset_peak():
+    # Linux permite reiniciar el pico de RSS del proceso
+    try:
+        Path('/proc/self/clear_refs').write_text('5')
+    except OSError:
+        pass
+
+
+def _rss_kib(field):
+    try:
+        for line in Path('/proc/self/status').read_text().splitlines():
+            if line.startswith(f'{field}:'):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reporta bytes y Linux KiB
+    return peak // 1024 if sys.platform == 'darwin' else peak
@@ -0,0 +1,120 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import Faculty, Program
+from users.services.user_search import EMAIL_FIELDS, NAME_FIELDS, search_users, sync_search_terms
+
+FIRST_NAMES = ['José', 'María', 'Ana', 'Luis', 'Íngrid', 'Andrés', 'Sofía', 'Camilo', 'Nicolás', 'Valentina']
+LAST_NAMES = ['Peña', 'Núñez', 'Gómez', 'Rodríguez', 'Muñoz', 'Álvarez', 'Pérez', 'Ramírez', 'Castañeda', 'López']
+QUERIES = ['pena', 'maria gomez', 'castaneda', '1001234', '10012345', 'estudiante4']
+BENCHMARK_KEY = 'benchmark-user-search'
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la latencia de la búsqueda de personas en /users/, /users/search/ (ILINYX) y '
+        '/practicas/docentes/ con usuarios generados; los datos se descartan al terminar'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=20, help='Solicitudes por consulta y endpoint')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            admin, program = self._populate(options['users'])
+            headers = {'Authorization': f'Bearer {AccessToken.for_user(admin)}'}
+            endpoints = {
+                'users': ('/api/users/', 'search', headers),
+                'ilinyx': ('/api/users/search/', 'q', {'X-Ilinyx-Api-Key': BENCHMARK_KEY}),
+                'docentes': (f'/api/practicas/docentes/?program={program.id}', 'q', headers),
+            }
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                ILINYX_API_KEY=BENCHMARK_KEY,
+            ):
+                for name, (path, param, request_headers) in endpoints.items():
+                    if name == 'docentes' and connection.vendor != 'postgresql':
+                        # Su filtro de roles (``roles__contains``) solo existe en PostgreSQL
+                        self.stdout.write(f'{name}: requiere PostgreSQL, se omite')
+                        continue
+                    self._report(name, self._measure_endpoint(path, param, request_headers, options['repeat']))
+            # Solo la consulta del listado (conteo y primera página), sin serializar
+            self._report('consulta con términos', self._measure_query(lambda query: search_users(
+                get_user_model().objects.all(), query,
+            ).order_by('search_rank', 'first_name', 'last_name', 'id'), options['repeat']))
+            self._report('consulta icontains previa', self._measure_query(_legacy_search, options['repeat']))
+            transaction.set_rollback(True)
+
+    def _populate(self, total):
+        User = get_user_model()
+        faculty = Faculty.objects.create(name='Benchmark', code='BENCH-F')
+        program = Program.objects.create(name='Benchmark', code='BENCH-P', faculty=faculty)
+        admin = User.objects.create_user(username='benchmark-search-admin', role='ADMIN')
+        started = time.perf_counter()
+        for start in range(0, total, 5000):
+            users = []
+            for n in range(start, min(start + 5000, total)):
+                teacher = n % 20 == 0
+                users.append(User(
+                    username=f'estudiante{n}@upn.edu.co',
+                    email=f'estudiante{n}@upn.edu.co',
+                    password='!',
+                    first_name=FIRST_NAMES[n % len(FIRST_NAMES)],
+                    last_name=LAST_NAMES[(n // len(FIRST_NAMES)) % len(LAST_NAMES)],
+                    second_lastname=LAST_NAMES[n % len(LAST_NAMES)],
+                    document_number=str(10_000_000 + n),
+                    role='TEACHER' if teacher else 'STUDENT',
+                    roles=['TEACHER'] if teacher else ['STUDENT'],
+                    program=program if teacher else None,
+                ))
+            User.objects.bulk_create(users, batch_size=1000)
+            sync_search_terms(users)
+        self.stdout.write(f'{total} usuarios generados en {time.perf_counter() - started:.1f} s')
+        return admin, program
+
+    def _measure_endpoint(self, path, param, headers, repeat):
+        client = Client()
+        separator = '&' if '?' in path else '?'
+        # Calienta importaciones y cachés antes de medir
+        client.get(path, headers=headers)
+        timings = []
+        for query in QUERIES:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = client.get(f'{path}{separator}{param}={query}', headers=headers)
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f'{path} respondió {response.status_code} para "{query}"')
+        return timings
+
+    def _measure_query(self, build, repeat):
+        timings = []
+        for query in QUERIES:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                qs = build(query)
+                qs.count()
+                list(qs[:25])
+                timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def _report(self, label, timings):
+        p95 = statistics.quantiles(timings, n=100)[94] if len(timings) > 1 else timings[0]
+        self.stdout.write(f'{label}: p50 {statistics.median(timings):.1f} ms, p95 {p95:.1f} ms, máx {max(timings):.1f} ms')
+
+
+def _legacy_search(query):
+    # El filtro que hacía ``UserViewSet`` antes de los términos normalizados
+    condition = Q()
+    for field in (*NAME_FIELDS, *EMAIL_FIELDS, 'document_number'):
+        condition |= Q(**{f'{field}__icontains': query})
+    return get_user_model().objects.filter(condition).order_by('first_name', 'last_name', 'id')
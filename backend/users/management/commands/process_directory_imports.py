@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users.services.directory_jobs import process_directory_imports, requeue_stale_imports
+
+
+class Command(BaseCommand):
+    help = 'Procesa en segundo plano las cargas de directorio pendientes (cola en la base de datos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Procesa las pendientes y termina')
+        parser.add_argument('--interval', type=float, default=2.0, help='Segundos entre revisiones de la cola')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            requeued = requeue_stale_imports()
+            if requeued:
+                self.stdout.write(f'{requeued} cargas abandonadas vuelven a la cola')
+            processed = process_directory_imports()
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f'{processed} cargas de directorio procesadas'))
+            if options['once']:
+                return
+            if not processed:
+                time.sleep(options['interval'])
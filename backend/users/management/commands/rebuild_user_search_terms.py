@@ -0,0 +1,12 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from users.services.user_search import rebuild_search_terms
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los términos de búsqueda de personas (útil tras escrituras masivas fuera del ORM)'
+
+    def handle(self, *args, **options):
+        total = rebuild_search_terms(get_user_model().objects.all())
+        self.stdout.write(self.style.SUCCESS(f'Términos de búsqueda recalculados para {total} usuarios'))
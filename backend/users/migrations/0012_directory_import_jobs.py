@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_user_google_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='directoryimportbatch',
+            name='failure_message',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='directoryimportbatch',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='directoryimportbatch',
+            name='rows_processed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='directoryimportbatch',
+            name='source',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='directoryimportbatch',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Las cargas existentes ya se procesaron dentro de su solicitud
+        migrations.AddField(
+            model_name='directoryimportbatch',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En proceso'), ('completed', 'Completada'), ('failed', 'Fallida')], db_index=True, default='completed', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='directoryimportbatch',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En proceso'), ('completed', 'Completada'), ('failed', 'Fallida')], db_index=True, default='pending', max_length=10),
+        ),
+    ]
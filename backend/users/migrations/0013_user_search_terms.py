@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:18
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Copia de ``users.services.user_search`` a la fecha de esta migración: el
+# servicio puede cambiar después sin alterar lo que hace el relleno inicial
+NAME_FIELDS = ('first_name', 'second_name', 'last_name', 'second_lastname')
+EMAIL_FIELDS = ('username', 'email', 'personal_email')
+
+
+def _normalize(value):
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower().strip()
+
+
+def _terms(user):
+    terms = set()
+    for field in NAME_FIELDS:
+        for word in re.split(r'[^a-z0-9]+', _normalize(getattr(user, field))):
+            if word:
+                terms.add(('name', word))
+    for field in EMAIL_FIELDS:
+        email = _normalize(getattr(user, field))
+        if not email:
+            continue
+        terms.add(('email', email))
+        local = email.split('@', 1)[0]
+        terms.update(('email', part) for part in re.split(r'[._+\-]+', local) if part and part != email)
+    document = _normalize(user.document_number)
+    digits = re.sub(r'\D', '', document)
+    document = digits if digits and not re.search(r'[a-z]', document) else re.sub(r'[^a-z0-9]', '', document)
+    if document:
+        terms.add(('document', document))
+    return {(kind, term[:255]) for kind, term in terms}
+
+
+def backfill_search_terms(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    UserSearchTerm = apps.get_model('users', 'UserSearchTerm')
+    terms = []
+    for user in User.objects.iterator(chunk_size=1000):
+        terms.extend(UserSearchTerm(user_id=user.pk, kind=kind, term=term) for kind, term in sorted(_terms(user)))
+        if len(terms) >= 5000:
+            UserSearchTerm.objects.bulk_create(terms, batch_size=1000)
+            terms = []
+    UserSearchTerm.objects.bulk_create(terms, batch_size=1000)
+
+
+def create_trigram_index(apps, schema_editor):
+    # Solo PostgreSQL: ``term LIKE '%...%'`` usa el índice GIN de trigramas
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS users_search_term_trgm '
+        'ON users_usersearchterm USING gin (term gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS users_search_term_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_directory_import_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('name', 'Nombre'), ('email', 'Correo'), ('document', 'Documento')], max_length=10)),
+                ('term', models.CharField(db_index=True, max_length=255)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'term'], name='users_search_kind_term')],
+            },
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+        migrations.RunPython(backfill_search_terms, migrations.RunPython.noop),
+    ]
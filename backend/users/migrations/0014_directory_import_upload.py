@@ -0,0 +1,33 @@
+from django.core.files.base import ContentFile
+from django.db import migrations, models
+
+import users.models
+
+
+def move_pending_sources(apps, schema_editor):
+    # Las cargas aún sin procesar pasan su archivo al almacenamiento
+    DirectoryImportBatch = apps.get_model('users', 'DirectoryImportBatch')
+    pending = DirectoryImportBatch.objects.filter(status__in=('pending', 'running'), source__isnull=False)
+    for batch in pending.iterator(chunk_size=10):
+        batch.upload.save(batch.file_name, ContentFile(bytes(batch.source)), save=False)
+        batch.save(update_fields=['upload'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_user_search_terms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='directoryimportbatch',
+            name='upload',
+            field=models.FileField(blank=True, editable=False, storage=users.models.directory_import_storage, upload_to=users.models.directory_import_path),
+        ),
+        migrations.RunPython(move_pending_sources, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='directoryimportbatch',
+            name='source',
+        ),
+    ]
@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.core.files.storage import default_storage
 from django.db import models
+from django.utils.module_loading import import_string
 from cloudinary.models import CloudinaryField
 import uuid
 from django.utils import timezone
@@ -107,6 +110,10 @@ class User(AbstractUser):
         if self.role and self.role not in self.roles:
             self.roles.append(self.role)
         super().save(*args, **kwargs)
+        from users.services.user_search import SEARCH_SOURCE_FIELDS, sync_search_terms
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or SEARCH_SOURCE_FIELDS.intersection(update_fields):
+            sync_search_terms([self])
 
     @property
     def is_coordinator(self):
@@ -185,7 +192,25 @@ class PasswordResetToken(models.Model):
         return f"Reset token for {self.user.username}"
 
 
+def directory_import_storage():
+    if settings.DIRECTORY_IMPORT_STORAGE:
+        return import_string(settings.DIRECTORY_IMPORT_STORAGE)()
+    return default_storage
+
+
+def directory_import_path(batch, filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else 'xlsx'
+    return f'directory_imports/{uuid.uuid4().hex}.{extension}'
+
+
 class DirectoryImportBatch(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pendiente'),
+        ('running', 'En proceso'),
+        ('completed', 'Completada'),
+        ('failed', 'Fallida'),
+    )
+
     file_name = models.CharField(max_length=255)
     created_by = models.ForeignKey(
         User,
@@ -199,6 +224,19 @@ class DirectoryImportBatch(models.Model):
     skipped_count = models.PositiveIntegerField(default=0)
     errors = models.JSONField(default=list, blank=True)
     is_reverted = models.BooleanField(default=False, db_index=True)
+    # La carga se procesa en segundo plano (``process_directory_imports``)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    # Archivo subido; se borra al terminar de procesarlo
+    upload = models.FileField(
+        upload_to=directory_import_path,
+        storage=directory_import_storage,
+        blank=True,
+        editable=False,
+    )
+    rows_processed = models.PositiveIntegerField(default=0)
+    failure_message = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -228,3 +266,25 @@ class DirectoryImportEntry(models.Model):
 
     class Meta:
         ordering = ['id']
+
+
+class UserSearchTerm(models.Model):
+    """Términos normalizados (sin tildes, en minúsculas) para buscar personas.
+
+    Los mantiene ``users.services.user_search`` al guardar un usuario y en las
+    cargas de directorio; ``search_users`` los consulta por prefijo o contenido.
+    """
+    KIND_CHOICES = (
+        ('name', 'Nombre'),
+        ('email', 'Correo'),
+        ('document', 'Documento'),
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_terms')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    term = models.CharField(max_length=255, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['kind', 'term'], name='users_search_kind_term')]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.term}"
@@ -3,6 +3,7 @@ from django.core.validators import validate_email
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from academic.models import Course
+from academic.services.enrollment import enroll_students
 from .models import Faculty, Program, CoordinatorProfile
 
 User = get_user_model()
@@ -265,7 +266,7 @@ class StudentRegisterSerializer(serializers.ModelSerializer):
 
         if class_code:
             course = Course.objects.get(code__iexact=class_code, is_archived=False)
-            course.students.add(user)
+            enroll_students(course, user)
 
         return user
 
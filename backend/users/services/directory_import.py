@@ -1,11 +1,18 @@
+import csv
+import io
 import re
+from collections import defaultdict
 from dataclasses import dataclass
+from itertools import chain, count
 
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
 from openpyxl import load_workbook
 
 from users.models import DirectoryImportBatch, DirectoryImportEntry
+from users.services.user_search import sync_search_terms
 
 User = get_user_model()
 
@@ -38,6 +45,15 @@ RESTORE_FIELDS = [
     'phone_number', 'is_active', 'is_directory_imported', 'requires_onboarding',
     'directory_batch_id',
 ]
+# Campos que escribe ``assign_directory_data``
+DIRECTORY_FIELDS = [
+    'first_name', 'last_name', 'second_name', 'second_lastname', 'document_number',
+    'username', 'email', 'personal_email', 'phone_number', 'role', 'roles',
+    'is_active', 'is_directory_imported', 'requires_onboarding', 'directory_batch',
+]
+IMPORT_CHUNK_SIZE = 1000
+MAX_ERRORS = 50
+CSV_SAMPLE_BYTES = 64 * 1024
 
 
 @dataclass
@@ -62,20 +78,62 @@ def clean_cell(value):
     return str(value).strip()
 
 
-def parse_rows(file_obj):
-    workbook = load_workbook(file_obj, read_only=True, data_only=True)
-    sheet = workbook.active
-    rows = list(sheet.iter_rows(values_only=True))
-    if not rows:
-        return []
-    headers = [normalize_header(item) for item in rows[0]]
-    parsed = []
-    for index, row in enumerate(rows[1:], start=2):
-        item = {key: clean_cell(row[pos]) for pos, key in enumerate(headers) if key}
+def is_csv(file_obj):
+    return getattr(file_obj, 'name', '').lower().endswith('.csv')
+
+
+def iter_rows(file_obj):
+    """Filas con datos como diccionarios, leídas del archivo a medida que se piden."""
+    headers = None
+    for index, row in enumerate(_csv_rows(file_obj) if is_csv(file_obj) else _sheet_rows(file_obj), start=1):
+        if headers is None:
+            headers = [normalize_header(item) for item in row]
+            continue
+        item = {key: clean_cell(row[pos] if pos < len(row) else None) for pos, key in enumerate(headers) if key}
         if any(item.values()):
             item['_row'] = index
-            parsed.append(item)
-    return parsed
+            yield item
+
+
+def iter_row_chunks(file_obj, size=IMPORT_CHUNK_SIZE):
+    chunk = []
+    for item in iter_rows(file_obj):
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _sheet_rows(file_obj):
+    # El modo de solo lectura recorre la hoja sin cargarla completa
+    workbook = load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _csv_rows(file_obj):
+    raw = getattr(file_obj, 'file', file_obj)
+    raw.seek(0)
+    sample = raw.read(CSV_SAMPLE_BYTES)
+    raw.seek(0)
+    try:
+        # Un carácter cortado al final de la muestra no descarta UTF-8
+        sample.decode('utf-8')
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError as exc:
+        encoding = 'utf-8-sig' if exc.reason == 'unexpected end of data' else 'cp1252'
+    text = io.TextIOWrapper(raw, encoding=encoding, newline='')
+    try:
+        header = text.readline()
+        # Excel en español separa con punto y coma
+        delimiter = ';' if header.count(';') > header.count(',') else ','
+        yield from csv.reader(chain([header], text), delimiter=delimiter)
+    finally:
+        text.detach()
 
 
 def validate_row(item):
@@ -90,62 +148,136 @@ def validate_row(item):
     return None
 
 
-@transaction.atomic
-def import_student_directory(file_obj, created_by=None):
-    batch = DirectoryImportBatch.objects.create(
-        file_name=getattr(file_obj, 'name', 'directorio.xlsx')[:255],
-        created_by=created_by if getattr(created_by, 'is_authenticated', False) else None,
-    )
-    created = updated = skipped = 0
+def import_directory_rows(batch, file_obj, on_progress=None):
+    """Importa el archivo en ``batch`` dentro de la transacción del llamador.
+
+    ``on_progress(filas, conteos)`` se llama después de escribir cada lote.
+    """
+    counts = {'created': 0, 'updated': 0, 'skipped': 0}
     errors = []
-    for item in parse_rows(file_obj):
+    processed = 0
+    for chunk in iter_row_chunks(file_obj):
+        import_chunk(batch, chunk, counts, errors)
+        processed += len(chunk)
+        if on_progress:
+            on_progress(processed, counts)
+    batch.created_count = counts['created']
+    batch.updated_count = counts['updated']
+    batch.skipped_count = counts['skipped']
+    batch.errors = errors
+    batch.rows_processed = processed
+    batch.status = 'completed'
+    batch.finished_at = timezone.now()
+    batch.save(update_fields=[
+        'created_count', 'updated_count', 'skipped_count', 'errors',
+        'rows_processed', 'status', 'finished_at',
+    ])
+    return ImportResult(batch.id, counts['created'], counts['updated'], counts['skipped'], errors)
+
+
+class DirectoryIndex:
+    """Usuarios de un lote de filas por documento y correo.
+
+    Refleja el estado en memoria del lote: una fila ve lo que crearon o
+    cambiaron las anteriores, como si cada una se guardara antes de leer la
+    siguiente. Cada lote se escribe antes de cargar el siguiente, así que un
+    índice nuevo por lote ve en la base lo que dejaron los anteriores.
+    """
+
+    def __init__(self, items):
+        self.users = {}
+        self.by_document = {}
+        self.by_email = defaultdict(list)
+        self.sequence = count()
+        # Dos consultas por lote: documentos y correos en minúsculas
+        documents = {item['document_number'] for item in items}
+        emails = {item['email'].lower() for item in items if item.get('email')}
+        found = list(User.objects.filter(document_number__in=documents)) if documents else []
+        if emails:
+            found += User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=emails)
+        for user in found:
+            if user.pk not in self.users:
+                self.add(user)
+
+    def add(self, user):
+        if user.pk:
+            self.users[user.pk] = user
+        user._directory_order = (0, user.pk) if user.pk else (1, next(self.sequence))
+        self._index(user)
+
+    def document_owner(self, document):
+        return self.by_document.get(document)
+
+    def email_owner(self, email):
+        # Como ``filter(email__iexact=...).first()``: el de menor id
+        owners = self.by_email.get(email)
+        return min(owners, key=lambda user: user._directory_order) if owners else None
+
+    def update(self, user, assign):
+        """Aplica ``assign`` al usuario y lo reubica con su documento y correo nuevos."""
+        if self.by_document.get(user.document_number) is user:
+            del self.by_document[user.document_number]
+        owners = self.by_email.get((user.email or '').lower(), [])
+        if user in owners:
+            owners.remove(user)
+        assign(user)
+        self._index(user)
+
+    def _index(self, user):
+        if user.document_number:
+            self.by_document.setdefault(user.document_number, user)
+        if user.email:
+            self.by_email[user.email.lower()].append(user)
+
+
+def import_chunk(batch, items, counts, errors):
+    """Clasifica las filas en memoria y las escribe con pocas consultas."""
+    index = DirectoryIndex([item for item in items if not validate_row(item)])
+    entries = []
+    created = {}
+    updated = {}
+    for item in items:
         error = validate_row(item)
+        state = None
+        if not error:
+            email = item.get('email', '').lower()
+            document_owner = index.document_owner(item['document_number'])
+            email_owner = index.email_owner(email) if email else None
+            user = document_owner or email_owner
+            error = validate_user_match(item, user, document_owner, email_owner)
         if error:
-            skipped += 1
-            errors.append(error)
-            create_entry(batch, item, 'skipped', message=error)
+            counts['skipped'] += 1
+            if len(errors) < MAX_ERRORS:
+                errors.append(error)
+            entries.append((build_entry(batch, item, 'skipped', message=error), None))
             continue
-        result = upsert_student(item, batch)
-        if result in ('created', 'updated'):
-            created += result == 'created'
-            updated += result == 'updated'
+        previous = snapshot_user(user) if user else {}
+        if not user:
+            user = User(username=f"dir-{item['document_number']}", email=email)
+            user.set_unusable_password()
+            index.add(user)
+            created[id(user)] = user
+            state = 'created'
         else:
-            skipped += 1
-            errors.append(result)
-            create_entry(batch, item, 'skipped', message=result)
-    batch.created_count = created
-    batch.updated_count = updated
-    batch.skipped_count = skipped
-    batch.errors = errors[:50]
-    batch.save(update_fields=['created_count', 'updated_count', 'skipped_count', 'errors'])
-    return ImportResult(batch.id, created, updated, skipped, errors[:50])
-
-
-def upsert_student(item, batch):
-    email = item.get('email', '').lower()
-    document = item['document_number']
-    document_owner = User.objects.filter(document_number=document).first()
-    user = document_owner or (User.objects.filter(email__iexact=email).first() if email else None)
-    error = validate_user_match(item, user, document_owner)
-    if error:
-        return error
-    previous = snapshot_user(user) if user else {}
-    if not user:
-        user = User(username=f'dir-{document}', email=email)
-        user.set_unusable_password()
-        state = 'created'
-    else:
-        state = 'updated'
-    assign_directory_data(user, item, batch)
-    user.save()
-    create_entry(batch, item, state, user=user, previous_data=previous)
-    return state
-
-
-def validate_user_match(item, user, document_owner):
-    email = item.get('email', '').lower()
-    email_owner = User.objects.filter(email__iexact=email).first() if email else None
-    if document_owner and email_owner and document_owner.id != email_owner.id:
+            if id(user) not in created:
+                updated[id(user)] = user
+            state = 'updated'
+        index.update(user, lambda target: assign_directory_data(target, item, batch))
+        counts[state] += 1
+        entries.append((build_entry(batch, item, state, previous_data=previous), user))
+
+    # Primero las actualizaciones: pueden liberar documentos o usuarios que toman los nuevos
+    User.objects.bulk_update(updated.values(), DIRECTORY_FIELDS, batch_size=IMPORT_CHUNK_SIZE)
+    User.objects.bulk_create(created.values(), batch_size=IMPORT_CHUNK_SIZE)
+    # ``bulk_*`` no pasa por ``User.save``
+    sync_search_terms([*updated.values(), *created.values()])
+    for entry, user in entries:
+        entry.user = user
+    DirectoryImportEntry.objects.bulk_create([entry for entry, _ in entries], batch_size=IMPORT_CHUNK_SIZE)
+
+
+def validate_user_match(item, user, document_owner, email_owner):
+    if document_owner and email_owner and document_owner is not email_owner:
         return f"Fila {item['_row']}: documento pertenece a otro correo"
     if user and user.role not in ('STUDENT', 'ESTUDIANTE') and 'STUDENT' not in (user.roles or []):
         return f"Fila {item['_row']}: el correo pertenece a un usuario no estudiante"
@@ -185,10 +317,9 @@ def assign_directory_data(user, item, batch):
     user.directory_batch = batch
 
 
-def create_entry(batch, item, action, user=None, previous_data=None, message=''):
-    DirectoryImportEntry.objects.create(
+def build_entry(batch, item, action, previous_data=None, message=''):
+    return DirectoryImportEntry(
         batch=batch,
-        user=user,
         action=action,
         email=item.get('email', ''),
         document_number=item.get('document_number', ''),
@@ -199,22 +330,43 @@ def create_entry(batch, item, action, user=None, previous_data=None, message='')
 
 @transaction.atomic
 def revert_directory_batch(batch):
+    """Deshace la carga con borrados y actualizaciones por lotes; retorna las entradas aplicadas."""
     if batch.is_reverted:
         return 0
-    affected = 0
-    for entry in batch.entries.select_related('user').filter(action__in=['created', 'updated']):
-        if entry.action == 'created' and entry.user and entry.user.directory_batch_id == batch.id:
-            entry.user.delete()
-            affected += 1
-        elif entry.action == 'updated' and entry.user:
-            restore_user(entry.user, entry.previous_data)
-            affected += 1
+    created_ids = set()
+    snapshots = {}
+    updated_entries = 0
+    entries = batch.entries.filter(action__in=['created', 'updated'], user__isnull=False).order_by('id')
+    for action, user_id, user_batch_id, previous_data in entries.values_list(
+        'action', 'user_id', 'user__directory_batch_id', 'previous_data',
+    ).iterator(chunk_size=IMPORT_CHUNK_SIZE):
+        if action == 'created':
+            # Solo se borra si ninguna carga posterior tomó al usuario
+            if user_batch_id == batch.id:
+                created_ids.add(user_id)
+        else:
+            # La primera foto es el estado anterior a toda la carga
+            snapshots.setdefault(user_id, previous_data)
+            updated_entries += 1
+
+    created = sorted(created_ids)
+    for start in range(0, len(created), IMPORT_CHUNK_SIZE):
+        User.objects.filter(id__in=created[start:start + IMPORT_CHUNK_SIZE]).delete()
+    restored = [
+        restore_user(User(id=user_id), data)
+        for user_id, data in snapshots.items()
+        if user_id not in created_ids
+    ]
+    User.objects.bulk_update(restored, RESTORE_FIELDS, batch_size=IMPORT_CHUNK_SIZE)
+    sync_search_terms(restored)
+
     batch.is_reverted = True
     batch.save(update_fields=['is_reverted'])
-    return affected
+    return len(created) + updated_entries
 
 
 def restore_user(user, data):
+    """Aplica la foto previa sin guardar; ``bulk_update`` la escribe por lotes."""
     for field in RESTORE_FIELDS:
         setattr(user, field, data.get(field))
-    user.save()
+    return user
@@ -0,0 +1,136 @@
+"""Cargas de directorio procesadas en segundo plano.
+
+La solicitud guarda el archivo subido en ``DirectoryImportBatch.upload``
+(``DIRECTORY_IMPORT_STORAGE``, compartido con el worker) con estado
+``pending`` y responde de inmediato. El comando ``process_directory_imports``
+reclama las cargas pendientes y procesa cada una en una sola transacción,
+leyendo el archivo desde el almacenamiento: si falla, la carga queda
+``failed`` sin usuarios ni entradas a medias. En ambos casos el archivo se
+borra al terminar.
+
+El avance se escribe en la fila de la carga después de cada lote por una
+conexión aparte en autocommit, así ``directory/imports/<id>/`` lo ve antes
+de que la transacción de la carga confirme. En SQLite (solo desarrollo) esa
+transacción bloquea la base y la carga solo muestra el resultado final.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.utils import timezone
+
+from users.models import DirectoryImportBatch
+from users.services.directory_import import import_directory_rows
+
+logger = logging.getLogger(__name__)
+
+# Una carga en curso más antigua se da por abandonada (el worker murió) y se reintenta
+STALE_IMPORT_MINUTES = 30
+PROGRESS_FIELDS = ('rows_processed', 'created_count', 'updated_count', 'skipped_count')
+
+
+def enqueue_directory_import(file_obj, created_by=None):
+    batch = DirectoryImportBatch(
+        file_name=getattr(file_obj, 'name', 'directorio.xlsx')[:255],
+        created_by=created_by if getattr(created_by, 'is_authenticated', False) else None,
+    )
+    # El almacenamiento copia el archivo por partes, sin leerlo completo en memoria
+    batch.upload.save(batch.file_name, file_obj, save=False)
+    batch.save()
+    return batch
+
+
+def claim_directory_import():
+    """Marca como en curso la carga pendiente más antigua; ``None`` si no hay."""
+    pending = DirectoryImportBatch.objects.filter(status='pending').order_by('created_at', 'id')
+    for batch_id in pending.values_list('id', flat=True)[:10]:
+        # La actualización condicional evita que dos workers tomen la misma carga
+        claimed = DirectoryImportBatch.objects.filter(id=batch_id, status='pending').update(
+            status='running',
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return DirectoryImportBatch.objects.get(id=batch_id)
+    return None
+
+
+def run_directory_import(batch):
+    """Procesa una carga reclamada; retorna el resultado o ``None`` si falló."""
+    progress = _progress_connection()
+    try:
+        with batch.upload.open('rb') as upload, transaction.atomic():
+            return import_directory_rows(
+                batch,
+                upload,
+                on_progress=lambda processed, counts: _publish_progress(progress, batch.id, processed, counts),
+            )
+    except Exception as exc:
+        logger.exception('Falló la carga de directorio %s', batch.id)
+        DirectoryImportBatch.objects.filter(id=batch.id).update(
+            status='failed',
+            failure_message=str(exc)[:500] or exc.__class__.__name__,
+            finished_at=timezone.now(),
+        )
+        return None
+    finally:
+        if progress is not None:
+            progress.close()
+        _discard_upload(batch)
+
+
+def process_directory_imports(limit=None):
+    """Procesa cargas pendientes hasta vaciar la cola; retorna cuántas tomó."""
+    processed = 0
+    while limit is None or processed < limit:
+        batch = claim_directory_import()
+        if batch is None:
+            break
+        run_directory_import(batch)
+        processed += 1
+    return processed
+
+
+def requeue_stale_imports():
+    # Su transacción no llegó a confirmarse: reintentarla no duplica filas
+    return DirectoryImportBatch.objects.filter(
+        status='running',
+        started_at__lt=timezone.now() - timedelta(minutes=STALE_IMPORT_MINUTES),
+    ).update(status='pending', started_at=None)
+
+
+def import_progress(batch):
+    """Filas y conteos de la carga, parciales mientras está en curso."""
+    return {field: getattr(batch, field) for field in PROGRESS_FIELDS}
+
+
+def _progress_connection():
+    if connections[DEFAULT_DB_ALIAS].vendor == 'sqlite':
+        return None
+    progress = connections.create_connection(DEFAULT_DB_ALIAS)
+    if progress.vendor == 'postgresql':
+        # La transacción de la carga nunca bloquea la fila, pero una espera no debe colgar el worker
+        with progress.cursor() as cursor:
+            cursor.execute("SET lock_timeout = '2s'")
+    return progress
+
+
+def _publish_progress(progress, batch_id, processed, counts):
+    if progress is None:
+        return
+    quote = progress.ops.quote_name
+    assignments = ', '.join(f'{quote(field)} = %s' for field in PROGRESS_FIELDS)
+    try:
+        with progress.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {quote(DirectoryImportBatch._meta.db_table)} SET {assignments} WHERE {quote("id")} = %s',
+                [processed, counts['created'], counts['updated'], counts['skipped'], batch_id],
+            )
+    except DatabaseError:
+        # El avance es informativo: la carga sigue aunque no se publique
+        logger.warning('No se pudo publicar el avance de la carga %s', batch_id, exc_info=True)
+
+
+def _discard_upload(batch):
+    if batch.upload:
+        batch.upload.delete(save=False)
+    DirectoryImportBatch.objects.filter(id=batch.id).update(upload='')
@@ -0,0 +1,132 @@
+"""Búsqueda de personas por nombre, correo o documento.
+
+Cada usuario guarda sus términos normalizados en ``UserSearchTerm``: las
+palabras de sus nombres y apellidos y sus correos sin tildes y en
+minúsculas, y los dígitos del documento. Así "pena" encuentra a "Peña" y
+la consulta usa los índices de ``term`` en lugar de recorrer ocho columnas
+con ``icontains``: el prefijo usa el índice B-tree y, en PostgreSQL, la
+búsqueda por contenido usa el índice de trigramas.
+
+Los resultados quedan anotados con ``search_rank``: 0 si el documento
+coincide exacto, 1 si algún término empieza por lo buscado y 2 si solo lo
+contiene.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+
+from users.models import UserSearchTerm
+
+NAME_FIELDS = ('first_name', 'second_name', 'last_name', 'second_lastname')
+EMAIL_FIELDS = ('username', 'email', 'personal_email')
+SEARCH_SOURCE_FIELDS = frozenset((*NAME_FIELDS, *EMAIL_FIELDS, 'document_number'))
+# Los trigramas necesitan al menos tres caracteres; antes solo se busca por prefijo
+MIN_CONTAINS_LENGTH = 3
+MAX_QUERY_TOKENS = 5
+SYNC_CHUNK_SIZE = 1000
+
+
+def normalize_search(value):
+    """Quita tildes y pasa a minúsculas: "Peña Núñez" → "pena nunez"."""
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower().strip()
+
+
+def search_terms(user):
+    """Pares ``(kind, term)`` que indexan al usuario."""
+    terms = set()
+    for field in NAME_FIELDS:
+        for word in re.split(r'[^a-z0-9]+', normalize_search(getattr(user, field))):
+            if word:
+                terms.add(('name', word))
+    for field in EMAIL_FIELDS:
+        email = normalize_search(getattr(user, field))
+        if not email:
+            continue
+        terms.add(('email', email))
+        # Las partes del usuario del correo ("ana.perez@...") también se buscan por
+        # prefijo; el dominio, común a casi todos, sigue en el correo completo
+        local = email.split('@', 1)[0]
+        terms.update(('email', part) for part in re.split(r'[._+\-]+', local) if part and part != email)
+    document = _document_term(user.document_number)
+    if document:
+        terms.add(('document', document))
+    return {(kind, term[:255]) for kind, term in terms}
+
+
+def sync_search_terms(users):
+    """Reemplaza los términos de los usuarios guardados."""
+    users = [user for user in users if user.pk]
+    for start in range(0, len(users), SYNC_CHUNK_SIZE):
+        chunk = users[start:start + SYNC_CHUNK_SIZE]
+        UserSearchTerm.objects.filter(user_id__in=[user.pk for user in chunk]).delete()
+        UserSearchTerm.objects.bulk_create([
+            UserSearchTerm(user_id=user.pk, kind=kind, term=term)
+            for user in chunk
+            for kind, term in sorted(search_terms(user))
+        ], batch_size=SYNC_CHUNK_SIZE)
+
+
+def rebuild_search_terms(queryset):
+    """Recalcula los términos de todo el queryset; retorna cuántos usuarios tocó."""
+    fields = ('id', *SEARCH_SOURCE_FIELDS)
+    users = list(queryset.only(*fields).iterator(chunk_size=SYNC_CHUNK_SIZE))
+    sync_search_terms(users)
+    return len(users)
+
+
+def search_users(queryset, text):
+    """Filtra ``queryset`` por ``text`` y anota ``search_rank`` para ordenar."""
+    tokens = query_tokens(text)
+    if not tokens:
+        return queryset.none()
+    for token in tokens:
+        # ``IN`` deja que la base parta del índice de términos y no de cada usuario
+        queryset = queryset.filter(pk__in=UserSearchTerm.objects.filter(_match(token)).values('user_id'))
+    ranks = []
+    if tokens[0].isdigit():
+        ranks.append(When(Exists(UserSearchTerm.objects.filter(
+            user_id=OuterRef('pk'), kind='document', term=tokens[0],
+        )), then=Value(0)))
+    ranks.append(When(Exists(UserSearchTerm.objects.filter(
+        _prefix(tokens[0]), user_id=OuterRef('pk'),
+    )), then=Value(1)))
+    return queryset.annotate(search_rank=Case(*ranks, default=Value(2), output_field=IntegerField()))
+
+
+def query_tokens(text):
+    """Palabras de la consulta con la misma normalización que los términos."""
+    tokens = []
+    for word in normalize_search(text).split():
+        if re.fullmatch(r'[\d.,\-]+', word):
+            # "1.001.234" se busca como documento
+            word = re.sub(r'\D', '', word)
+        if '@' in word:
+            tokens.append(word)
+        else:
+            tokens.extend(part for part in re.split(r'[^a-z0-9._]+', word) if part)
+    return [token for token in tokens if token][:MAX_QUERY_TOKENS]
+
+
+def _match(token):
+    if len(token) < MIN_CONTAINS_LENGTH:
+        return _prefix(token)
+    return Q(term__contains=token)
+
+
+def _prefix(token):
+    if connection.vendor == 'postgresql':
+        # Django crea el índice ``varchar_pattern_ops`` que sirve a ``LIKE 'x%'``
+        return Q(term__startswith=token)
+    # El LIKE de SQLite ignora mayúsculas y no usa el índice; los términos ya
+    # están en minúsculas, así que el rango equivale al prefijo
+    return Q(term__gte=token, term__lt=token + '\uffff')
+
+
+def _document_term(value):
+    value = normalize_search(value)
+    digits = re.sub(r'\D', '', value)
+    # Documentos con letras (pasaportes) se guardan alfanuméricos
+    return digits if digits and not re.search(r'[a-z]', value) else re.sub(r'[^a-z0-9]', '', value)
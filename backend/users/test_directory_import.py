@@ -0,0 +1,258 @@
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from openpyxl import Workbook
+from rest_framework.test import APIClient
+
+from users.models import DirectoryImportBatch, DirectoryImportEntry, User
+from users.services.directory_import import iter_row_chunks, revert_directory_batch
+from users.services.directory_jobs import (
+    _publish_progress as directory_jobs_publish,
+    claim_directory_import,
+    enqueue_directory_import,
+    run_directory_import,
+)
+
+HEADERS = ['Primer nombre', 'Primer apellido', 'Documento', 'Correo', 'Celular']
+
+
+def directory_file(rows, name='admitidos.xlsx'):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADERS)
+    for row in rows:
+        sheet.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+def import_student_directory(upload):
+    enqueue_directory_import(upload)
+    return run_directory_import(claim_directory_import())
+
+
+class DirectoryImportTests(TestCase):
+    def setUp(self):
+        self.existing = User.objects.create_user(
+            username='old-ana@upn.edu.co', email='Ana@upn.edu.co', role='STUDENT',
+            first_name='Ana', document_number='1001',
+        )
+        self.teacher = User.objects.create_user(username='teacher@upn.edu.co', email='teacher@upn.edu.co', role='TEACHER')
+
+    def test_rows_are_created_updated_or_skipped_like_before(self):
+        result = import_student_directory(directory_file([
+            ['Ana María', 'Pérez', '1001', 'ana@upn.edu.co', '3001'],
+            ['Beto', 'Rojas', '2002', 'beto@upn.edu.co', None],
+            ['Beto', 'Rojas', '2002', 'beto@upn.edu.co', '3002'],
+            ['Caro', 'Díaz', '2002', 'ana@upn.edu.co', None],
+            ['Profe', 'Uno', '4004', 'TEACHER@upn.edu.co', None],
+            ['Sin', 'Documento', None, 'x@upn.edu.co', None],
+            ['Dani', 'Gómez', '5005', None, None],
+        ]))
+
+        self.assertEqual((result.created, result.updated, result.skipped), (2, 2, 3))
+        self.assertEqual(result.errors, [
+            'Fila 5: documento pertenece a otro correo',
+            'Fila 6: el correo pertenece a un usuario no estudiante',
+            'Fila 7: faltan document_number',
+        ])
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.first_name, self.existing.username), ('Ana María', 'ana@upn.edu.co'))
+        self.assertTrue(self.existing.requires_onboarding)
+        beto = User.objects.get(document_number='2002')
+        self.assertEqual((beto.phone_number, beto.roles), ('3002', ['STUDENT']))
+        self.assertFalse(beto.has_usable_password())
+        self.assertEqual(User.objects.get(document_number='5005').username, 'dir-5005')
+
+        entries = list(DirectoryImportEntry.objects.filter(batch_id=result.batch_id).order_by('id'))
+        self.assertEqual(
+            [(entry.action, entry.user_id) for entry in entries],
+            [
+                ('updated', self.existing.id), ('created', beto.id), ('updated', beto.id),
+                ('skipped', None), ('skipped', None), ('skipped', None),
+                ('created', User.objects.get(document_number='5005').id),
+            ],
+        )
+        self.assertEqual(entries[0].previous_data['username'], 'old-ana@upn.edu.co')
+        self.assertEqual(entries[2].previous_data['phone_number'], None)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def measure(first_document, size):
+            rows = [
+                [f'Nombre {n}', 'Apellido', str(n), f'e{n}@upn.edu.co', None]
+                for n in range(first_document, first_document + size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                result = import_student_directory(directory_file(rows))
+            self.assertEqual(result.created, size)
+            return len(queries)
+
+        # Solo el límite de parámetros de la base parte los lotes (usuarios, entradas y términos)
+        self.assertLess(measure(20000, 200), measure(10000, 5) + 15)
+
+    def test_csv_uploads_share_the_header_normalization(self):
+        content = 'Nombres;Apellido;Cédula;Correo electrónico\nPeña;Núñez;6006;pena@upn.edu.co\n;;;\n'
+        for encoding in ('utf-8-sig', 'cp1252'):
+            User.objects.filter(document_number='6006').delete()
+            upload = BytesIO(content.encode(encoding))
+            upload.name = 'admitidos.CSV'
+            result = import_student_directory(upload)
+            self.assertEqual((result.created, result.skipped), (1, 0), encoding)
+            user = User.objects.get(document_number='6006')
+            self.assertEqual((user.first_name, user.last_name, user.email), ('Peña', 'Núñez', 'pena@upn.edu.co'))
+
+    def test_rows_are_read_in_fixed_size_chunks(self):
+        upload = directory_file([[f'N{n}', 'A', str(n), None, None] for n in range(1, 8)])
+        chunks = list(iter_row_chunks(upload, size=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual(chunks[2][0], {
+            'first_name': 'N7', 'last_name': 'A', 'document_number': '7', 'email': '', 'phone_number': '', '_row': 8,
+        })
+
+    def test_revert_restores_updated_and_removes_created_users(self):
+        result = import_student_directory(directory_file([
+            ['Ana María', 'Pérez', '1001', 'ana@upn.edu.co', None],
+            ['Beto', 'Rojas', '2002', 'beto@upn.edu.co', None],
+        ]))
+        batch = DirectoryImportBatch.objects.get(id=result.batch_id)
+
+        self.assertEqual(revert_directory_batch(batch), 2)
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.first_name, self.existing.username), ('Ana', 'old-ana@upn.edu.co'))
+        self.assertEqual(self.existing.directory_batch_id, None)
+        self.assertFalse(User.objects.filter(document_number='2002').exists())
+
+    def test_revert_uses_the_first_snapshot_and_skips_users_taken_by_later_batches(self):
+        first = import_student_directory(directory_file([
+            ['Ana María', 'Pérez', '1001', 'ana@upn.edu.co', '3001'],
+            ['Ana Lucía', 'Pérez', '1001', 'ana@upn.edu.co', '3002'],
+            ['Beto', 'Rojas', '2002', 'beto@upn.edu.co', None],
+            ['Beto', 'Rojas', '2002', 'beto@upn.edu.co', '3003'],
+            ['Caro', 'Díaz', '3003', 'caro@upn.edu.co', None],
+        ]))
+        import_student_directory(directory_file([['Carolina', 'Díaz', '3003', 'caro@upn.edu.co', None]]))
+
+        batch = DirectoryImportBatch.objects.get(id=first.batch_id)
+        self.assertEqual(revert_directory_batch(batch), 4)
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.first_name, self.existing.phone_number), ('Ana', None))
+        self.assertFalse(User.objects.filter(document_number='2002').exists())
+        self.assertEqual(User.objects.get(document_number='3003').first_name, 'Carolina')
+        self.assertEqual(revert_directory_batch(batch), 0)
+
+    def test_revert_query_count_does_not_grow_with_rows(self):
+        def measure(first_document, size):
+            rows = [
+                [f'Nombre {n}', 'Apellido', str(n), f'e{n}@upn.edu.co', None]
+                for n in range(first_document, first_document + size)
+            ]
+            import_student_directory(directory_file(rows))
+            updates = import_student_directory(directory_file([[f'Otro {n}', *row[1:]] for n, row in enumerate(rows)]))
+            batch = DirectoryImportBatch.objects.get(id=updates.batch_id)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(revert_directory_batch(batch), size)
+            return len(queries)
+
+        self.assertLess(measure(20000, 200), measure(10000, 5) + 10)
+
+
+class DirectoryImportJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='jobs-admin', role='ADMIN')
+        self.client.force_authenticate(self.admin)
+
+    def _upload(self, rows):
+        upload = directory_file(rows)
+        response = self.client.post('/api/users/directory/import/', {
+            'file': SimpleUploadedFile('admitidos.xlsx', upload.getvalue()),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def _poll(self, batch_id):
+        return self.client.get(f'/api/users/directory/imports/{batch_id}/').json()
+
+    def test_upload_is_queued_and_processed_by_the_worker(self):
+        queued = self._upload([['Ana', 'Pérez', '8008', 'ana8@upn.edu.co', None]])
+        self.assertEqual((queued['status'], queued['rows_processed']), ('pending', 0))
+        self.assertFalse(User.objects.filter(document_number='8008').exists())
+        self.assertEqual(self.client.delete(f"/api/users/directory/imports/{queued['id']}/").status_code, 409)
+
+        call_command('process_directory_imports', '--once', stdout=StringIO())
+        done = self._poll(queued['id'])
+        self.assertEqual(
+            (done['status'], done['rows_processed'], done['created_count']),
+            ('completed', 1, 1),
+        )
+        self.assertFalse(DirectoryImportBatch.objects.get(id=queued['id']).upload)
+        self.assertTrue(User.objects.filter(document_number='8008').exists())
+
+    def test_running_batches_report_partial_counters(self):
+        queued = self._upload([['Ana', 'Pérez', '8008', 'ana8@upn.edu.co', None]])
+        batch = claim_directory_import()
+        self.assertTrue(batch.upload.storage.exists(batch.upload.name))
+        # Lo que la conexión de avance confirma en la fila mientras la carga corre
+        DirectoryImportBatch.objects.filter(id=batch.id).update(
+            rows_processed=1000, created_count=990, updated_count=4, skipped_count=6,
+        )
+        running = self._poll(queued['id'])
+        self.assertEqual(
+            (running['status'], running['rows_processed'], running['created_count'], running['skipped_count']),
+            ('running', 1000, 990, 6),
+        )
+
+    def test_failed_batches_leave_no_rows_behind(self):
+        User.objects.create_user(username='taken@upn.edu.co', email='other@upn.edu.co', role='TEACHER')
+        queued = self._upload([
+            ['Ana', 'Pérez', '8008', 'ana8@upn.edu.co', None],
+            ['Beto', 'Rojas', '9009', 'taken@upn.edu.co', None],
+        ])
+        with self.assertLogs('users.services.directory_jobs', 'ERROR'):
+            call_command('process_directory_imports', '--once', stdout=StringIO())
+
+        failed = self._poll(queued['id'])
+        self.assertEqual(failed['status'], 'failed')
+        self.assertTrue(failed['failure_message'])
+        self.assertFalse(User.objects.filter(document_number__in=['8008', '9009']).exists())
+        self.assertFalse(DirectoryImportEntry.objects.filter(batch_id=queued['id']).exists())
+
+
+class DirectoryImportProgressTests(TransactionTestCase):
+    # La conexión de avance necesita ver la carga confirmada; SQLite no publica avance
+    @skipUnless(connection.vendor == 'postgresql', 'requiere PostgreSQL')
+    def test_progress_is_visible_before_the_import_commits(self):
+        enqueue_directory_import(directory_file([['Ana', 'Pérez', '8008', 'ana8@upn.edu.co', None]]))
+        batch = claim_directory_import()
+        seen = []
+
+        def publish(progress, batch_id, processed, counts):
+            directory_jobs_publish(progress, batch_id, processed, counts)
+            reader = connections.create_connection(DEFAULT_DB_ALIAS)
+            try:
+                with reader.cursor() as cursor:
+                    cursor.execute('SELECT rows_processed, created_count FROM users_directoryimportbatch WHERE id = %s', [batch_id])
+                    seen.append(cursor.fetchone())
+                    cursor.execute('SELECT COUNT(*) FROM users_user WHERE document_number = %s', ['8008'])
+                    seen.append(cursor.fetchone())
+            finally:
+                reader.close()
+
+        with mock.patch('users.services.directory_jobs._publish_progress', side_effect=publish):
+            run_directory_import(batch)
+        self.assertEqual(seen, [(1, 1), (0,)])
+        self.assertTrue(User.objects.filter(document_number='8008').exists())
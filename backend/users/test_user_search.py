@@ -0,0 +1,75 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import Faculty, Program, User, UserSearchTerm
+from users.services.user_search import query_tokens, rebuild_search_terms, search_users
+from users.test_directory_import import directory_file, import_student_directory
+
+
+class UserSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='search-admin', role='ADMIN')
+        self.client.force_authenticate(self.admin)
+        faculty = Faculty.objects.create(name='Educación Física', code='EF')
+        self.program = Program.objects.create(name='Recreación', code='REC', faculty=faculty)
+        self.pena = User.objects.create_user(
+            username='jpena@upn.edu.co', email='jpena@upn.edu.co', role='TEACHER',
+            first_name='José', last_name='Peña Núñez', document_number='52123456', program=self.program,
+        )
+        self.penaloza = User.objects.create_user(
+            username='penaloza@upn.edu.co', email='penaloza@upn.edu.co', role='TEACHER',
+            first_name='Ana', last_name='Peñaloza', document_number='1052123', program=self.program,
+        )
+        self.student = User.objects.create_user(
+            username='lopenas@upn.edu.co', email='lopenas@upn.edu.co', role='STUDENT',
+            first_name='Luis', last_name='Lopenas', document_number='52123',
+        )
+
+    def _names(self, response):
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        rows = payload['results'] if isinstance(payload, dict) else payload
+        return [row['last_name'] for row in rows]
+
+    def test_search_ignores_accents_and_ranks_prefix_matches_first(self):
+        names = self._names(self.client.get('/api/users/', {'search': 'pena'}))
+        self.assertEqual(names, ['Peñaloza', 'Peña Núñez', 'Lopenas'])
+        self.assertEqual(self._names(self.client.get('/api/users/', {'search': 'JOSE nuñez'})), ['Peña Núñez'])
+
+    def test_exact_document_ranks_before_partial_documents(self):
+        ranked = search_users(User.objects.all(), '52.123').order_by('search_rank', 'first_name')
+        self.assertEqual(list(ranked), [self.student, self.pena, self.penaloza])
+        self.assertEqual(query_tokens('  52.123  Peña-Ruiz ana@UPN.edu.co '), ['52123', 'pena', 'ruiz', 'ana@upn.edu.co'])
+
+    def test_terms_follow_saves_and_directory_imports(self):
+        self.student.last_name = 'Gómez'
+        self.student.save(update_fields=['last_name'])
+        self.assertFalse(UserSearchTerm.objects.filter(user=self.student, kind='name', term='lopenas').exists())
+        self.assertEqual(list(search_users(User.objects.all(), 'luis gomez')), [self.student])
+
+        import_student_directory(directory_file([
+            ['Íngrid', 'Muñoz', '9090', 'imunoz@upn.edu.co', None],
+            ['Luis', 'Álvarez', '52123', 'lopenas@upn.edu.co', None],
+        ]))
+        self.assertEqual(search_users(User.objects.all(), 'ingrid munoz').get().document_number, '9090')
+        self.assertEqual(list(search_users(User.objects.all(), 'alvarez')), [self.student])
+
+        UserSearchTerm.objects.all().delete()
+        self.assertEqual(rebuild_search_terms(User.objects.all()), User.objects.count())
+        self.assertFalse(search_users(User.objects.all(), 'gomez').exists())
+        self.assertEqual(list(search_users(User.objects.all(), 'alvarez')), [self.student])
+
+    @override_settings(ILINYX_API_KEY='ilinyx-test-key')
+    def test_ilinyx_search_uses_the_shared_search(self):
+        response = APIClient().get('/api/users/search/', {'q': 'penaloza'}, HTTP_X_ILINYX_API_KEY='ilinyx-test-key')
+        self.assertEqual(self._names(response), ['Peñaloza'])
+
+    # El filtro de roles del endpoint usa ``roles__contains`` (JSON), que SQLite no soporta
+    @skipUnless(connection.vendor == 'postgresql', 'requiere PostgreSQL')
+    def test_practice_teachers_search_uses_the_shared_search(self):
+        response = self.client.get('/api/practicas/docentes/', {'program': self.program.id, 'q': 'nunez'})
+        self.assertEqual(self._names(response), ['Peña Núñez'])
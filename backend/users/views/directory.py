@@ -7,7 +7,8 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 
 from users.models import DirectoryImportBatch
-from users.services.directory_import import import_student_directory, revert_directory_batch
+from users.services.directory_import import revert_directory_batch
+from users.services.directory_jobs import enqueue_directory_import, import_progress
 
 User = get_user_model()
 REFRESH_COOKIE_PATH = '/api/'
@@ -49,20 +50,12 @@ def import_directory(request):
         return denied
     file_obj = request.FILES.get('file')
     if not file_obj:
-        return Response({'error': 'Debes adjuntar un archivo Excel.'}, status=400)
-    if not file_obj.name.lower().endswith(('.xlsx', '.xlsm')):
-        return Response({'error': 'El archivo debe ser .xlsx o .xlsm.'}, status=400)
-    try:
-        result = import_student_directory(file_obj, created_by=request.user)
-    except Exception as exc:
-        return Response({'error': f'No se pudo procesar el archivo: {exc}'}, status=400)
-    return Response({
-        'batch_id': result.batch_id,
-        'created': result.created,
-        'updated': result.updated,
-        'skipped': result.skipped,
-        'errors': result.errors,
-    }, status=status.HTTP_200_OK)
+        return Response({'error': 'Debes adjuntar un archivo Excel o CSV.'}, status=400)
+    if not file_obj.name.lower().endswith(('.xlsx', '.xlsm', '.csv')):
+        return Response({'error': 'El archivo debe ser .xlsx, .xlsm o .csv.'}, status=400)
+    # El worker procesa la carga; el cliente consulta directory/imports/<id>/
+    batch = enqueue_directory_import(file_obj, created_by=request.user)
+    return Response(serialize_batch(batch), status=status.HTTP_202_ACCEPTED)
 
 
 @api_view(['POST'])
@@ -197,11 +190,14 @@ def directory_batch_detail(request, batch_id):
     if denied:
         return denied
     try:
-        batch = DirectoryImportBatch.objects.get(id=batch_id)
+        batch = DirectoryImportBatch.objects.select_related('created_by').get(id=batch_id)
     except DirectoryImportBatch.DoesNotExist:
         return Response({'error': 'Carga no encontrada.'}, status=404)
+    if request.method == 'DELETE' and batch.status in ('pending', 'running'):
+        return Response({'error': 'La carga aún se está procesando.'}, status=409)
     if request.method == 'DELETE':
-        if batch.is_reverted:
+        # Una carga fallida no dejó cambios que revertir
+        if batch.is_reverted or batch.status == 'failed':
             batch.delete()
             return Response({'message': 'Registro eliminado del histórico.'})
         affected = revert_directory_batch(batch)
@@ -217,10 +213,10 @@ def serialize_batch(batch):
         'id': batch.id,
         'file_name': batch.file_name,
         'created_by': batch.created_by.get_full_name() if batch.created_by else '',
-        'created_count': batch.created_count,
-        'updated_count': batch.updated_count,
-        'skipped_count': batch.skipped_count,
+        'status': batch.status,
+        **import_progress(batch),
         'errors': batch.errors,
+        'failure_message': batch.failure_message,
         'is_reverted': batch.is_reverted,
         'created_at': batch.created_at,
     }
@@ -7,9 +7,10 @@ from rest_framework import permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from django.db.models import Q
 from django.conf import settings
 
+from ..services.user_search import search_users
+
 User = get_user_model()
 
 
@@ -38,12 +39,7 @@ def search_all_users(request):
     if len(q) < 2:
         return Response([])
 
-    qs = User.objects.filter(
-        Q(first_name__icontains=q) |
-        Q(last_name__icontains=q)  |
-        Q(username__icontains=q)   |
-        Q(email__icontains=q)
-    ).order_by('first_name', 'last_name')[:20]
+    qs = search_users(User.objects.all(), q).order_by('search_rank', 'first_name', 'last_name')[:20]
 
     from ..serializers import UserSerializer
     return Response(UserSerializer(qs, many=True, context={'request': request}).data)
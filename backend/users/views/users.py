@@ -16,6 +16,7 @@ from ..serializers import (
     FacultySerializer, ProgramSerializer, CoordinatorProfileSerializer,
 )
 from ..models import Faculty, Program, CoordinatorProfile
+from ..services.user_search import search_users
 
 User = get_user_model()
 
@@ -78,27 +79,11 @@ class UserViewSet(viewsets.ModelViewSet):
         role = self.request.query_params.get('role', '').strip()
         qs = self._base_queryset()
 
-        # Filtro de búsqueda adicional.
-        # La búsqueda por documento debe ser parcial: en operación real suelen
-        # escribir solo los primeros dígitos de la cédula.
+        # Búsqueda sin tildes sobre los términos indexados; el documento se
+        # busca por prefijo porque en operación real suelen escribir solo los
+        # primeros dígitos de la cédula.
         if search:
-            if '@' in search:
-                qs = qs.filter(
-                    Q(username__icontains=search) |
-                    Q(email__icontains=search) |
-                    Q(personal_email__icontains=search)
-                )
-            else:
-                qs = qs.filter(
-                    Q(first_name__icontains=search) |
-                    Q(second_name__icontains=search) |
-                    Q(last_name__icontains=search)  |
-                    Q(second_lastname__icontains=search)  |
-                    Q(username__icontains=search)   |
-                    Q(email__icontains=search)      |
-                    Q(personal_email__icontains=search) |
-                    Q(document_number__icontains=search)
-                )
+            qs = search_users(qs, search)
 
         if role and role != 'ALL':
             qs = qs.filter(
@@ -116,7 +101,7 @@ class UserViewSet(viewsets.ModelViewSet):
                   'program_id', 'is_directory_imported', 'requires_onboarding',
                   'directory_batch_id', 'faculty__name', 'program__name',
               )
-              .order_by('first_name', 'last_name', 'id')
+              .order_by(*(['search_rank'] if search else []), 'first_name', 'last_name', 'id')
         )
 
     def list(self, request, *args, **kwargs):
@@ -163,6 +148,10 @@ class UserViewSet(viewsets.ModelViewSet):
         """Obtener o actualizar el perfil del usuario actualmente logueado."""
         user = request.user
         if request.method == 'GET':
+            # Una lectura con todo lo que el serializer necesita
+            user = User.objects.select_related('faculty', 'program').prefetch_related(
+                'coordinator_profiles__program',
+            ).get(id=user.id)
             serializer = UserProfileSerializer(user, context={'request': request})
             return Response(serializer.data)
         elif request.method in ['PUT', 'PATCH']:
@@ -238,6 +227,7 @@ def join_class(request):
 
     try:
         from academic.models import Course
+        from academic.services.enrollment import enroll_students
         course = Course.objects.get(code__iexact=str(class_code).strip(), is_archived=False)
     except Course.DoesNotExist:
         return Response({'error': 'Código de clase inválido'}, status=status.HTTP_404_NOT_FOUND)
@@ -245,7 +235,7 @@ def join_class(request):
     if request.user in course.students.all():
         return Response({'error': 'Ya estás inscrito en esta clase'}, status=status.HTTP_400_BAD_REQUEST)
 
-    course.students.add(request.user)
+    enroll_students(course, request.user)
     return Response({
         'message': f'Te has unido exitosamente a {course.name}',
         'course':  {'id': course.id, 'name': course.name, 'code': course.code}
@@ -17,6 +17,7 @@ python backend/manage.py collectstatic --no-input
 # 3. Correr migraciones
 echo "Ejecutando migraciones..."
 python backend/manage.py migrate
+python backend/manage.py createcachetable
 
 # 4. Asegurar superusuario
 echo "Verificando superusuario..."
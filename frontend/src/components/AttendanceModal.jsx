@@ -7,6 +7,7 @@ import api from '../services/api';
 
 export default function AttendanceModal({ isOpen, onClose, courseId, students = [], getMediaUrl, onSaved, initialDate }) {
     const [checkin, setCheckin] = useState(null);
+    const [schedule, setSchedule] = useState(null);
     const [openingCheckin, setOpeningCheckin] = useState(false);
     const {
         attendanceData, attendanceDate, setAttendanceDate, isExistingSession, loadingSession,
@@ -16,25 +17,33 @@ export default function AttendanceModal({ isOpen, onClose, courseId, students =
         savingAttendance, handleSave, getCurrentTime, getAutoStatus,
     } = useAttendanceModal({ isOpen, courseId, students, initialDate });
 
+    // Una sola consulta por ventana: los códigos rotan localmente con el calendario firmado
     React.useEffect(() => {
         if (!isOpen || !checkin?.session_id) return undefined;
-        const timer = setInterval(async () => {
-            const next = Math.max((checkin.code_expires_in || 1) - 1, 0);
-            if (next > 0) {
-                setCheckin(prev => prev ? { ...prev, code_expires_in: next } : prev);
-                return;
-            }
-            try {
-                const { data } = await api.get('/academic/attendance/current_self_checkin/', {
-                    params: { session_id: checkin.session_id },
-                });
-                setCheckin(data);
-            } catch {
+        let cancelled = false;
+        api.get('/academic/attendance/self_checkin_schedule/', {
+            params: { session_id: checkin.session_id },
+        }).then(({ data }) => {
+            if (!cancelled) setSchedule({ ...data, offset: new Date(data.server_time).getTime() - Date.now() });
+        }).catch(() => {
+            if (!cancelled) setCheckin(null);
+        });
+        return () => { cancelled = true; };
+    }, [isOpen, checkin?.session_id, checkin?.expires_at]);
+
+    React.useEffect(() => {
+        if (!isOpen || !schedule) return undefined;
+        const timer = setInterval(() => {
+            const current = scheduledCode(schedule, Date.now() + schedule.offset);
+            if (!current) {
+                setSchedule(null);
                 setCheckin(null);
+                return;
             }
+            setCheckin(prev => prev ? { ...prev, ...current } : prev);
         }, 1000);
         return () => clearInterval(timer);
-    }, [isOpen, checkin?.session_id, checkin?.code_expires_in]);
+    }, [isOpen, schedule]);
 
     if (!isOpen) return null;
 
@@ -177,6 +186,18 @@ function ModeBar({ mode, setMode, markAll, checkin, openingCheckin, onOpenChecki
     );
 }
 
+function scheduledCode(schedule, serverNow) {
+    if (serverNow >= new Date(schedule.expires_at).getTime()) return null;
+    const rotation = schedule.rotation_seconds * 1000;
+    const current = schedule.windows.find(item => {
+        const start = new Date(item.starts_at).getTime();
+        return start <= serverNow && serverNow < start + rotation;
+    });
+    if (!current) return null;
+    const endsAt = new Date(current.starts_at).getTime() + rotation;
+    return { code: current.code, code_expires_in: Math.ceil((endsAt - serverNow) / 1000) };
+}
+
 function CheckinFeedback({ checkin }) {
     const remaining = Math.max(checkin.code_expires_in || 0, 0);
     const progress = `${Math.max((remaining / 30) * 100, 4)}%`;
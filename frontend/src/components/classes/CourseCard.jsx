@@ -12,7 +12,7 @@ export const COLOR_PALETTE = {
 
 export default function CourseCard({ course, canManage, onEdit, onDelete, onRestore, onClick }) {
     const palette = COLOR_PALETTE[course.color] || COLOR_PALETTE.violet;
-    const studentCount = course.students?.length ?? 0;
+    const studentCount = course.student_count ?? course.students?.length ?? 0;
     const archived = Boolean(course.is_archived);
 
     return (
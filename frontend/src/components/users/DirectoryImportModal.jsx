@@ -2,11 +2,16 @@ import React, { useEffect, useState } from 'react';
 import { FileSpreadsheet, History, Loader2, Plus, RotateCcw, Trash2, Upload, X } from 'lucide-react';
 import api from '../../services/api';
 
+const POLL_MS = 2000;
+const wait = ms => new Promise(resolve => setTimeout(resolve, ms));
+const isRunning = batch => batch.status === 'pending' || batch.status === 'running';
+
 export default function DirectoryImportModal({ onClose, onImported }) {
     const [file, setFile] = useState(null);
     const [loading, setLoading] = useState(false);
     const [historyLoading, setHistoryLoading] = useState(false);
     const [result, setResult] = useState(null);
+    const [progress, setProgress] = useState(null);
     const [history, setHistory] = useState([]);
     const [error, setError] = useState('');
     const [manual, setManual] = useState({
@@ -42,13 +47,31 @@ export default function DirectoryImportModal({ onClose, onImported }) {
             const response = await api.post('/users/directory/import/', data, {
                 headers: { 'Content-Type': 'multipart/form-data' },
             });
-            setResult(response.data);
             setFile(null);
+            // La carga se procesa en segundo plano: se consulta su avance
+            let batch = response.data;
+            while (isRunning(batch)) {
+                setProgress(batch);
+                await wait(POLL_MS);
+                batch = (await api.get(`/users/directory/imports/${batch.id}/`)).data;
+            }
+            if (batch.status === 'failed') {
+                setError(`La carga falló y no se aplicó ningún cambio: ${batch.failure_message}`);
+            } else {
+                setResult({
+                    batch_id: batch.id,
+                    created: batch.created_count,
+                    updated: batch.updated_count,
+                    skipped: batch.skipped_count,
+                    errors: batch.errors,
+                });
+                onImported?.();
+            }
             await loadHistory();
-            onImported?.();
         } catch (err) {
             setError(err.response?.data?.error || 'No se pudo importar el directorio.');
         } finally {
+            setProgress(null);
             setLoading(false);
         }
     };
@@ -77,7 +100,7 @@ export default function DirectoryImportModal({ onClose, onImported }) {
     };
 
     const deleteBatch = async (batch) => {
-        const action = batch.is_reverted ? 'eliminar del histórico' : 'revertir';
+        const action = batch.is_reverted || batch.status === 'failed' ? 'eliminar del histórico' : 'revertir';
         if (!window.confirm(`¿Deseas ${action} la carga "${batch.file_name}"?`)) return;
         setLoading(true);
         try {
@@ -102,6 +125,7 @@ export default function DirectoryImportModal({ onClose, onImported }) {
                         <ManualForm manual={manual} setManual={setManual} loading={loading} onSubmit={submitManual} />
                     </div>
                     <HistoryPanel loading={historyLoading} history={history} onDelete={deleteBatch} />
+                    {progress && <ImportProgress batch={progress} />}
                     {error && <div className="rounded-2xl bg-red-50 px-4 py-3 text-sm font-bold text-red-600 lg:col-span-2">{error}</div>}
                     {result && <ImportResult result={result} />}
                 </div>
@@ -130,9 +154,9 @@ function ImportForm({ file, setFile, loading, onSubmit }) {
             </div>
             <label className="flex cursor-pointer flex-col items-center justify-center rounded-3xl border-2 border-dashed border-slate-200 bg-slate-50 px-6 py-10 text-center transition hover:bg-slate-100">
                 <FileSpreadsheet className="mb-3 text-emerald-600" size={42} />
-                <span className="font-black text-slate-700">{file ? file.name : 'Seleccionar archivo .xlsx'}</span>
+                <span className="font-black text-slate-700">{file ? file.name : 'Seleccionar archivo .xlsx o .csv'}</span>
                 <span className="mt-1 text-xs font-semibold text-slate-400">La carga queda registrada y se puede revertir.</span>
-                <input type="file" accept=".xlsx,.xlsm" className="hidden" onChange={event => setFile(event.target.files?.[0] || null)} />
+                <input type="file" accept=".xlsx,.xlsm,.csv" className="hidden" onChange={event => setFile(event.target.files?.[0] || null)} />
             </label>
             <button disabled={loading || !file} className="flex w-full items-center justify-center gap-2 rounded-2xl bg-blue-700 px-5 py-4 font-black text-white disabled:opacity-60">
                 {loading ? <Loader2 className="animate-spin" /> : <Upload size={18} />} Importar directorio
@@ -184,14 +208,12 @@ function HistoryItem({ batch, onDelete }) {
                     <p className="line-clamp-1 font-black text-slate-700">{batch.file_name}</p>
                     <p className="text-xs font-semibold text-slate-400">{new Date(batch.created_at).toLocaleString()}</p>
                 </div>
-                <span className={`rounded-full px-2 py-1 text-[11px] font-black ${batch.is_reverted ? 'bg-slate-100 text-slate-500' : 'bg-emerald-50 text-emerald-600'}`}>
-                    {batch.is_reverted ? 'Revertida' : 'Activa'}
-                </span>
+                <BatchStatus batch={batch} />
             </div>
             <p className="mt-2 text-xs font-bold text-slate-500">
                 {batch.created_count} creados · {batch.updated_count} actualizados · {batch.skipped_count} omitidos
             </p>
-            {!batch.is_reverted ? (
+            {isRunning(batch) ? null : !batch.is_reverted && batch.status !== 'failed' ? (
                 <button type="button" onClick={() => onDelete(batch)} className="mt-3 flex items-center gap-2 rounded-xl bg-red-50 px-3 py-2 text-xs font-black text-red-600">
                     <RotateCcw size={14} /> Revertir carga
                 </button>
@@ -204,6 +226,26 @@ function HistoryItem({ batch, onDelete }) {
     );
 }
 
+function BatchStatus({ batch }) {
+    const [label, style] = isRunning(batch)
+        ? ['En proceso', 'bg-blue-50 text-blue-600']
+        : batch.status === 'failed'
+            ? ['Fallida', 'bg-red-50 text-red-600']
+            : batch.is_reverted ? ['Revertida', 'bg-slate-100 text-slate-500'] : ['Activa', 'bg-emerald-50 text-emerald-600'];
+    return <span className={`rounded-full px-2 py-1 text-[11px] font-black ${style}`}>{label}</span>;
+}
+
+function ImportProgress({ batch }) {
+    return (
+        <div className="flex items-center gap-3 rounded-2xl border border-blue-100 bg-blue-50 p-4 text-sm font-bold text-blue-700 lg:col-span-2">
+            <Loader2 className="animate-spin" size={18} />
+            {batch.status === 'pending'
+                ? 'Carga en cola, esperando al procesador...'
+                : `Procesando: ${batch.rows_processed} filas · ${batch.created_count} creados · ${batch.updated_count} actualizados · ${batch.skipped_count} omitidos`}
+        </div>
+    );
+}
+
 function ImportResult({ result }) {
     return (
         <div className="rounded-2xl border border-emerald-100 bg-emerald-50 p-4 text-sm lg:col-span-2">
@@ -208,7 +208,7 @@ function CampaignPicker({ courses, query, setQuery, onClose, onSelect }) {
             <button key={course.id} onClick={() => onSelect(course)} className="flex w-full items-center justify-between rounded-2xl border border-white/10 bg-white/[0.06] p-4 text-left transition hover:border-[#ccff00] hover:bg-[#ccff00]/10">
               <span>
                 <span className="block text-sm font-black">{course.name}</span>
-                <span className="text-xs font-bold text-violet-100/55">Código {course.code} · {course.students?.length || 0} estudiantes</span>
+                <span className="text-xs font-bold text-violet-100/55">Código {course.code} · {course.student_count ?? 0} estudiantes</span>
               </span>
               <span className="grid h-9 w-9 place-items-center rounded-full bg-[#ccff00] text-slate-950"><Plus size={18} /></span>
             </button>